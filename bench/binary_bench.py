@@ -0,0 +1,138 @@
+import sys
+import os
+import imp
+import time
+import optparse
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+from petitBloc import const
+
+
+mathBlocks = imp.load_source("mathBlocks", os.path.abspath(os.path.join(__file__, "../../blocks/mathBlocks.py")))
+
+
+class Source(block.Block):
+    Packets = 100000
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def run(self):
+        out = self.output(0)
+        for i in range(0, Source.Packets, 1000):
+            out.sendMany(range(i, min(i + 1000, Source.Packets)))
+
+
+class Sink(block.Block):
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        for p in self.input(0).receiveMany(1000):
+            if p.isEOP():
+                return False
+
+        return True
+
+
+class LegacyPlus(block.Block):
+    ## mathBlocks.Plus before it was moved onto block.BinaryBlock
+    def initialize(self):
+        self.addInput(float, "input1")
+        self.addInput(float, "input2")
+        self.addOutput(float, "result")
+
+    def run(self):
+        self.__i1_eop = False
+        self.__i2_eop = False
+        self.__v1 = None
+        self.__v2 = None
+        super(LegacyPlus, self).run()
+
+    def process(self):
+        if not self.__i1_eop:
+            in1 = self.input("input1").receive()
+            if in1.isEOP():
+                self.__i1_eop = True
+            else:
+                self.__v1 = in1.value()
+
+        if self.__v1 is None:
+            return False
+
+        if not self.__i2_eop:
+            in2 = self.input("input2").receive()
+            if in2.isEOP():
+                self.__i2_eop = True
+            else:
+                self.__v2 = in2.value()
+
+        if self.__v2 is None:
+            return False
+
+        if self.__i1_eop and self.__i2_eop:
+            return False
+
+        self.output("result").send(self.__v1 + self.__v2)
+
+        return True
+
+
+def makeScene(cls):
+    scene = box.Box("scene")
+    src1 = Source()
+    src2 = Source()
+    oper = cls()
+    sink = Sink()
+
+    for bloc in [src1, src2, oper, sink]:
+        scene.addBlock(bloc)
+
+    chain.Chain(src1.output(0), oper.input(0))
+    chain.Chain(src2.output(0), oper.input(1))
+    chain.Chain(oper.output(0), sink.input(0))
+
+    return scene
+
+
+def measure(cls, repeat, maxProcess=0):
+    schedule = makeScene(cls).getSchedule()
+
+    results = []
+    for i in range(repeat):
+        st = time.time()
+        workerManager.WorkerManager.RunSchedule(schedule, maxProcess=maxProcess)
+        results.append(time.time() - st)
+
+    return min(results)
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-k", dest="packets", help="Packets sent to each input", type="int", action="store", default=100000)
+    parser.add_option("-r", dest="repeat", help="Repeat count", type="int", action="store", default=3)
+    parser.add_option("-m", dest="maxProcess", help="Max workers (0 : default)", type="int", action="store", default=0)
+    parser.add_option("-p", dest="process", help="Use multiprocessing", action="store_true", default=False)
+    parser.add_option("-b", dest="batchSize", help="Chain batch size", type="int", action="store", default=1000)
+    parser.add_option("-H", dest="history", help="Keep the packet history", action="store_true", default=False)
+
+    opts, _ = parser.parse_args(sys.argv[1:])
+
+    workerManager.WorkerManager.SetUseProcess(opts.process)
+    workerManager.WorkerManager.SetBatchSize(opts.batchSize)
+    if not opts.history:
+        workerManager.WorkerManager.SetHistoryMode(const.HistoryMode.Off)
+
+    Source.Packets = opts.packets
+
+    print("# {} packets, {} mode".format(opts.packets, "process" if opts.process else "thread"))
+    for label, cls in [("per packet", LegacyPlus), ("BinaryBlock", mathBlocks.Plus)]:
+        wall = measure(cls, opts.repeat, maxProcess=opts.maxProcess)
+        print("    {:<12}: {:.4f} s, {:.2f} us per packet".format(label, wall, wall * 1000000.0 / max(opts.packets, 1)))
+
+
+if __name__ == "__main__":
+    main()
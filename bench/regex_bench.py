@@ -0,0 +1,150 @@
+import sys
+import os
+import imp
+import re
+import time
+import optparse
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+from petitBloc import const
+
+
+stringBlocks = imp.load_source("stringBlocks", os.path.abspath(os.path.join(__file__, "../../blocks/stringBlocks.py")))
+
+
+class Source(block.Block):
+    Packets = 100000
+
+    def initialize(self):
+        self.addOutput(str)
+
+    def run(self):
+        out = self.output(0)
+        for i in range(0, Source.Packets, 1000):
+            out.sendMany(map(lambda x: "2026-10-18 12:00:00 INFO request {} done".format(x), range(i, min(i + 1000, Source.Packets))))
+
+
+class Pattern(block.Block):
+    Patterns = ["request ([0-9]+)"]
+
+    def initialize(self):
+        self.addOutput(str)
+
+    def run(self):
+        out = self.output(0)
+        for i in range(0, Source.Packets, 1000):
+            out.sendMany(map(lambda x: Pattern.Patterns[x % len(Pattern.Patterns)], range(i, min(i + 1000, Source.Packets))))
+
+
+class Sink(block.Block):
+    def initialize(self):
+        self.addInput(str)
+
+    def process(self):
+        for p in self.input(0).receiveMany(1000):
+            if p.isEOP():
+                return False
+
+        return True
+
+
+class LegacySearch(block.Block):
+    ## stringBlocks.RegexSearch before it was moved onto block.RegexBlock
+    def initialize(self):
+        self.addInput(str, "string")
+        self.addInput(str, "pattern")
+        self.addOutput(str, "result")
+
+    def run(self):
+        self.__pattern_eop = False
+        self.__pattern_dmp = None
+        super(LegacySearch, self).run()
+
+    def process(self):
+        in1 = self.input("string").receive()
+        if in1.isEOP():
+            return False
+
+        v1 = in1.value()
+        in1.drop()
+
+        if not self.__pattern_eop:
+            in2 = self.input("pattern").receive()
+            if in2.isEOP():
+                self.__pattern_eop = True
+            else:
+                self.__pattern_dmp = in2.value()
+                in2.drop()
+
+        if self.__pattern_dmp is None:
+            return False
+
+        res = re.search(self.__pattern_dmp, v1)
+        if not res:
+            self.output("result").send("")
+
+            return True
+
+        self.output("result").send(v1[res.start():res.end()])
+        return True
+
+
+def makeScene(cls, batch):
+    scene = box.Box("scene")
+    src = Source()
+    pattern = Pattern()
+    search = cls()
+    sink = Sink()
+
+    if search.param("batch") is not None:
+        search.param("batch").set(batch)
+
+    for bloc in [src, pattern, search, sink]:
+        scene.addBlock(bloc)
+
+    chain.Chain(src.output(0), search.input(0))
+    chain.Chain(pattern.output(0), search.input(1))
+    chain.Chain(search.output(0), sink.input(0))
+
+    return scene
+
+
+def measure(cls, batch, repeat):
+    schedule = makeScene(cls, batch).getSchedule()
+
+    results = []
+    for i in range(repeat):
+        st = time.time()
+        workerManager.WorkerManager.RunSchedule(schedule)
+        results.append(time.time() - st)
+
+    return min(results)
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-k", dest="packets", help="Packets", type="int", action="store", default=100000)
+    parser.add_option("-n", dest="patterns", help="Distinct patterns sent in turn with the strings", type="int", action="store", default=1)
+    parser.add_option("-r", dest="repeat", help="Repeat count", type="int", action="store", default=3)
+    parser.add_option("-p", dest="process", help="Use multiprocessing", action="store_true", default=False)
+
+    opts, _ = parser.parse_args(sys.argv[1:])
+
+    workerManager.WorkerManager.SetUseProcess(opts.process)
+    workerManager.WorkerManager.SetHistoryMode(const.HistoryMode.Off)
+
+    Source.Packets = opts.packets
+    ## re clears its whole cache once it holds 100 patterns
+    Pattern.Patterns = map(lambda x: "request ([0-9]+) d{{0,{}}}".format(x), range(opts.patterns))
+
+    print("# {} packets, {} patterns, {} mode".format(opts.packets, opts.patterns, "process" if opts.process else "thread"))
+    for label, cls, batch in [("per packet", LegacySearch, False), ("RegexBlock", stringBlocks.RegexSearch, False), ("batch", stringBlocks.RegexSearch, True)]:
+        wall = measure(cls, batch, opts.repeat)
+        print("    {:<12}: {:.4f} s, {:.2f} us per packet".format(label, wall, wall * 1000000.0 / max(opts.packets, 1)))
+
+
+if __name__ == "__main__":
+    main()
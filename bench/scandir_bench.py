@@ -0,0 +1,94 @@
+import sys
+import os
+import imp
+import time
+import shutil
+import tempfile
+import optparse
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../../python")))
+
+
+fileBlocks = imp.load_source("fileBlocks", os.path.abspath(os.path.join(__file__, "../../blocks/fileBlocks.py")))
+
+
+def makeTree(root, dirs, files):
+    for d in range(dirs):
+        dp = os.path.join(root, "dir{}".format(d))
+        os.makedirs(dp)
+        for f in range(files):
+            with open(os.path.join(dp, "file{}.txt".format(f)), "w"):
+                pass
+
+        os.symlink(dp, os.path.join(root, "link{}".format(d)))
+
+
+def legacyScanDir(path, followLinks=False):
+    ## _scanDir without scandir before the entry types were read from the listing
+    entries = []
+    for name in os.listdir(path):
+        fp = os.path.join(path, name)
+        is_dir = os.path.isdir(fp)
+        entries.append((name, fp, is_dir, is_dir and (followLinks or not os.path.islink(fp)), None))
+
+    return entries
+
+
+def walk(scan, root):
+    count = 0
+    stack = [root]
+    while (stack):
+        for name, fp, is_dir, recurse, _ in scan(stack.pop()):
+            count += 1
+            if recurse:
+                stack.append(fp)
+
+    return count
+
+
+def measure(scan, root, repeat):
+    results = []
+    for i in range(repeat):
+        st = time.time()
+        count = walk(scan, root)
+        results.append(time.time() - st)
+
+    return min(results), count
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-d", dest="dirs", help="Directories", type="int", action="store", default=100)
+    parser.add_option("-f", dest="files", help="Files per directory", type="int", action="store", default=500)
+    parser.add_option("-r", dest="repeat", help="Repeat count", type="int", action="store", default=5)
+
+    opts, _ = parser.parse_args(sys.argv[1:])
+
+    root = tempfile.mkdtemp()
+    try:
+        makeTree(root, opts.dirs, opts.files)
+
+        read_dir = fileBlocks._ReadDir
+
+        def listdirScan(path):
+            fileBlocks._ReadDir = None
+            try:
+                return fileBlocks._scanDir(path)
+            finally:
+                fileBlocks._ReadDir = read_dir
+
+        cases = [("listdir isdir", legacyScanDir), ("listdir lstat", listdirScan)]
+        if fileBlocks._scandir is not None:
+            cases.append(("scandir", fileBlocks._scanDir))
+        elif read_dir is not None:
+            cases.append(("readdir", fileBlocks._scanDir))
+
+        print("# {} directories, {} files each".format(opts.dirs, opts.files))
+        for label, scan in cases:
+            wall, count = measure(scan, root, opts.repeat)
+            print("    {:<14}: {:.4f} s, {:.2f} us per entry".format(label, wall, wall * 1000000.0 / max(count, 1)))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
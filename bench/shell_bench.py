@@ -0,0 +1,96 @@
+import sys
+import os
+import imp
+import time
+import optparse
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+from petitBloc import const
+
+
+execBlocks = imp.load_source("execBlocks", os.path.abspath(os.path.join(__file__, "../../blocks/execBlocks.py")))
+
+
+class Commands(block.Block):
+    Count = 200
+    Command = "true"
+
+    def initialize(self):
+        self.addOutput(str)
+
+    def run(self):
+        for i in range(Commands.Count):
+            self.output(0).send(Commands.Command)
+
+
+class Sink(block.Block):
+    def initialize(self):
+        self.addInput(bool)
+
+    def process(self):
+        for p in self.input(0).receiveMany(100):
+            if p.isEOP():
+                return False
+
+        return True
+
+
+def makeScene(shells, inFlight):
+    scene = box.Box("scene")
+
+    for i in range(shells):
+        cmds = Commands()
+        shell = execBlocks.Shell()
+        sink = Sink()
+        if shell.param("inFlight") is not None:
+            shell.param("inFlight").set(inFlight)
+
+        for bloc in [cmds, shell, sink]:
+            scene.addBlock(bloc)
+
+        chain.Chain(cmds.output(0), shell.input(0))
+        chain.Chain(shell.output(0), sink.input(0))
+
+    return scene
+
+
+def measure(shells, inFlight, repeat):
+    schedule = makeScene(shells, inFlight).getSchedule()
+
+    results = []
+    for i in range(repeat):
+        st = time.time()
+        workerManager.WorkerManager.RunSchedule(schedule)
+        results.append(time.time() - st)
+
+    return min(results)
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-c", dest="count", help="Commands per Shell block", type="int", action="store", default=200)
+    parser.add_option("-e", dest="command", help="Command", action="store", default="true")
+    parser.add_option("-n", dest="shells", help="Shell blocks running at once", type="int", action="store", default=4)
+    parser.add_option("-f", dest="inFlight", help="Commands in flight per Shell block", type="int", action="store", default=4)
+    parser.add_option("-r", dest="repeat", help="Repeat count", type="int", action="store", default=3)
+    parser.add_option("-p", dest="process", help="Use multiprocessing", action="store_true", default=False)
+
+    opts, _ = parser.parse_args(sys.argv[1:])
+
+    workerManager.WorkerManager.SetUseProcess(opts.process)
+    workerManager.WorkerManager.SetHistoryMode(const.HistoryMode.Off)
+
+    Commands.Count = opts.count
+    Commands.Command = opts.command
+
+    print("# {} x {} '{}', {} mode".format(opts.shells, opts.count, opts.command, "process" if opts.process else "thread"))
+    for label, shells, in_flight in [("1 block", 1, 1), ("1 block, in flight", 1, opts.inFlight), ("{} blocks".format(opts.shells), opts.shells, 1), ("{} blocks, in flight".format(opts.shells), opts.shells, opts.inFlight)]:
+        wall = measure(shells, in_flight, opts.repeat)
+        print("    {:<22}: {:.3f} s, {:.2f} ms per command".format(label, wall, wall * 1000.0 / max(shells * opts.count, 1)))
+
+
+if __name__ == "__main__":
+    main()
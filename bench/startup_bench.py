@@ -0,0 +1,43 @@
+import sys
+import os
+import time
+import optparse
+import subprocess
+
+
+Command = os.path.abspath(os.path.join(__file__, "../../bin/petitBloc"))
+
+
+def measure(args, repeat):
+    results = []
+    with open(os.devnull, "w") as devnull:
+        for i in range(repeat):
+            st = time.time()
+            subprocess.call([sys.executable, Command] + args, stdout=devnull, stderr=devnull)
+            results.append(time.time() - st)
+
+    results.sort()
+
+    return results[0], results[len(results) / 2]
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-r", dest="repeat", help="Repeat count", type="int", action="store", default=10)
+    parser.add_option("-s", dest="scene", help="Scene file used for -q", action="store", default="")
+    parser.add_option("-i", dest="info", help="Block type used for -i", action="store", default="Box")
+
+    opts, _ = parser.parse_args(sys.argv[1:])
+
+    commands = [("-b", ["-b"]), ("-i", ["-i", opts.info])]
+    if opts.scene:
+        commands.append(("-q", ["-q", "-s", opts.scene]))
+
+    print("# {} runs, registry : {}".format(opts.repeat, os.environ.get("PETITBLOC_REGISTRY", "default")))
+    for label, args in commands:
+        fastest, median = measure(args, opts.repeat)
+        print("    {:<4}: min {:.1f} ms, median {:.1f} ms".format(label, fastest * 1000.0, median * 1000.0))
+
+
+if __name__ == "__main__":
+    main()
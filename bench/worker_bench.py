@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+import optparse
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+from petitBloc import const
+
+
+class Source(block.Block):
+    Packets = 10
+
+    def initialize(self):
+        self.addOutput(int)
+
+    def process(self):
+        for i in range(Source.Packets):
+            self.output(0).send(i)
+
+        return False
+
+
+class Pass(block.Block):
+    def initialize(self):
+        self.addInput(int)
+        self.addOutput(int)
+
+    def process(self):
+        p = self.input(0).receive()
+        if p.isEOP():
+            return False
+
+        self.output(0).send(p.value())
+        p.drop()
+
+        return True
+
+
+def makeScene(count, length):
+    scene = box.Box("scene")
+
+    for i in range(count / length):
+        src = Source()
+        scene.addBlock(src)
+        last = src.output(0)
+
+        for j in range(length - 1):
+            bloc = Pass()
+            scene.addBlock(bloc)
+            chain.Chain(last, bloc.input(0))
+            last = bloc.output(0)
+
+    return scene
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option("-n", dest="count", help="Number of blocks", type="int", action="store", default=500)
+    parser.add_option("-l", dest="length", help="Length of each pipeline", type="int", action="store", default=5)
+    parser.add_option("-m", dest="maxProcess", help="Max workers (0 : default)", type="int", action="store", default=0)
+    parser.add_option("-r", dest="repeat", help="Repeat count", type="int", action="store", default=3)
+    parser.add_option("-p", dest="process", help="Use multiprocessing", action="store_true", default=False)
+    parser.add_option("-w", dest="poolSize", help="Worker pool size (0 : default)", type="int", action="store", default=0)
+    parser.add_option("-c", dest="cooperative", help="Drive several blocks per pool worker", action="store_true", default=False)
+    parser.add_option("-k", dest="packets", help="Packets sent by each source", type="int", action="store", default=10)
+    parser.add_option("-b", dest="batchSize", help="Chain batch size", type="int", action="store", default=1)
+    parser.add_option("-H", dest="history", help="Packet history mode (All, Off, First, Last, Reservoir, Spill)", action="store", default="All")
+
+    opts, _ = parser.parse_args(sys.argv[1:])
+
+    workerManager.WorkerManager.SetUseProcess(opts.process)
+    workerManager.WorkerManager.SetPoolSize(opts.poolSize)
+    workerManager.WorkerManager.SetCooperative(opts.cooperative)
+    workerManager.WorkerManager.SetBatchSize(opts.batchSize)
+    workerManager.WorkerManager.SetHistoryMode(const.HistoryMode[opts.history])
+    Source.Packets = opts.packets
+    scene = makeScene(opts.count, max(opts.length, 1))
+    schedule = scene.getSchedule()
+    blocks = len(schedule)
+
+    results = []
+    for i in range(opts.repeat):
+        cpu = time.clock()
+        st = time.time()
+        workerManager.WorkerManager.RunSchedule(schedule, maxProcess=opts.maxProcess)
+        results.append((time.time() - st, time.clock() - cpu))
+
+    wall, cpu = min(results)
+    print("# {} blocks, {} mode".format(blocks, "process" if opts.process else "thread"))
+    print("    wall time      : {:.4f} s".format(wall))
+    print("    process cpu    : {:.4f} s".format(cpu))
+    print("    per block      : {:.3f} ms".format(wall * 1000.0 / blocks))
+    print("    blocks per sec : {:.1f}".format(blocks / wall))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from petitBloc import block
 class IntArray(block.Block):
     def __init__(self):
         super(IntArray, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(int, "value")
@@ -26,6 +27,7 @@ class IntArray(block.Block):
 class IntArrayIter(block.Block):
     def __init__(self):
         super(IntArrayIter, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addOutput(int, "value")
@@ -45,6 +47,7 @@ class IntArrayIter(block.Block):
 class FloatArray(block.Block):
     def __init__(self):
         super(FloatArray, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(float, "value")
@@ -67,6 +70,7 @@ class FloatArray(block.Block):
 class FloatArrayIter(block.Block):
     def __init__(self):
         super(FloatArrayIter, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addOutput(float, "value")
@@ -86,6 +90,7 @@ class FloatArrayIter(block.Block):
 class BoolArray(block.Block):
     def __init__(self):
         super(BoolArray, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(bool, "value")
@@ -108,6 +113,7 @@ class BoolArray(block.Block):
 class BoolArrayIter(block.Block):
     def __init__(self):
         super(BoolArrayIter, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addOutput(bool, "value")
@@ -127,6 +133,7 @@ class BoolArrayIter(block.Block):
 class StringArray(block.Block):
     def __init__(self):
         super(StringArray, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(str, "value")
@@ -149,6 +156,7 @@ class StringArray(block.Block):
 class StringArrayIter(block.Block):
     def __init__(self):
         super(StringArrayIter, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addOutput(str, "value")
@@ -168,6 +176,7 @@ class StringArrayIter(block.Block):
 class Range(block.Block):
     def __init__(self):
         super(Range, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(int, "start")
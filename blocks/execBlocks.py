@@ -1,24 +1,35 @@
 from petitBloc import block
 from petitBloc import workerManager
+import collections
 
 
 class Shell(block.Block):
     def __init__(self):
         super(Shell, self).__init__()
+        self.setCacheable(False)
 
     def initialize(self):
         self.addInput(str, "command")
         self.addOutput(bool, "result")
+        self.addParam(int, "inFlight", 1)
 
-    def process(self):
-        cmd_p = self.input("command").receive()
-        if cmd_p.isEOP():
-            return False
+    def activate(self):
+        super(Shell, self).activate()
+        self.__running = collections.deque()
+        self.__eop = False
 
-        cmd = cmd_p.value()
-        cmd_p.drop()
+    def process(self):
+        if not self.__eop:
+            cmd_p = self.input("command").receive()
+            if cmd_p.isEOP():
+                self.__eop = True
+            else:
+                self.__running.append(workerManager.SubmitSubProcess(cmd_p.value()))
+                cmd_p.drop()
 
-        sp = workerManager.SubmitSubProcess(cmd)
-        self.output("result").send(sp.result())
+        ## results are sent in the order of the commands
+        limit = max(self.param("inFlight").get(), 1)
+        while (self.__running and (self.__eop or len(self.__running) >= limit or self.__running[0].isDone())):
+            self.output("result").send(self.__running.popleft().result())
 
-        return True
+        return not self.__eop
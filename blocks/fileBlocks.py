@@ -1,38 +1,331 @@
 from petitBloc import block
 import os
+import gzip
+import bz2
+import mmap
+import codecs
+import cStringIO
+import tempfile
+import shutil
+import time
+import re
+import fnmatch
+import threading
+import Queue
+import stat
+import sys
+
+try:
+    from os import scandir as _scandir
+except ImportError:
+    try:
+        from scandir import scandir as _scandir
+    except ImportError:
+        _scandir = None
+
+try:
+    import ctypes as _ctypes
+    import ctypes.util
+except ImportError:
+    _ctypes = None
+
+
+## without scandir the entry types are read by readdir, os.listdir drops them
+_DtUnknown = 0
+_DtDir = 4
+_DtLink = 10
+_Libc = None
+_ReadDir = None
+
+
+def _initReadDir():
+    global _Libc, _ReadDir
+
+    if _ctypes is None or _scandir is not None:
+        return
+
+    if sys.platform.startswith("linux"):
+        class Dirent(_ctypes.Structure):
+            _fields_ = [("d_ino", _ctypes.c_uint64),
+                        ("d_off", _ctypes.c_int64),
+                        ("d_reclen", _ctypes.c_ushort),
+                        ("d_type", _ctypes.c_ubyte),
+                        ("d_name", _ctypes.c_char * 256)]
+        read_name = "readdir64"
+
+    elif sys.platform == "darwin":
+        class Dirent(_ctypes.Structure):
+            _fields_ = [("d_ino", _ctypes.c_uint64),
+                        ("d_seekoff", _ctypes.c_uint64),
+                        ("d_reclen", _ctypes.c_ushort),
+                        ("d_namlen", _ctypes.c_ushort),
+                        ("d_type", _ctypes.c_ubyte),
+                        ("d_name", _ctypes.c_char * 1024)]
+        read_name = "readdir$INODE64"
+
+    else:
+        return
+
+    try:
+        libc = _ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        opendir = libc.opendir
+        readdir = getattr(libc, read_name)
+        closedir = libc.closedir
+    except (OSError, AttributeError):
+        return
+
+    opendir.argtypes = [_ctypes.c_char_p]
+    opendir.restype = _ctypes.c_void_p
+    readdir.argtypes = [_ctypes.c_void_p]
+    readdir.restype = _ctypes.POINTER(Dirent)
+    closedir.argtypes = [_ctypes.c_void_p]
+    closedir.restype = _ctypes.c_int
+
+    _Libc = (opendir, readdir, closedir)
+    _ReadDir = _readDirTypes
+
+
+def _readDirTypes(path):
+    opendir, readdir, closedir = _Libc
+
+    encoding = sys.getfilesystemencoding() if isinstance(path, unicode) else None
+    dirp = opendir(path.encode(encoding) if encoding else path)
+    if not dirp:
+        err = _ctypes.get_errno()
+        raise OSError(err, os.strerror(err), path)
+
+    entries = []
+    try:
+        while (True):
+            _ctypes.set_errno(0)
+            ent = readdir(dirp)
+            if not ent:
+                err = _ctypes.get_errno()
+                if err:
+                    raise OSError(err, os.strerror(err), path)
+
+                break
+
+            name = ent.contents.d_name
+            if name == "." or name == "..":
+                continue
+
+            entries.append((name.decode(encoding) if encoding else name, ent.contents.d_type))
+    finally:
+        closedir(dirp)
+
+    return entries
+
+
+_initReadDir()
+
+
+## mkstemp creates the file with 0600, a new file gets the usual permissions instead
+_Umask = os.umask(0)
+os.umask(_Umask)
+
+
+def _openFile(path, compression):
+    if compression == "auto":
+        ext = os.path.splitext(path)[1].lower()
+        if ext in [".gz", ".gzip"]:
+            compression = "gzip"
+        elif ext in [".bz2", ".bzip2"]:
+            compression = "bz2"
+
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+
+    if compression == "bz2":
+        return bz2.BZ2File(path, "rb")
+
+    return None
+
+
+def _readChunks(f, chunkSize):
+    while (True):
+        data = f.read(chunkSize)
+        if not data:
+            break
+
+        yield data
+
+
+def _mmapChunks(path, chunkSize):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for offset in xrange(0, len(mm), chunkSize):
+                yield mm[offset:offset + chunkSize]
+        finally:
+            mm.close()
+
+
+def _decodeChunks(chunks, encoding):
+    ## an incremental decoder keeps the characters split between two chunks
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for data in chunks:
+        text = decoder.decode(data)
+        if text:
+            yield text.encode("utf-8")
+
+    text = decoder.decode("", final=True)
+    if text:
+        yield text.encode("utf-8")
+
+
+def _splitLines(chunks):
+    rest = ""
+    for data in chunks:
+        data = rest + data
+        end = data.rfind("\n") + 1
+        rest = data[end:]
+        if end:
+            ## the file is read in binary, so windows line endings are normalized here
+            yield cStringIO.StringIO(data[:end].replace("\r\n", "\n")).readlines()
+
+    if rest:
+        yield [rest]
 
 
 class FileRead(block.Block):
+    Modes = ["line", "lines", "chunk"]
+    Compressions = ["auto", "none", "gzip", "bz2"]
+
     def __init__(self):
         super(FileRead, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(str, "filePath")
+        self.addEnumParam("mode", FileRead.Modes, value=0)
+        self.addEnumParam("compression", FileRead.Compressions, value=0)
+        self.addParam(str, "encoding")
+        self.addParam(int, "startLine", 0)
+        self.addParam(int, "endLine", -1)
+        self.addParam(int, "batchSize", 1000)
+        self.addParam(int, "chunkSize", 1048576)
+        self.addParam(bool, "useMmap", False)
         self.addOutput(str, "data")
 
+    def cacheKey(self):
+        path = self.param("filePath").get()
+        if not os.path.isfile(path):
+            return None
+
+        st = os.stat(path)
+
+        return (os.path.abspath(path), st.st_mtime, st.st_size)
+
     def run(self):
         path = self.param("filePath").get()
         if not os.path.isfile(path):
             return
 
-        with open(path, "r") as f:
-            for l in f.readlines():
-                self.output("data").send(l)
+        chunk_size = max(self.param("chunkSize").get(), 1)
+        f = _openFile(path, self.param("compression").getLabel())
+
+        try:
+            if f is not None:
+                chunks = _readChunks(f, chunk_size)
+            elif self.param("useMmap").get():
+                chunks = _mmapChunks(path, chunk_size)
+            else:
+                f = open(path, "rb")
+                chunks = _readChunks(f, chunk_size)
+
+            encoding = self.param("encoding").get()
+            if encoding:
+                chunks = _decodeChunks(chunks, encoding)
+
+            mode = self.param("mode").getLabel()
+            if mode == "chunk":
+                for data in chunks:
+                    self.output("data").send(data)
+            else:
+                self.__sendLines(_splitLines(chunks), mode == "lines")
+        finally:
+            if f is not None:
+                f.close()
+
+    def __sendLines(self, batches, join):
+        out = self.output("data")
+        batch_size = max(self.param("batchSize").get(), 1)
+        start = max(self.param("startLine").get(), 0)
+        end = self.param("endLine").get()
+        index = 0
+        pending = []
+
+        for lines in batches:
+            count = len(lines)
+            if index + count <= start:
+                index += count
+                continue
+
+            if end >= 0 and index + count > end:
+                lines = lines[:max(end - index, 0)]
+
+            if index < start:
+                lines = lines[start - index:]
+                index = start
+
+            index += len(lines)
+            pending.extend(lines)
+
+            full = len(pending) - len(pending) % batch_size
+            for i in xrange(0, full, batch_size):
+                self.__send(out, pending[i:i + batch_size], join)
+
+            pending = pending[full:]
+
+            if end >= 0 and index >= end:
+                break
+
+        if pending:
+            self.__send(out, pending, join)
+
+    def __send(self, out, lines, join):
+        if join:
+            out.send("".join(lines))
+        else:
+            out.sendMany(lines)
+
+
+def _replaceFile(src, dst):
+    try:
+        os.rename(src, dst)
+    except OSError:
+        ## rename does not replace an existing file on Windows
+        os.remove(dst)
+        os.rename(src, dst)
 
 
 class FileWrite(block.Block):
+    Compressions = ["auto", "none", "gzip"]
+    ReceiveSize = 1000
+
     def __init__(self):
         super(FileWrite, self).__init__()
+        self.setCacheable(False)
 
     def initialize(self):
         self.addParam(str, "filePath")
+        self.addParam(bool, "append", False)
+        self.addParam(bool, "atomic", False)
+        self.addEnumParam("compression", FileWrite.Compressions, value=0)
+        self.addParam(int, "bufferSize", 1048576)
+        self.addParam(float, "flushInterval", 0.0)
+        self.addParam(bool, "fsync", False)
         self.addInput(str, "data")
 
     def run(self):
-        path = os.path.abspath(self.param("filePath").get())
-        if not path:
+        if not self.param("filePath").get():
             return
 
+        path = os.path.abspath(self.param("filePath").get())
         dirname = os.path.dirname(path)
 
         if not dirname:
@@ -41,23 +334,164 @@ class FileWrite(block.Block):
         if not os.path.isdir(dirname):
             os.makedirs(dirname)
 
+        append = self.param("append").get()
+        compression = self.param("compression").getLabel()
+        if compression == "auto":
+            compression = "gzip" if os.path.splitext(path)[1].lower() in [".gz", ".gzip"] else "none"
+
+        tmp = None
+        if self.param("atomic").get():
+            ## everything is written to a temporary file next to the target and renamed over it at the end
+            fd, tmp = tempfile.mkstemp(prefix=".{}.".format(os.path.basename(path)), suffix=".tmp", dir=dirname)
+            raw = os.fdopen(fd, "wb")
+            if os.path.isfile(path):
+                shutil.copymode(path, tmp)
+                if append:
+                    with open(path, "rb") as f:
+                        shutil.copyfileobj(f, raw)
+            else:
+                os.chmod(tmp, 0666 & ~_Umask)
+        else:
+            raw = open(path, "ab" if append else "wb")
+
+        try:
+            f = gzip.GzipFile(filename=os.path.basename(path), mode="wb", fileobj=raw) if compression == "gzip" else raw
+            self.__write(f, raw)
+
+            if f is not raw:
+                f.close()
+
+            raw.flush()
+            if self.param("fsync").get():
+                os.fsync(raw.fileno())
+
+            raw.close()
+
+            if tmp is not None:
+                _replaceFile(tmp, path)
+                tmp = None
+        finally:
+            if not raw.closed:
+                raw.close()
+
+            if tmp is not None and os.path.isfile(tmp):
+                os.remove(tmp)
+
+    def __write(self, f, raw):
         in_port = self.input("data")
-        datas = []
-        while (True):
-            package = in_port.receive()
-            if package.isEOP():
-                break
+        buffer_size = max(self.param("bufferSize").get(), 1)
+        interval = self.param("flushInterval").get()
+        sync = self.param("fsync").get()
+        last_flush = time.time()
+        buf = []
+        size = 0
+        eop = False
+
+        while (not eop):
+            for package in in_port.receiveMany(FileWrite.ReceiveSize):
+                if package.isEOP():
+                    eop = True
+                    break
+
+                data = package.value()
+                package.drop()
+                buf.append(data)
+                size += len(data)
+
+            flush = interval > 0 and time.time() - last_flush >= interval
+
+            if buf and (size >= buffer_size or eop or flush):
+                f.write("".join(buf))
+                buf = []
+                size = 0
+
+            if flush:
+                f.flush()
+                raw.flush()
+                if sync:
+                    os.fsync(raw.fileno())
+
+                last_flush = time.time()
+
+
+def _scanDir(path, followLinks=False, withStat=False):
+    ## the entry type comes from the directory listing itself when scandir is available
+    entries = []
+
+    if _scandir is not None:
+        for entry in _scandir(path):
+            is_dir = entry.is_dir()
+            st = None
+            if withStat:
+                try:
+                    st = entry.stat(follow_symlinks=followLinks)
+                except OSError:
+                    st = None
+
+            entries.append((entry.name, entry.path, is_dir, is_dir and (followLinks or not entry.is_symlink()), st))
+
+        return entries
+
+    if _ReadDir is not None:
+        names = _ReadDir(path)
+    else:
+        names = [(name, _DtUnknown) for name in os.listdir(path)]
+
+    for name, d_type in names:
+        fp = os.path.join(path, name)
+        lst = None
+
+        ## only an entry of unknown type needs a stat to tell a directory or a link
+        if d_type == _DtUnknown:
+            try:
+                lst = os.lstat(fp)
+            except OSError:
+                lst = None
+
+            if lst is not None and stat.S_ISDIR(lst.st_mode):
+                d_type = _DtDir
+            elif lst is not None and stat.S_ISLNK(lst.st_mode):
+                d_type = _DtLink
+
+        is_link = d_type == _DtLink
+        is_dir = d_type == _DtDir or (is_link and os.path.isdir(fp))
+        st = None
+        if withStat:
+            try:
+                st = os.stat(fp) if followLinks and is_link else (lst or os.lstat(fp))
+            except OSError:
+                st = None
+
+        entries.append((name, fp, is_dir, is_dir and (followLinks or not is_link), st))
+
+    return entries
+
+
+def _scanWorker(tasks, results, followLinks, withStat):
+    while (True):
+        task = tasks.get()
+        if task is None:
+            break
+
+        path, depth = task
+        try:
+            results.put((path, depth, _scanDir(path, followLinks=followLinks, withStat=withStat), None))
+        except Exception as e:
+            results.put((path, depth, [], e))
+
 
-            datas.append(package.value())
+def _toSlash(path):
+    if os.sep == "/":
+        return path
 
-        with open(path, "w") as f:
-            for d in datas:
-                f.write(d)
+    return path.replace("\\", "/")
 
 
 class ListDir(block.Block):
     def __init__(self):
         super(ListDir, self).__init__()
+        ## the listing changes without any change of the input path
+        self.setCacheable(False)
 
     def initialize(self):
         self.addInput(str, "dirPath")
@@ -74,13 +508,109 @@ class ListDir(block.Block):
         in_p.drop()
 
         if os.path.isdir(path):
-            for p in os.listdir(path):
-                fp = os.path.abspath(os.path.join(path, p)).replace("\\", "/")
-
-                if os.path.isdir(fp):
-                    self.output("directory").send(fp)
+            for name, fp, is_dir, _, _ in _scanDir(os.path.abspath(path), followLinks=True):
+                if is_dir:
+                    self.output("directory").send(_toSlash(fp))
                     continue
 
-                self.output("file").send(fp)
+                self.output("file").send(_toSlash(fp))
+
+        return True
+
+
+class WalkDir(block.Block):
+    def __init__(self):
+        super(WalkDir, self).__init__()
+        ## any directory of the tree can change, no single mtime covers it
+        self.setCacheable(False)
+
+    def initialize(self):
+        self.addInput(str, "dirPath")
+        self.addOutput(str, "file")
+        self.addOutput(str, "directory")
+        self.addOutput(dict, "stat")
+        self.addParam(int, "maxDepth", -1)
+        self.addParam(str, "pattern")
+        self.addParam(str, "regex")
+        self.addParam(bool, "followLinks", False)
+        self.addParam(bool, "withStat", False)
+        self.addParam(int, "threads", 4)
+
+    def process(self):
+        in_p = self.input("dirPath").receive()
+
+        if in_p.isEOP():
+            return False
+
+        path = in_p.value()
+        in_p.drop()
+
+        if os.path.isdir(path):
+            self.__walk(os.path.abspath(path))
 
         return True
+
+    def __walk(self, root):
+        max_depth = self.param("maxDepth").get()
+        pattern = self.param("pattern").get()
+        regex = re.compile(self.param("regex").get()) if self.param("regex").get() else None
+        follow = self.param("followLinks").get()
+        with_stat = self.param("withStat").get()
+        file_out = self.output("file")
+        dir_out = self.output("directory")
+        stat_out = self.output("stat")
+
+        ## the directories are listed by the worker threads, only this thread sends packets
+        tasks = Queue.Queue()
+        results = Queue.Queue()
+        threads = []
+        for i in range(max(self.param("threads").get(), 1)):
+            th = threading.Thread(target=_scanWorker, args=(tasks, results, follow, with_stat))
+            th.daemon = True
+            th.start()
+            threads.append(th)
+
+        tasks.put((root, 0))
+        pending = 1
+
+        try:
+            while (pending):
+                path, depth, entries, err = results.get()
+                pending -= 1
+
+                if err is not None:
+                    self.warn("cannot list {} : {}".format(path, err))
+                    continue
+
+                files = []
+                dirs = []
+                stats = []
+                for name, fp, is_dir, descend, st in entries:
+                    if descend and (max_depth < 0 or depth < max_depth):
+                        tasks.put((fp, depth + 1))
+                        pending += 1
+
+                    if pattern and not fnmatch.fnmatch(name, pattern):
+                        continue
+
+                    fp = _toSlash(fp)
+                    if regex is not None and not regex.search(fp):
+                        continue
+
+                    if is_dir:
+                        dirs.append(fp)
+                    else:
+                        files.append(fp)
+
+                    if st is not None:
+                        stats.append({"path": fp, "directory": is_dir, "size": st.st_size, "mtime": st.st_mtime, "mode": st.st_mode})
+
+                if files:
+                    file_out.sendMany(files)
+                if dirs:
+                    dir_out.sendMany(dirs)
+                if stats:
+                    stat_out.sendMany(stats)
+        finally:
+            for th in threads:
+                tasks.put(None)
@@ -1,7 +1,8 @@
 from petitBloc import block
+import operator
 
 
-class Plus(block.Block):
+class Plus(block.BinaryBlock):
     def __init__(self):
         super(Plus, self).__init__()
 
@@ -10,43 +11,11 @@ class Plus(block.Block):
         self.addInput(float, "input2")
         self.addOutput(float, "result")
 
-    def run(self):
-        self.__i1_eop = False
-        self.__i2_eop = False
-        self.__v1 = None
-        self.__v2 = None
-        super(Plus, self).run()
+    def operation(self):
+        return operator.add
 
-    def process(self):
-        if not self.__i1_eop:
-            in1 = self.input("input1").receive()
-            if in1.isEOP():
-                self.__i1_eop = True
-            else:
-                self.__v1 = in1.value()
 
-        if self.__v1 is None:
-            return False
-
-        if not self.__i2_eop:
-            in2 = self.input("input2").receive()
-            if in2.isEOP():
-                self.__i2_eop = True
-            else:
-                self.__v2 = in2.value()
-
-        if self.__v2 is None:
-            return False
-
-        if self.__i1_eop and self.__i2_eop:
-            return False
-
-        self.output("result").send(self.__v1 + self.__v2)
-
-        return True
-
-
-class Minus(block.Block):
+class Minus(block.BinaryBlock):
     def __init__(self):
         super(Minus, self).__init__()
 
@@ -55,43 +24,11 @@ class Minus(block.Block):
         self.addInput(float, "input2")
         self.addOutput(float, "result")
 
-    def run(self):
-        self.__i1_eop = False
-        self.__i2_eop = False
-        self.__v1 = None
-        self.__v2 = None
-        super(Minus, self).run()
-
-    def process(self):
-        if not self.__i1_eop:
-            in1 = self.input("input1").receive()
-            if in1.isEOP():
-                self.__i1_eop = True
-            else:
-                self.__v1 = in1.value()
+    def operation(self):
+        return operator.sub
 
-        if self.__v1 is None:
-            return False
 
-        if not self.__i2_eop:
-            in2 = self.input("input2").receive()
-            if in2.isEOP():
-                self.__i2_eop = True
-            else:
-                self.__v2 = in2.value()
-
-        if self.__v2 is None:
-            return False
-
-        if self.__i1_eop and self.__i2_eop:
-            return False
-
-        self.output("result").send(self.__v1 - self.__v2)
-
-        return True
-
-
-class Multiply(block.Block):
+class Multiply(block.BinaryBlock):
     def __init__(self):
         super(Multiply, self).__init__()
 
@@ -100,43 +37,18 @@ class Multiply(block.Block):
         self.addInput(float, "input2")
         self.addOutput(float, "result")
 
-    def run(self):
-        self.__i1_eop = False
-        self.__i2_eop = False
-        self.__v1 = None
-        self.__v2 = None
-        super(Multiply, self).run()
-
-    def process(self):
-        if not self.__i1_eop:
-            in1 = self.input("input1").receive()
-            if in1.isEOP():
-                self.__i1_eop = True
-            else:
-                self.__v1 = in1.value()
-
-        if self.__v1 is None:
-            return False
+    def operation(self):
+        return operator.mul
 
-        if not self.__i2_eop:
-            in2 = self.input("input2").receive()
-            if in2.isEOP():
-                self.__i2_eop = True
-            else:
-                self.__v2 = in2.value()
 
-        if self.__v2 is None:
-            return False
+def _divide(v1, v2):
+    if v2 == 0:
+        return 0
 
-        if self.__i1_eop and self.__i2_eop:
-            return False
+    return v1 / v2
 
-        self.output("result").send(self.__v1 * self.__v2)
 
-        return True
-
-
-class Divide(block.Block):
+class Divide(block.BinaryBlock):
     def __init__(self):
         super(Divide, self).__init__()
 
@@ -145,47 +57,13 @@ class Divide(block.Block):
         self.addInput(float, "input2")
         self.addOutput(float, "result")
 
-    def run(self):
-        self.__i1_eop = False
-        self.__i2_eop = False
-        self.__v1 = None
-        self.__v2 = None
-        super(Divide, self).run()
-
-    def process(self):
-        if not self.__i1_eop:
-            in1 = self.input("input1").receive()
-            if in1.isEOP():
-                self.__i1_eop = True
-            else:
-                self.__v1 = in1.value()
-
-        if self.__v1 is None:
-            return False
-
-        if not self.__i2_eop:
-            in2 = self.input("input2").receive()
-            if in2.isEOP():
-                self.__i2_eop = True
-            else:
-                self.__v2 = in2.value()
-
-        if self.__v2 is None:
-            return False
-
-        if self.__i1_eop and self.__i2_eop:
-            return False
-
-        if self.__v2 == 0:
-            self.output("result").send(0)
-            return True
+    def operation(self):
+        return _divide
 
-        self.output("result").send(self.__v1 / self.__v2)
 
-        return True
+class Compare(block.BinaryBlock):
+    Operators = [operator.gt, operator.ge, operator.eq, operator.le, operator.lt]
 
-
-class Compare(block.Block):
     def __init__(self):
         super(Compare, self).__init__()
 
@@ -195,52 +73,9 @@ class Compare(block.Block):
         self.addOutput(bool, "result")
         self.addEnumParam("operator", [">", ">=", "==", "<=", "<"], value=2)
 
-    def run(self):
-        self.__i1_eop = False
-        self.__i2_eop = False
-        self.__v1 = None
-        self.__v2 = None
-        super(Compare, self).run()
-
-    def process(self):
-        if not self.__i1_eop:
-            in1 = self.input("input1").receive()
-            if in1.isEOP():
-                self.__i1_eop = True
-            else:
-                self.__v1 = in1.value()
-
-        if self.__v1 is None:
-            return False
-
-        if not self.__i2_eop:
-            in2 = self.input("input2").receive()
-            if in2.isEOP():
-                self.__i2_eop = True
-            else:
-                self.__v2 = in2.value()
-
-        if self.__v2 is None:
-            return False
-
-        if self.__i1_eop and self.__i2_eop:
-            return False
-
+    def operation(self):
         oper = self.param("operator").get()
+        if oper < 0 or oper >= len(Compare.Operators):
+            return operator.lt
 
-        if oper is 0:
-            self.output("result").send(self.__v1 > self.__v2)
-
-        elif oper is 1:
-            self.output("result").send(self.__v1 >= self.__v2)
-
-        elif oper is 2:
-            self.output("result").send(self.__v1 == self.__v2)
-
-        elif oper is 3:
-            self.output("result").send(self.__v1 <= self.__v2)
-
-        else:
-            self.output("result").send(self.__v1 < self.__v2)
-
-        return True
+        return Compare.Operators[oper]
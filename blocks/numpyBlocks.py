@@ -0,0 +1,177 @@
+from petitBloc import block
+import numpy
+
+
+class NdRange(block.Block):
+    def __init__(self):
+        super(NdRange, self).__init__()
+        self.setCacheable(True)
+
+    def initialize(self):
+        self.addParam(int, "start")
+        self.addParam(int, "stop")
+        self.addParam(int, "step")
+        self.addOutput(numpy.ndarray, "array")
+
+    def run(self):
+        step = self.param("step").get()
+        if step < 1:
+            step = 1
+
+        self.output("array").send(numpy.arange(self.param("start").get(), self.param("stop").get(), step))
+
+
+class FloatNdArray(block.Block):
+    def __init__(self):
+        super(FloatNdArray, self).__init__()
+        self.setCacheable(True)
+
+    def initialize(self):
+        self.addInput(float, "value")
+        self.addOutput(numpy.ndarray, "array")
+
+    def run(self):
+        values = []
+
+        inp = self.input("value")
+        while (True):
+            eop = False
+            for p in inp.receiveMany(1000):
+                if p.isEOP():
+                    eop = True
+                    break
+
+                values.append(p.value())
+
+            if eop:
+                break
+
+        self.output("array").send(numpy.array(values, dtype=numpy.float64))
+
+
+class NdArrayIter(block.Block):
+    def __init__(self):
+        super(NdArrayIter, self).__init__()
+        self.setCacheable(True)
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "array")
+        self.addOutput(float, "value")
+
+    def process(self):
+        arr = self.input("array").receive()
+        if arr.isEOP():
+            return False
+
+        self.output("value").sendMany(arr.value().ravel().tolist())
+
+        return True
+
+
+class NdPlus(block.BinaryBlock):
+    def __init__(self):
+        super(NdPlus, self).__init__()
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "input1")
+        self.addInput(numpy.ndarray, "input2")
+        self.addOutput(numpy.ndarray, "result")
+
+    def operation(self):
+        return numpy.add
+
+
+class NdMinus(block.BinaryBlock):
+    def __init__(self):
+        super(NdMinus, self).__init__()
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "input1")
+        self.addInput(numpy.ndarray, "input2")
+        self.addOutput(numpy.ndarray, "result")
+
+    def operation(self):
+        return numpy.subtract
+
+
+class NdMultiply(block.BinaryBlock):
+    def __init__(self):
+        super(NdMultiply, self).__init__()
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "input1")
+        self.addInput(numpy.ndarray, "input2")
+        self.addOutput(numpy.ndarray, "result")
+
+    def operation(self):
+        return numpy.multiply
+
+
+def _divide(v1, v2):
+    ## same as Divide, a division by zero gives 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        res = numpy.true_divide(v1, v2)
+
+    return numpy.where(v2 == 0, 0.0, res)
+
+
+class NdDivide(block.BinaryBlock):
+    def __init__(self):
+        super(NdDivide, self).__init__()
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "input1")
+        self.addInput(numpy.ndarray, "input2")
+        self.addOutput(numpy.ndarray, "result")
+
+    def operation(self):
+        return _divide
+
+
+class NdCompare(block.BinaryBlock):
+    Operators = [numpy.greater, numpy.greater_equal, numpy.equal, numpy.less_equal, numpy.less]
+
+    def __init__(self):
+        super(NdCompare, self).__init__()
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "input1")
+        self.addInput(numpy.ndarray, "input2")
+        self.addOutput(numpy.ndarray, "result")
+        self.addEnumParam("operator", [">", ">=", "==", "<=", "<"], value=2)
+
+    def operation(self):
+        oper = self.param("operator").get()
+        if oper < 0 or oper >= len(NdCompare.Operators):
+            return numpy.less
+
+        return NdCompare.Operators[oper]
+
+
+class NdReduce(block.Block):
+    Operators = [numpy.sum, numpy.mean, numpy.min, numpy.max, numpy.prod]
+
+    def __init__(self):
+        super(NdReduce, self).__init__()
+        self.setCacheable(True)
+
+    def initialize(self):
+        self.addInput(numpy.ndarray, "array")
+        self.addOutput(float, "result")
+        self.addEnumParam("operator", ["sum", "mean", "min", "max", "prod"], value=0)
+
+    def process(self):
+        arr = self.input("array").receive()
+        if arr.isEOP():
+            return False
+
+        value = arr.value()
+        oper = self.param("operator").get()
+
+        if value.size == 0 and oper not in (0, 4):
+            self.warn("cannot reduce an empty array")
+            return True
+
+        self.output("result").send(float(NdReduce.Operators[oper](value)))
+
+        return True
@@ -1,8 +1,8 @@
 from petitBloc import block
-import re
+import operator
 
 
-class StringAdd(block.Block):
+class StringAdd(block.BinaryBlock):
     def __init__(self):
         super(StringAdd, self).__init__()
 
@@ -11,45 +11,14 @@ class StringAdd(block.Block):
         self.addInput(str, "string2")
         self.addOutput(str, "result")
 
-    def run(self):
-        self.__str1_eop = False
-        self.__str2_eop = False
-        self.__str1_dmp = None
-        self.__str2_dmp = None
-        super(StringAdd, self).run()
-
-    def process(self):
-        if not self.__str1_eop:
-            in1 = self.input("string1").receive()
-            if in1.isEOP():
-                self.__str1_eop = True
-            else:
-                self.__str1_dmp = in1.value()
-
-        if self.__str1_dmp is None:
-            return False
-
-        if not self.__str2_eop:
-            in2 = self.input("string2").receive()
-            if in2.isEOP():
-                self.__str2_eop = True
-            else:
-                self.__str2_dmp = in2.value()
-
-        if self.__str2_dmp is None:
-            return False
-
-        if self.__str1_eop and self.__str2_eop:
-            return False
-
-        self.output("result").send(self.__str1_dmp + self.__str2_dmp)
-
-        return True
+    def operation(self):
+        return operator.add
 
 
 class StringReplace(block.Block):
     def __init__(self):
         super(StringReplace, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(str, "string")
@@ -102,6 +71,7 @@ class StringReplace(block.Block):
 class StringCount(block.Block):
     def __init__(self):
         super(StringCount, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(str, "string")
@@ -137,185 +107,89 @@ class StringCount(block.Block):
         return True
 
 
-class RegexFindAll(block.Block):
+class RegexFindAll(block.RegexBlock):
     def __init__(self):
         super(RegexFindAll, self).__init__()
 
     def initialize(self):
-        self.addInput(str, "string")
-        self.addInput(str, "pattern")
+        super(RegexFindAll, self).initialize()
         self.addOutput(str, "result")
 
-    def run(self):
-        self.__pattern_eop = False
-        self.__pattern_dmp = None
-        super(RegexFindAll, self).run()
+    def apply(self, regex, strings, args):
+        results = []
+        for s in strings:
+            results.extend(regex.findall(s))
 
-    def process(self):
-        in1 = self.input("string").receive()
-        if in1.isEOP():
-            return False
+        ## the tuples found by a pattern with several groups never passed the str port
+        if regex.groups > 1:
+            return
 
-        v1 = in1.value()
-        in1.drop()
+        if results:
+            self.output("result").sendMany(results)
 
-        if not self.__pattern_eop:
-            in2 = self.input("pattern").receive()
-            if in2.isEOP():
-                self.__pattern_eop = True
-            else:
-                self.__pattern_dmp = in2.value()
-                in2.drop()
-
-        if self.__pattern_dmp is None:
-            return False
-
-        for r in re.findall(self.__pattern_dmp, v1):
-            self.output("result").send(r)
 
-        return True
-
-
-class RegexSub(block.Block):
+class RegexSub(block.RegexBlock):
     def __init__(self):
         super(RegexSub, self).__init__()
 
     def initialize(self):
-        self.addInput(str, "string")
-        self.addInput(str, "pattern")
+        super(RegexSub, self).initialize()
         self.addInput(str, "replace")
         self.addOutput(str, "result")
 
-    def run(self):
-        self.__pattern_eop = False
-        self.__pattern_dmp = None
-        self.__replace_eop = False
-        self.__replace_dmp = None
-        super(RegexSub, self).run()
-
-    def process(self):
-        in1 = self.input("string").receive()
-        if in1.isEOP():
-            return False
-
-        v1 = in1.value()
-        in1.drop()
-
-        if not self.__pattern_eop:
-            in2 = self.input("pattern").receive()
-            if in2.isEOP():
-                self.__pattern_eop = True
-            else:
-                self.__pattern_dmp = in2.value()
-                in2.drop()
-
-        if self.__pattern_dmp is None:
-            return False
-
-        if not self.__replace_eop:
-            in2 = self.input("replace").receive()
-            if in2.isEOP():
-                self.__replace_eop = True
-            else:
-                self.__replace_dmp = in2.value()
-                in2.drop()
-
-        if self.__replace_dmp is None:
-            return False
-
-        self.output("result").send(re.sub(self.__pattern_dmp, self.__replace_dmp, v1))
-
-        return True
+    def apply(self, regex, strings, args):
+        sub = regex.sub
+        replace = args[0]
+        self.output("result").sendMany([sub(replace, s) for s in strings])
 
 
-class RegexSwitch(block.Block):
+class RegexSwitch(block.RegexBlock):
     def __init__(self):
         super(RegexSwitch, self).__init__()
 
     def initialize(self):
-        self.addInput(str, "string")
-        self.addInput(str, "pattern")
+        super(RegexSwitch, self).initialize()
         self.addOutput(str, "matched")
         self.addOutput(str, "unmatched")
 
-    def run(self):
-        self.__pattern_eop = False
-        self.__pattern_dmp = None
-        super(RegexSwitch, self).run()
-
-    def process(self):
-        in1 = self.input("string").receive()
-        if in1.isEOP():
-            return False
-
-        v1 = in1.value()
-        in1.drop()
-
-        if not self.__pattern_eop:
-            in2 = self.input("pattern").receive()
-            if in2.isEOP():
-                self.__pattern_eop = True
+    def apply(self, regex, strings, args):
+        search = regex.search
+        matched = []
+        unmatched = []
+        for s in strings:
+            if search(s):
+                matched.append(s)
             else:
-                self.__pattern_dmp = in2.value()
-                in2.drop()
+                unmatched.append(s)
 
-        if self.__pattern_dmp is None:
-            return False
-
-        if re.search(self.__pattern_dmp, v1):
-            self.output("matched").send(v1)
-        else:
-            self.output("unmatched").send(v1)
-
-        return True
+        if matched:
+            self.output("matched").sendMany(matched)
+        if unmatched:
+            self.output("unmatched").sendMany(unmatched)
 
 
-class RegexSearch(block.Block):
+class RegexSearch(block.RegexBlock):
     def __init__(self):
         super(RegexSearch, self).__init__()
 
     def initialize(self):
-        self.addInput(str, "string")
-        self.addInput(str, "pattern")
+        super(RegexSearch, self).initialize()
         self.addOutput(str, "result")
 
-    def run(self):
-        self.__pattern_eop = False
-        self.__pattern_dmp = None
-        super(RegexSearch, self).run()
-
-    def process(self):
-        in1 = self.input("string").receive()
-        if in1.isEOP():
-            return False
+    def apply(self, regex, strings, args):
+        search = regex.search
+        results = []
+        for s in strings:
+            res = search(s)
+            results.append(res.group(0) if res else "")
 
-        v1 = in1.value()
-        in1.drop()
-
-        if not self.__pattern_eop:
-            in2 = self.input("pattern").receive()
-            if in2.isEOP():
-                self.__pattern_eop = True
-            else:
-                self.__pattern_dmp = in2.value()
-                in2.drop()
-
-        if self.__pattern_dmp is None:
-            return False
-
-        res = re.search(self.__pattern_dmp, v1)
-        if not res:
-            self.output("result").send("")
-
-            return True
-
-        self.output("result").send(v1[res.start():res.end()])
-        return True
+        self.output("result").sendMany(results)
 
 
 class FloatToString(block.Block):
     def __init__(self):
         super(FloatToString, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(int, "demical", value=3)
@@ -341,6 +215,7 @@ class FloatToString(block.Block):
 class StringToFloat(block.Block):
     def __init__(self):
         super(StringToFloat, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addInput(str, "string")
@@ -4,6 +4,7 @@ from petitBloc import block
 class Int(block.Block):
     def __init__(self):
         super(Int, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(int, "value")
@@ -16,6 +17,7 @@ class Int(block.Block):
 class Float(block.Block):
     def __init__(self):
         super(Float, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(float, "value")
@@ -28,6 +30,7 @@ class Float(block.Block):
 class Boolean(block.Block):
     def __init__(self):
         super(Boolean, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(bool, "value")
@@ -40,6 +43,7 @@ class Boolean(block.Block):
 class String(block.Block):
     def __init__(self):
         super(String, self).__init__()
+        self.setCacheable(True)
 
     def initialize(self):
         self.addParam(str, "value")
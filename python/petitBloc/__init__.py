@@ -1,20 +1,23 @@
 import os
 
 
-def Run(path=None, multiProcessing=False, contexts=[], parameters=[], blocks=False, query=False, info=None, verbose=1):
-    from . import scene
+def Run(path=None, multiProcessing=False, contexts=[], parameters=[], blocks=False, query=False, info=None, verbose=1, cache=None):
+    ## the query commands do not need the scheduling modules
+    from . import catalog
 
     if blocks:
-        return scene.BlockList()
+        return catalog.BlockList()
 
     if info:
-        return scene.BlockInfo(info)
+        return catalog.BlockInfo(info)
 
     if (not path) or (not os.path.isfile(path)) or (os.path.splitext(path)[-1].lower() != ".blcs"):
         print("Invalid scene file : {}".format(path))
         return False
 
     if query:
-        return scene.Query(path)
+        return catalog.Query(path)
+
+    from . import scene
 
-    return scene.Run(path, contexts=contexts, parameters=parameters, verbose=verbose)
+    return scene.Run(path, contexts=contexts, parameters=parameters, verbose=verbose, cache=cache)
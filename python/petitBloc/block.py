@@ -13,3 +13,218 @@ class Block(component.Component):
     def initialize(self):
         # override this method
         pass
+
+
+class BinaryBlock(Block):
+    BatchSize = 1000
+
+    def __init__(self, name="", parent=None):
+        super(BinaryBlock, self).__init__(name=name, parent=parent)
+        self.setCacheable(True)
+        self.__reset()
+
+    def operation(self):
+        # override this method, returns a function taking the two input values
+        return None
+
+    def activate(self):
+        super(BinaryBlock, self).activate()
+        self.__reset()
+
+    def __reset(self):
+        self.__in1 = None
+        self.__in2 = None
+        self.__out = None
+        self.__oper = None
+        self.__values1 = []
+        self.__values2 = []
+        self.__eop1 = False
+        self.__eop2 = False
+        self.__v1 = None
+        self.__v2 = None
+
+    def __bind(self):
+        ## looked up once per run instead of once per packet
+        self.__in1 = self.input(0)
+        self.__in2 = self.input(1)
+        self.__out = self.output(0)
+        self.__oper = self.operation()
+
+    def __receive(self, port, values):
+        for p in port.receiveMany(BinaryBlock.BatchSize):
+            if p.isEOP():
+                return True
+
+            values.append(p.value())
+
+        return False
+
+    def process(self):
+        if self.__out is None:
+            self.__bind()
+
+        values1 = self.__values1
+        values2 = self.__values2
+
+        if not values1 and not self.__eop1:
+            self.__eop1 = self.__receive(self.__in1, values1)
+
+        if not values2 and not self.__eop2:
+            self.__eop2 = self.__receive(self.__in2, values2)
+
+        ## an input that never produced a value ends the stream
+        if self.__eop1 and self.__v1 is None and not values1:
+            return False
+
+        if self.__eop2 and self.__v2 is None and not values2:
+            return False
+
+        ## once an input has ended its last value is reused for the other
+        if values1 and values2:
+            num = min(len(values1), len(values2))
+            if num == len(values1) and num == len(values2):
+                results = map(self.__oper, values1, values2)
+            else:
+                results = map(self.__oper, values1[:num], values2[:num])
+
+            self.__v1 = values1[num - 1]
+            self.__v2 = values2[num - 1]
+            del values1[:num]
+            del values2[:num]
+
+        elif values1 and self.__eop2:
+            v2 = self.__v2
+            oper = self.__oper
+            results = [oper(v1, v2) for v1 in values1]
+            self.__v1 = values1[-1]
+            del values1[:]
+
+        elif values2 and self.__eop1:
+            v1 = self.__v1
+            oper = self.__oper
+            results = [oper(v1, v2) for v2 in values2]
+            self.__v2 = values2[-1]
+            del values2[:]
+
+        elif self.__eop1 and self.__eop2:
+            return False
+
+        else:
+            return True
+
+        self.__out.sendMany(results)
+
+        return True
+
+
+class RegexBlock(Block):
+    BatchSize = 1000
+
+    def __init__(self, name="", parent=None):
+        super(RegexBlock, self).__init__(name=name, parent=parent)
+        self.setCacheable(True)
+        self.__reset()
+
+    def initialize(self):
+        self.addInput(str, "string")
+        self.addInput(str, "pattern")
+        self.addParam(bool, "batch", False)
+
+    def apply(self, regex, strings, args):
+        # override this method, args holds the values of the inputs after the pattern
+        pass
+
+    def activate(self):
+        super(RegexBlock, self).activate()
+        self.__reset()
+
+    def __reset(self):
+        self.__string = None
+        self.__latches = None
+        self.__count = 1
+        self.__pattern = None
+        self.__regex = None
+
+    def __bind(self):
+        ## the inputs after the string reuse their last value once they have ended
+        self.__string = self.input(0)
+        self.__latches = map(lambda x: [x, False, None], list(self.inputs())[1:])
+        self.__count = RegexBlock.BatchSize if self.param("batch").get() else 1
+
+    def __receive(self, port, count):
+        if count == 1:
+            p = port.receive()
+            if p.isEOP():
+                return [], True
+
+            v = p.value()
+            p.drop()
+
+            return [v], False
+
+        values = []
+        while (len(values) < count):
+            for p in port.receiveMany(count - len(values)):
+                if p.isEOP():
+                    return values, True
+
+                values.append(p.value())
+                p.drop()
+
+        return values, False
+
+    def __compile(self, pattern):
+        ## the pattern rarely changes, it is only looked up again when it does
+        if self.__regex is None or pattern != self.__pattern:
+            self.__regex = util.RegexCache.Compile(pattern)
+            self.__pattern = pattern
+
+        return self.__regex
+
+    def process(self):
+        if self.__string is None:
+            self.__bind()
+
+        strings = []
+        eop = False
+        for p in self.__string.receiveMany(self.__count):
+            if p.isEOP():
+                eop = True
+                break
+
+            strings.append(p.value())
+            p.drop()
+
+        if not strings:
+            return False
+
+        columns = []
+        for latch in self.__latches:
+            values = []
+            if not latch[1]:
+                values, latch[1] = self.__receive(latch[0], len(strings))
+
+            if values:
+                latch[2] = values[-1]
+            elif latch[2] is None:
+                ## an input that never produced a value ends the stream
+                return False
+
+            columns.append(values + [latch[2]] * (len(strings) - len(values)))
+
+        if len(strings) == 1:
+            self.apply(self.__compile(columns[0][0]), strings, tuple(map(lambda x: x[0], columns[1:])))
+
+            return not eop
+
+        ## consecutive strings sharing the same pattern are handed over in one call
+        keys = zip(*columns)
+        start = 0
+        for i in xrange(1, len(strings) + 1):
+            if i < len(strings) and keys[i] == keys[start]:
+                continue
+
+            self.apply(self.__compile(keys[start][0]), strings[start:i], keys[start][1:])
+            start = i
+
+        return not eop
@@ -1,12 +1,13 @@
+import tempfile
+import json
 import imp
 import os
-from . import core
-from . import box
 from . import util
 
 
 class BlockManager(object):
     __Instance = None
+    RegistryVersion = 2
 
     def __new__(self):
         if BlockManager.__Instance is None:
@@ -18,10 +19,20 @@ class BlockManager(object):
     def __init__(self):
         super(BlockManager, self).__init__()
 
+    @staticmethod
+    def RegistryPath():
+        path = os.environ.get("PETITBLOC_REGISTRY", "")
+        if path:
+            return path
+
+        return os.path.join(os.path.expanduser("~"), ".petitBloc", "blockRegistry.json")
+
     def reload(self):
         self.__blocks = {}
         self.__modules = []
-        self.__loaded = []
+        self.__loaded = {}
+        self.__files = []
+        self.__failed = set()
         self.__finded_class = {"bool": bool, "int": int, "float": float, "str": str}
         self.__searchBlocks()
 
@@ -33,7 +44,31 @@ class BlockManager(object):
         return self.__blocks.has_key(name)
 
     def block(self, name):
-        return self.__blocks.get(name, {}).get("class")
+        info = self.__blocks.get(name)
+        if info is None:
+            return None
+
+        ## the module is imported when one of its blocks is used for the first time
+        if info.get("class") is None:
+            if info["file"] is None:
+                from . import box
+                info["class"] = getattr(box, name)
+                return info["class"]
+
+            module = self.__load(info["file"])
+            if module is None:
+                return None
+
+            content = getattr(module, name, None)
+            if not BlockManager.__IsBlockClass(content):
+                return None
+
+            info["class"] = content
+
+        return info["class"]
+
+    def blockInfo(self, name):
+        return self.__blocks.get(name, {}).get("info")
 
     def config(self, name):
         return self.__blocks.get(name, {}).get("config", {})
@@ -56,28 +91,52 @@ class BlockManager(object):
             return cls
 
         for mod in self.__modules:
-            if hasattr(mod, name):
-                self.__finded_class[name] = getattr(mod, name)
-                return getattr(mod, name)
+            cls = self.__findInModule(mod, name)
+            if cls is not None:
+                return cls
 
-            for cont_name in dir(mod):
-                content = getattr(mod, cont_name)
-                if not hasattr(content, "__file__"):
-                    continue
+        ## not defined by the imported modules, try the rest of the block modules
+        for py_path in self.__files:
+            if py_path in self.__loaded or py_path in self.__failed:
+                continue
 
-                if hasattr(content, name):
-                    self.__finded_class[name] = getattr(content, name)
-                    return getattr(content, name)
+            mod = self.__load(py_path)
+            if mod is None:
+                continue
+
+            cls = self.__findInModule(mod, name)
+            if cls is not None:
+                return cls
+
+        return None
+
+    def __findInModule(self, mod, name):
+        if hasattr(mod, name):
+            self.__finded_class[name] = getattr(mod, name)
+            return getattr(mod, name)
+
+        for cont_name in dir(mod):
+            content = getattr(mod, cont_name)
+            if not hasattr(content, "__file__"):
+                continue
+
+            if hasattr(content, name):
+                self.__finded_class[name] = getattr(content, name)
+                return getattr(content, name)
 
         return None
 
     def __searchBlocks(self):
-        self.__blocks["Box"] = {"class": box.Box, "config": {"category": "Scene"}}
-        self.__blocks["SceneContext"] = {"class": box.SceneContext, "config": {"category": "Scene"}}
+        ## the built-in boxes, imported on demand too
+        self.__blocks["Box"] = {"file": None, "class": None, "config": {"category": "Scene"}}
+        self.__blocks["SceneContext"] = {"file": None, "class": None, "config": {"category": "Scene"}}
 
         block_path = os.environ.get("PETITBLOC_BLOCK_PATH", "")
         built_in = os.path.abspath(os.path.join(__file__, "../blocks")).replace("\\", "/")
 
+        registry = self.__readRegistry()
+        changed = False
+
         for block_dir in [built_in] + filter(lambda x: x, block_path.split(os.pathsep)):
             if not os.path.isdir(block_dir):
                 continue
@@ -85,30 +144,145 @@ class BlockManager(object):
             for fp in os.listdir(block_dir):
                 if os.path.splitext(fp)[-1].lower() == ".py":
                     py_path = os.path.abspath(os.path.join(block_dir, fp)).replace("\\", "/")
-                    if py_path in self.__loaded:
+                    if py_path in self.__files:
                         continue
 
-                    self.__loaded.append(py_path)
+                    self.__files.append(py_path)
 
-                    configs = {}
                     config_path = os.path.splitext(py_path)[0] + ".config"
-                    if os.path.isfile(config_path):
-                        configs = util.LoadConfig(config_path)
-
-                    module = self.importModule(py_path)
+                    stamp = BlockManager.__Stamp(py_path, config_path)
+
+                    ## only new or modified modules are imported to find their blocks
+                    entry = registry.get(py_path)
+                    if entry is None or entry.get("stamp") != stamp:
+                        entry = self.__index(py_path, config_path, stamp)
+                        registry[py_path] = entry
+                        changed = True
+
+                    ## a module which failed to import is not tried again until it is modified
+                    if entry.get("failed"):
+                        self.__failed.add(py_path)
+                        continue
 
-                    for cont_name in dir(module):
+                    for cont_name, config, info in entry["blocks"]:
                         if self.__blocks.has_key(cont_name):
                             continue
 
-                        content = getattr(module, cont_name)
+                        self.__blocks[cont_name] = {"file": py_path, "class": None, "config": config, "info": info}
 
-                        if not hasattr(content, "getSchedule"):
-                            continue
+        for py_path in registry.keys():
+            if not os.path.isfile(py_path):
+                registry.pop(py_path)
+                changed = True
+
+        if changed:
+            self.__writeRegistry(registry)
+
+    def __index(self, py_path, config_path, stamp):
+        module = self.__load(py_path)
+        if module is None:
+            return {"stamp": stamp, "blocks": [], "failed": True}
+
+        configs = {}
+        if os.path.isfile(config_path):
+            configs = util.LoadConfig(config_path)
+
+        blocks = []
+        for cont_name in dir(module):
+            content = getattr(module, cont_name)
+            if BlockManager.__IsBlockClass(content):
+                blocks.append([cont_name, configs.get(cont_name, {}), BlockManager.__BlockInfo(content)])
+
+        return {"stamp": stamp, "blocks": blocks}
+
+    def __load(self, py_path):
+        if py_path in self.__loaded:
+            return self.__loaded[py_path]
+
+        module = self.importModule(py_path)
+        self.__loaded[py_path] = module
+
+        if module is not None:
+            self.__modules.append(module)
+
+        return module
+
+    @staticmethod
+    def __IsBlockClass(content):
+        from . import core
+
+        if not hasattr(content, "getSchedule"):
+            return False
+
+        return isinstance(content, type) and issubclass(content, core.ComponentBase)
+
+    @staticmethod
+    def __BlockInfo(cls):
+        ## ports and parameters are kept so a block can be described without importing it
+        try:
+            bloc = cls()
+            info = {"name": bloc.__class__.__name__}
+            info["inputs"] = map(lambda x: [x.name(), x.typeClass().__name__], bloc.inputs())
+            info["outputs"] = map(lambda x: [x.name(), x.typeClass().__name__], bloc.outputs())
+            info["params"] = map(lambda x: [x.name(), x.typeClass().__name__], bloc.params())
+        except Exception:
+            return None
+
+        return info
+
+    @staticmethod
+    def __Stamp(py_path, config_path):
+        st = os.stat(py_path)
+        config_mtime = os.path.getmtime(config_path) if os.path.isfile(config_path) else None
+
+        return [st.st_mtime, st.st_size, config_mtime]
+
+    def __readRegistry(self):
+        path = BlockManager.RegistryPath()
+        if not os.path.isfile(path):
+            return {}
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != BlockManager.RegistryVersion:
+            return {}
+
+        return data.get("files", {})
+
+    def __writeRegistry(self, registry):
+        path = BlockManager.RegistryPath()
+        dirname = os.path.dirname(os.path.abspath(path))
+
+        ## the registry is only a cache, a failure to write it is not an error
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+
+            fd, tmp = tempfile.mkstemp(prefix=".blockRegistry_", dir=dirname)
+        except Exception:
+            return False
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": BlockManager.RegistryVersion, "files": registry}, f)
+
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                ## rename does not replace an existing file on Windows
+                os.remove(path)
+                os.rename(tmp, path)
+        except Exception:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+
+            return False
 
-                        if issubclass(content, core.ComponentBase):
-                            self.__blocks[cont_name] = {"class": content, "config": configs.get(cont_name, {})}
-                            self.__modules.append(module)
+        return True
 
     def importModule(self, path):
         module = None
@@ -118,4 +292,4 @@ class BlockManager(object):
         except Exception as e:
             return None
 
-        return module
\ No newline at end of file
+        return module
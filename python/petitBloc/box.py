@@ -3,6 +3,8 @@ from . import component
 from . import util
 from . import core
 from . import const
+from . import parameter
+import collections
 import copy
 import re
 
@@ -32,21 +34,14 @@ class ProxyBlock(core.Proxy, component.Component):
     def __init__(self, direction, name="", parent=None):
         super(ProxyBlock, self).__init__(name=name, parent=parent)
         self.__ports = {}
+        self.__port_map = {}
         self.__direction = direction
 
     def output(self, name):
-        for pp in self.__ports.values():
-            if pp["out"].name() == name:
-                return pp["out"]
-
-        return None
+        return self.__port_map.get((ProxyBlock.Out, name))
 
     def input(self, name):
-        for pp in self.__ports.values():
-            if pp["in"].name() == name:
-                return pp["in"]
-
-        return None
+        return self.__port_map.get((ProxyBlock.In, name))
 
     def hasConnection(self, port):
         if self.isInProxy():
@@ -105,6 +100,9 @@ class ProxyBlock(core.Proxy, component.Component):
 
         if in_p is not None and out_p is not None:
             self.__ports[name] = {"in": in_p, "out": out_p, "end": False}
+            self.__port_map[(ProxyBlock.In, in_p.name())] = in_p
+            self.__port_map[(ProxyBlock.Out, out_p.name())] = out_p
+            core.Network.Changed()
             return (in_p, out_p)
 
         return (in_p, out_p)
@@ -114,20 +112,13 @@ class ProxyBlock(core.Proxy, component.Component):
         if not ports:
             return False
 
-        if self.__direction is ProxyBlock.In:
-            for c in ports["in"].chains():
-                c.src().parent().removeChain(c)
-                c.disconnect()
-            for c in ports["out"].chains():
-                self.parent().removeChain(c)
-                c.disconnect()
-        else:
-            for c in ports["in"].chains():
-                self.parent().removeChain(c)
-                c.disconnect()
-            for c in ports["out"].chains():
-                c.src().parent().removeChain(c)
-                c.disconnect()
+        self.__port_map.pop((ProxyBlock.In, ports["in"].name()), None)
+        self.__port_map.pop((ProxyBlock.Out, ports["out"].name()), None)
+        core.Network.Changed()
+
+        ## chains are owned by their ports, dropping the connection is enough
+        for c in list(ports["in"].chains()) + list(ports["out"].chains()):
+            c.disconnect()
 
         return True
 
@@ -161,6 +152,10 @@ class Box(component.Component):
         self.__blocks = []
         self.__in_proxy = ProxyBlock(ProxyBlock.In, name=const.InProxyBlock, parent=self)
         self.__out_proxy = ProxyBlock(ProxyBlock.Out, name=const.OutProxyBlock, parent=self)
+        self.__block_map = {const.InProxyBlock: self.__in_proxy, const.OutProxyBlock: self.__out_proxy}
+        self.__path_index = None
+        self.__schedule = None
+        self.__schedule_generation = None
 
     def __repr__(self):
         return self.__str__()
@@ -174,6 +169,19 @@ class Box(component.Component):
 
         return self.parent().ancestor()
 
+    def rename(self, name):
+        super(Box, self).rename(name)
+
+        ## every path under the root changes with its name
+        if self.parent() is None:
+            self.__path_index = None
+
+    def setParent(self, parent):
+        super(Box, self).setParent(parent)
+
+        ## only the root keeps the path index
+        self.__path_index = None
+
     def hasNetwork(self):
         return True
 
@@ -181,46 +189,70 @@ class Box(component.Component):
         return True
 
     def getSchedule(self):
+        if self.__schedule is None or self.__schedule_generation != core.Network.Generation():
+            self.__schedule = self.__makeSchedule()
+            self.__schedule_generation = core.Network.Generation()
+
+        return list(self.__schedule)
+
+    def __makeSchedule(self):
         schedule = []
-        initblocs = []
-        blocs = []
+        scheduled = set()
+        members = set(self.__blocks)
+
+        def push(items):
+            for item in items:
+                if item in scheduled:
+                    continue
+
+                scheduled.add(item)
+                schedule.append(item)
+
+        def linked(bloc, items):
+            res = []
+            for item in items:
+                if item in members and item != bloc and item not in res:
+                    res.append(item)
+
+            return res
 
         if self.__context is not None:
-            schedule.append(self.__context)
+            push([self.__context])
 
-        schedule.append(self.__in_proxy)
+        push([self.__in_proxy])
 
+        ## Kahn's algorithm over the upstream counts inside this box
+        counts = {}
+        downstreams = {}
         for bloc in self.__blocks:
-            if filter(lambda x : x != self, bloc.upstream()):
-                blocs.append(bloc)
-                continue
+            counts[bloc] = len(linked(bloc, bloc.upstream()))
+            downstreams[bloc] = linked(bloc, bloc.downstream())
 
-            initblocs.append(bloc)
+        ready = collections.deque(filter(lambda x: counts[x] == 0, self.__blocks))
+        done = set()
+        index = 0
 
-        for intbloc in initblocs:
-            all_downstreams = []
+        while (len(done) < len(self.__blocks)):
+            if not ready:
+                ## only blocks in a cycle are left, the first of them in the box order breaks it
+                while (self.__blocks[index] in done):
+                    index += 1
 
-            cur_blocs = [intbloc]
-            while (cur_blocs):
-                dns = []
-                for b in cur_blocs:
-                    all_downstreams += b.getSchedule()
-                    dns += filter(lambda x : x in self.__blocks, b.downstream())
+                ready.append(self.__blocks[index])
 
-                cur_blocs = dns
+            bloc = ready.popleft()
+            if bloc in done:
+                continue
 
-            for db in all_downstreams:
-                if db in blocs:
-                    blocs.remove(db)
-                if db in schedule:
-                    continue
-                schedule.append(db)
+            done.add(bloc)
+            push(bloc.getSchedule())
 
-        for bloc in blocs:
-            schedule.append(bloc.getSchedule())
+            for dn in downstreams[bloc]:
+                counts[dn] -= 1
+                if counts[dn] == 0 and dn not in done:
+                    ready.append(dn)
 
-        schedule.append(self.__out_proxy)
-        schedule.append(self)
+        push([self.__out_proxy, self])
 
         return schedule
 
@@ -232,13 +264,56 @@ class Box(component.Component):
             yield b
 
     def block(self, name):
-        for b in self.__blocks + [self.__in_proxy, self.__out_proxy]:
-            if b.name() == name:
-                return b
+        return self.__block_map.get(name)
 
-        return None
+    def __indexOf(self, bloc):
+        index = {bloc.path(): bloc}
+
+        if isinstance(bloc, Box):
+            for b in bloc.__block_map.values():
+                index.update(self.__indexOf(b))
+
+        return index
+
+    def __pathIndex(self):
+        if self.__path_index is None:
+            self.__path_index = {}
+            for b in self.__block_map.values():
+                self.__path_index.update(self.__indexOf(b))
+
+        return self.__path_index
+
+    def __addToIndex(self, bloc):
+        root = self.ancestor()
+        if root.__path_index is not None:
+            root.__path_index.update(self.__indexOf(bloc))
+
+    def __removeFromIndex(self, blockPath):
+        root = self.ancestor()
+        if root.__path_index is None:
+            return
+
+        prefix = blockPath + "/"
+        for pth in root.__path_index.keys():
+            if pth == blockPath or pth.startswith(prefix):
+                root.__path_index.pop(pth)
+
+    def blockRenamed(self, bloc, oldName):
+        if self.__block_map.get(oldName) != bloc:
+            return
+
+        self.__block_map.pop(oldName)
+        self.__block_map[bloc.name()] = bloc
+        self.__removeFromIndex("{}/{}".format(self.path(), oldName))
+        self.__addToIndex(bloc)
 
     def findBlock(self, blockPath):
+        if self.parent() is None:
+            if blockPath == self.path():
+                return self
+
+            return self.__pathIndex().get(blockPath)
+
         current_block = self
         blpt = blockPath
 
@@ -277,27 +352,41 @@ class Box(component.Component):
         if bloc in self.__blocks:
             return False
 
+        ## moving from another box
+        parent = bloc.parent()
+        if isinstance(parent, Box) and bloc in parent.__blocks:
+            parent.__release(bloc)
+
         bloc.rename(self.getUniqueName(bloc, bloc.name()))
         bloc.setParent(self)
         self.__blocks.append(bloc)
+        self.__block_map[bloc.name()] = bloc
+        self.__addToIndex(bloc)
+        core.Network.Changed()
         return True
 
+    def __release(self, bloc):
+        self.__removeFromIndex(bloc.path())
+        self.__blocks.remove(bloc)
+        if self.__block_map.get(bloc.name()) == bloc:
+            self.__block_map.pop(bloc.name())
+
+        bloc.setParent(None)
+        core.Network.Changed()
+
     def deleteBlock(self, bloc):
         if bloc not in self.__blocks:
             return False
 
-        self.__blocks.remove(bloc)
-        bloc.setParent(None)
+        self.__release(bloc)
 
         for ip in bloc.inputs():
-            for c in ip.chains():
+            for c in list(ip.chains()):
                 c.disconnect()
-                self.removeChain(c)
 
-        for op in bloc.inputs():
-            for c in op.chains():
+        for op in bloc.outputs():
+            for c in list(op.chains()):
                 c.disconnect()
-                self.removeChain(c)
 
         return True
 
@@ -310,11 +399,14 @@ class Box(component.Component):
 
         self.__context = SceneContext()
         self.__context.setParent(self)
+        core.Network.Changed()
 
         return self.__context
 
     def deleteContext(self):
         self.__context = None
+        core.Network.Changed()
+        parameter.Expression.Invalidate()
 
     def getContext(self):
         if self.__context is None:
@@ -0,0 +1,127 @@
+import re
+from . import blockManager
+from . import const
+from . import util
+
+
+ReBootNode = re.compile("^{}\/".format(const.RootBoxName))
+
+
+def __addRootPath(path):
+    if ReBootNode.search(path):
+        return path
+
+    return "/{}/{}".format(const.RootBoxName, path)
+
+
+def __printBlock(b):
+    print("    '{}'({})".format(__addRootPath(b["path"]), b["type"]))
+
+    for k, v in b.get("params", {}).iteritems():
+        if v["expression"]:
+            print("        {}@{}: {}".format(__addRootPath(b["path"]), k, str(v["expression"])))
+        else:
+            print("        {}@{}: {}".format(__addRootPath(b["path"]), k, str(v["value"])))
+    for k, v in b.get("extraParams", {}).iteritems():
+        if v["expression"]:
+            print("        {}@{}: {} ({})".format(__addRootPath(b["path"]), k, str(v["expression"]), str(v["type"])))
+        else:
+            print("        {}@{}: {} ({})".format(__addRootPath(b["path"]), k, str(v["value"]), str(v["type"])))
+
+
+def __query(filePath):
+    print("// Load : {}".format(filePath))
+
+    ## the file is read incrementally, the blocks are printed sorted by path as scene.Read does
+    blocks = []
+    connections = []
+    for key, value in util.StreamJson(filePath):
+        if key == "blocks":
+            blocks.append(value)
+
+        elif key == "connections":
+            connections.append(value)
+
+    if blocks:
+        print("# List Blocks")
+    for b in util.SortByPath(blocks):
+        __printBlock(b)
+
+    if connections:
+        print("# List Connections")
+    for con in util.SortByPath(connections):
+        print("    {} >> {}".format(__addRootPath(con["src"]), __addRootPath(con["path"])))
+
+
+def BlockInfo(blockType):
+    manager = blockManager.BlockManager()
+
+    info = manager.blockInfo(blockType)
+    if info is None:
+        return __blockInfo(manager, blockType)
+
+    print("# <{}>".format(info["name"]))
+
+    print("    InPort")
+    for name, type_name in info["inputs"]:
+        print("        '{}' ({})".format(name, type_name))
+    print("    OutPort")
+    for name, type_name in info["outputs"]:
+        print("        '{}' ({})".format(name, type_name))
+    print("    Parameter")
+    for name, type_name in info["params"]:
+        print("        '{}' ({})".format(name, type_name))
+
+    return True
+
+
+def __blockInfo(manager, blockType):
+    bc = manager.block(blockType)
+
+    if bc:
+        try:
+            bloc = bc()
+            print("# <{}>".format(bloc.__class__.__name__))
+
+            print("    InPort")
+            for inp in bloc.inputs():
+                print("        '{}' ({})".format(inp.name(), inp.typeClass().__name__))
+            print("    OutPort")
+            for inp in bloc.outputs():
+                print("        '{}' ({})".format(inp.name(), inp.typeClass().__name__))
+            print("    Parameter")
+            for param in bloc.params():
+                print("        '{}' ({})".format(param.name(), param.typeClass().__name__))
+
+        except Exception as e:
+            print("Warning : Could not create an instance of {}".format(blockType))
+            print(e)
+            return False
+
+    else:
+        print("Warning : Unknown block type : {}".format(blockType))
+        return False
+
+    return True
+
+
+def BlockList():
+    manager = blockManager.BlockManager()
+
+    print("# Block List")
+    for b in manager.blockNames():
+        print("    {}".format(b))
+
+    return True
+
+
+def Query(filePath):
+    try:
+        __query(filePath)
+
+    except Exception as e:
+        print("ERROR : {}".format(str(e)))
+
+        return False
+
+    return True
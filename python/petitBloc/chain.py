@@ -2,41 +2,248 @@ from numbers import Number
 from . import core
 from . import packet
 from . import workerManager
+import collections
+import heapq
+import Queue
+import threading
+import time
+import os
+
+
+class BatchFlusher(object):
+    ## one thread per process sends the partial batches once their latency passed
+    __Lock = threading.Lock()
+    __Condition = threading.Condition(__Lock)
+    __Deadlines = []
+    __Count = 0
+    __Pid = None
+
+    @staticmethod
+    def Schedule(chn, deadline):
+        if BatchFlusher.__Pid != os.getpid():
+            BatchFlusher.__Start()
+
+        with BatchFlusher.__Lock:
+            BatchFlusher.__Count += 1
+            heapq.heappush(BatchFlusher.__Deadlines, (deadline, BatchFlusher.__Count, chn))
+
+            if BatchFlusher.__Deadlines[0][1] == BatchFlusher.__Count:
+                BatchFlusher.__Condition.notify()
+
+    @staticmethod
+    def __Start():
+        ## the locks of the parent can be held by a thread which does not exist in a forked process
+        BatchFlusher.__Lock = threading.Lock()
+        BatchFlusher.__Condition = threading.Condition(BatchFlusher.__Lock)
+        BatchFlusher.__Deadlines = []
+        BatchFlusher.__Pid = os.getpid()
+
+        th = threading.Thread(target=BatchFlusher.__Run)
+        th.daemon = True
+        th.start()
+
+    @staticmethod
+    def __Run():
+        while (True):
+            with BatchFlusher.__Lock:
+                while (not BatchFlusher.__Deadlines):
+                    BatchFlusher.__Condition.wait()
+
+                wait = BatchFlusher.__Deadlines[0][0] - time.time()
+                if wait > 0:
+                    BatchFlusher.__Condition.wait(wait)
+                    continue
+
+                _, _, chn = heapq.heappop(BatchFlusher.__Deadlines)
+
+            chn.expire()
 
 
 class Chain(core.ChainBase):
     def __init__(self, srcPort, dstPort):
         super(Chain, self).__init__(srcPort, dstPort)
         self.__packets = None
+        self.__batch_size = None
+        self.__batch_latency = None
+        self.__capacity = None
+        self.__cur_batch_size = 1
+        self.__cur_batch_latency = 0
+        self.__bounded = False
+        self.__deadlock_timeout = 0
+        self.__wait = False
+        self.__src_path = None
+        self.__dst_path = None
+        self.__outgoing = []
+        self.__outgoing_time = 0
+        self.__outgoing_scheduled = False
+        self.__outgoing_lock = threading.Lock()
+        self.__incoming = collections.deque()
+
+    def setBatchSize(self, size):
+        self.__batch_size = size
+
+    def batchSize(self):
+        if self.__batch_size is None:
+            return workerManager.WorkerManager.BatchSize()
+
+        return self.__batch_size
+
+    def setBatchLatency(self, latency):
+        self.__batch_latency = latency
+
+    def batchLatency(self):
+        if self.__batch_latency is None:
+            return workerManager.WorkerManager.BatchLatency()
+
+        return self.__batch_latency
+
+    def setCapacity(self, capacity):
+        self.__capacity = capacity
+
+    def capacity(self):
+        if self.__capacity is None:
+            return workerManager.WorkerManager.ChainCapacity()
+
+        return self.__capacity
 
     def empty(self):
         if self.__packets is None:
             return True
 
+        if self.__incoming:
+            return False
+
         return self.__packets.empty()
 
     def disconnect(self):
         super(Chain, self).disconnect()
 
         if self.__packets is not None:
-            while (not self.__packets.empty()):
-                self.__packets.get().drop()
-
+            self.__dropAll()
             workerManager.WorkerManager.DeleteQueue(self.__packets)
             self.__packets = None
 
     def activate(self):
         if self.__packets is None:
-            self.__packets = workerManager.WorkerManager.CreateQueue()
+            self.__cur_batch_size = max(self.batchSize(), 1)
+            self.__cur_batch_latency = self.batchLatency()
+            self.__outgoing = []
+            self.__outgoing_scheduled = False
+            self.__incoming = collections.deque()
+            capacity = max(self.capacity(), 0)
+            self.__bounded = capacity > 0
+            self.__deadlock_timeout = workerManager.WorkerManager.DeadlockTimeout()
+            self.__wait = workerManager.WorkerManager.WaitEnabled()
+            self.__src_path = self.__blockPath(self.src())
+            self.__dst_path = self.__blockPath(self.dst())
+            self.__packets = workerManager.WorkerManager.CreateQueue(maxsize=capacity)
 
     def terminate(self):
         if self.__packets is not None:
-            while (not self.__packets.empty()):
-                self.__packets.get().drop()
-
+            self.__dropAll()
             workerManager.WorkerManager.DeleteQueue(self.__packets)
             self.__packets = None
 
+    def __blockPath(self, port):
+        if port is None or port.parent() is None:
+            return None
+
+        return port.parent().path()
+
+    def __dropAll(self):
+        for p in self.__outgoing:
+            p.drop()
+
+        for p in self.__incoming:
+            p.drop()
+
+        self.__outgoing = []
+        self.__incoming.clear()
+
+        while (not self.__packets.empty()):
+            p = self.__packets.get()
+            if isinstance(p, list):
+                for pp in p:
+                    pp.drop()
+            else:
+                p.drop()
+
+    def __put(self, item):
+        if not self.__bounded:
+            self.__packets.put(item)
+            return
+
+        try:
+            self.__packets.put(item, False)
+            return
+        except Queue.Full:
+            pass
+
+        start = time.time()
+        timeout = self.__deadlock_timeout if self.__deadlock_timeout > 0 else None
+        workerManager.WorkerManager.SetWaiting(self.__src_path, self.__dst_path)
+
+        try:
+            while (True):
+                try:
+                    self.__packets.put(item, True, timeout)
+                    break
+                except Queue.Full:
+                    pass
+
+                ## the timeout only sets how often the blocked blocks are checked, a slow
+                ## consumer keeps the bound and only a cycle of waiting blocks removes it
+                if not self.__isDeadlocked():
+                    continue
+
+                workerManager.WorkerManager.Warn(self.src().path(), "Deadlock detected : {} is full and {} waits on {}, removing its capacity".format(self.src().path(), self.__dst_path, self.__src_path))
+                self.__bounded = False
+                self.__packets.unbound()
+                self.__packets.forcePut(item)
+                break
+        finally:
+            workerManager.WorkerManager.SetWaiting(self.__src_path, None)
+
+        workerManager.WorkerManager.StallReport(self.src().path(), time.time() - start)
+
+    def __isDeadlocked(self):
+        if not workerManager.WorkerManager.IsDeadlocked(self.__src_path):
+            return False
+
+        ## the states are read one by one, a block leaving its wait can be missed once
+        time.sleep(0.01)
+
+        return workerManager.WorkerManager.IsDeadlocked(self.__src_path)
+
+    def __flush(self):
+        if self.__packets is None or not self.__outgoing:
+            return False
+
+        self.__put(self.__outgoing)
+        self.__outgoing = []
+
+        return True
+
+    def flush(self):
+        with self.__outgoing_lock:
+            return self.__flush()
+
+    def expire(self):
+        with self.__outgoing_lock:
+            if not self.__outgoing:
+                self.__outgoing_scheduled = False
+                return False
+
+            ## the batch it was scheduled for is already sent, wait for the current one
+            deadline = self.__outgoing_time + self.__cur_batch_latency
+            if deadline > time.time():
+                BatchFlusher.Schedule(self, deadline)
+                return False
+
+            self.__outgoing_scheduled = False
+
+            return self.__flush()
+
     def send(self, pack):
         if self.dst() is None:
             return False
@@ -46,12 +253,95 @@ class Chain(core.ChainBase):
 
         pack.pickUp()
 
-        self.__packets.put(pack)
+        if self.__cur_batch_size <= 1:
+            self.__put(pack)
+            return True
+
+        with self.__outgoing_lock:
+            if not self.__outgoing and self.__cur_batch_latency > 0:
+                self.__outgoing_time = time.time()
+                ## a producer slower than the latency would hold the batch until its next send,
+                ## each chain has one deadline at most which moves on to the open batch
+                if not self.__outgoing_scheduled:
+                    self.__outgoing_scheduled = True
+                    BatchFlusher.Schedule(self, self.__outgoing_time + self.__cur_batch_latency)
+
+            self.__outgoing.append(pack)
+
+            if len(self.__outgoing) >= self.__cur_batch_size:
+                self.__flush()
+
+            elif self.__cur_batch_latency > 0 and time.time() - self.__outgoing_time >= self.__cur_batch_latency:
+                self.__flush()
+
+        return True
+
+    def sendMany(self, packs):
+        if self.dst() is None:
+            return False
+
+        if self.__packets is None:
+            return False
+
+        if not packs:
+            return True
+
+        for p in packs:
+            p.pickUp()
+
+        self.flush()
+
+        size = self.__cur_batch_size
+        if size <= 1:
+            self.__put(list(packs))
+            return True
+
+        for i in range(0, len(packs), size):
+            self.__put(packs[i:i + size])
 
         return True
 
     def sendEOP(self):
-        return self.send(packet.EndOfPacket)
+        if self.dst() is None:
+            return False
+
+        if self.__packets is None:
+            return False
+
+        self.flush()
+
+        ## EOP is sent from the scheduling thread, which must not wait on a full chain
+        if self.__bounded:
+            self.__packets.forcePut(packet.EndOfPacket)
+        else:
+            self.__packets.put(packet.EndOfPacket)
+
+        return True
+
+    def __cast(self, p):
+        if self.needToCast() and not p.isEOP():
+            return packet.CastedPacket(p, self.dst().typeClass())
+
+        return p
+
+    def __get(self, timeout=None):
+        if not self.__wait:
+            p = self.__packets.get(timeout=timeout)
+        else:
+            try:
+                p = self.__packets.get(False)
+            except Queue.Empty:
+                workerManager.WorkerManager.SetWaiting(self.__dst_path, self.__src_path)
+                try:
+                    p = self.__packets.get(True, timeout)
+                finally:
+                    workerManager.WorkerManager.SetWaiting(self.__dst_path, None)
+
+        if isinstance(p, list):
+            self.__incoming.extend(p)
+            p = self.__incoming.popleft()
+
+        return p
 
     def receive(self, timeout=None):
         if self.src() is None:
@@ -60,8 +350,35 @@ class Chain(core.ChainBase):
         if self.__packets is None:
             return packet.EndOfPacket
 
-        p = self.__packets.get(timeout=timeout)
-        if self.needToCast() and not p.isEOP():
-            p = packet.CastedPacket(p, self.dst().typeClass())
+        if self.__incoming:
+            p = self.__incoming.popleft()
+        else:
+            p = self.__get(timeout=timeout)
 
-        return p
+        return self.__cast(p)
+
+    def receiveMany(self, count, timeout=None):
+        if self.src() is None:
+            return [packet.EndOfPacket]
+
+        if self.__packets is None:
+            return [packet.EndOfPacket]
+
+        if not self.__incoming:
+            self.__incoming.appendleft(self.__get(timeout=timeout))
+
+        packs = []
+        while (len(packs) < count):
+            if not self.__incoming:
+                if self.__packets.empty():
+                    break
+
+                self.__incoming.appendleft(self.__get())
+
+            p = self.__incoming.popleft()
+            packs.append(self.__cast(p))
+
+            if p.isEOP():
+                break
+
+        return packs
@@ -12,6 +12,12 @@ class Component(core.ComponentBase):
         self.__outputs = []
         self.__params = []
         self.__extraParams = []
+        self.__input_map = {}
+        self.__output_map = {}
+        self.__param_map = {}
+        ## memoization is opt-in, a block turns it on once its outputs only depend
+        ## on its parameters, its cacheKey and its inputs
+        self.__cacheable = False
         self.initialize()
 
     def debug(self, message):
@@ -26,6 +32,30 @@ class Component(core.ComponentBase):
     def getSchedule(self):
         return [self]
 
+    def setCacheable(self, value):
+        self.__cacheable = value
+
+    def cacheable(self):
+        return self.__cacheable
+
+    def cacheKey(self):
+        ## extra state the results depend on besides the parameters and inputs
+        return None
+
+    def rename(self, name):
+        old_name = self.name()
+        super(Component, self).rename(name)
+
+        parent = self.parent()
+        if parent is not None and parent.hasNetwork():
+            parent.blockRenamed(self, old_name)
+
+        parameter.Expression.Invalidate()
+
+    def setParent(self, parent):
+        super(Component, self).setParent(parent)
+        parameter.Expression.Invalidate()
+
     def activate(self):
         super(Component, self).activate()
         for inp in self.__inputs:
@@ -59,6 +89,7 @@ class Component(core.ComponentBase):
 
         p = port.InPort(typeClass, name=name, parent=self)
         self.__inputs.append(p)
+        self.__input_map[name] = p
 
         return p
 
@@ -71,13 +102,15 @@ class Component(core.ComponentBase):
         name = util.GetUniqueName(name, all_names)
 
         p = port.OutPort(typeClass, name=name, parent=self)
-        self.__outputs.append(p)    
+        self.__outputs.append(p)
+        self.__output_map[name] = p
 
         return p
 
     def removeInput(self, inPort):
         if inPort in self.__inputs:
             self.__inputs.remove(inPort)
+            self.__input_map.pop(inPort.name(), None)
             return True
 
         return False
@@ -85,6 +118,7 @@ class Component(core.ComponentBase):
     def removeOutput(self, outPort):
         if outPort in self.__outputs:
             self.__outputs.remove(outPort)
+            self.__output_map.pop(outPort.name(), None)
             return True
 
         return False
@@ -105,9 +139,7 @@ class Component(core.ComponentBase):
             return self.__outputs[index_or_name]
 
         if isinstance(index_or_name, basestring):
-            for p in self.__outputs:
-                if p.name() == index_or_name:
-                    return p
+            return self.__output_map.get(index_or_name)
 
         return None
 
@@ -119,9 +151,7 @@ class Component(core.ComponentBase):
             return self.__inputs[index_or_name]
 
         if isinstance(index_or_name, basestring):
-            for p in self.__inputs:
-                if p.name() == index_or_name:
-                    return p
+            return self.__input_map.get(index_or_name)
 
         return None
 
@@ -179,9 +209,12 @@ class Component(core.ComponentBase):
         if isinstance(name_or_param, core.ParameterBase):
             if name_or_param in self.__params:
                 self.__params.remove(name_or_param)
+                self.__param_map.pop(name_or_param.name(), None)
                 if name_or_param in self.__extraParams:
                     self.__extraParams.remove(name_or_param)
 
+                parameter.Expression.Invalidate()
+
                 return True
 
             return False
@@ -190,9 +223,12 @@ class Component(core.ComponentBase):
             p = self.param(name_or_param)
             if p:
                 self.__params.remove(p)
+                self.__param_map.pop(p.name(), None)
                 if p in self.__extraParams:
                     self.__extraParams.remove(p)
 
+                parameter.Expression.Invalidate()
+
                 return True
 
         return False
@@ -208,6 +244,8 @@ class Component(core.ComponentBase):
         p = parameter.Parameter(name, typeClass=typeClass, value=value, parent=self)
         if p:
             self.__params.append(p)
+            self.__param_map[name] = p
+            parameter.Expression.Invalidate()
 
         return p
 
@@ -222,6 +260,8 @@ class Component(core.ComponentBase):
         p = parameter.EnumParameter(name, valueList, value=value, parent=self)
         if p:
             self.__params.append(p)
+            self.__param_map[name] = p
+            parameter.Expression.Invalidate()
 
         return p
 
@@ -252,8 +292,6 @@ class Component(core.ComponentBase):
             return self.__params[index_or_name]
 
         if isinstance(index_or_name, basestring):
-            for p in self.__params:
-                if p.name() == index_or_name:
-                    return p
+            return self.__param_map.get(index_or_name)
 
         return None
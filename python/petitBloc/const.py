@@ -26,3 +26,24 @@ class LogLevel(enum.Enum):
 
     def __eq__(self, b):
         return self._value_ == b._value_
+
+
+class PacketMode(enum.Enum):
+    Copy = 0
+    Freeze = 1
+
+
+class HistoryMode(enum.Enum):
+    All = 0
+    Off = 1
+    First = 2
+    Last = 3
+    Reservoir = 4
+    Spill = 5
+
+
+class WaitState(enum.Enum):
+    NotStarted = 0
+    Running = 1
+    Finished = 2
+    Blocked = 3
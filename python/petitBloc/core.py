@@ -1,7 +1,41 @@
 from numbers import Number
+from . import frozen
+import itertools
 import copy
 
 
+SizeHintSamples = 64
+SizeHintDepth = 2
+
+
+def SizeHint(value, depth=SizeHintDepth):
+    if isinstance(value, basestring):
+        return len(value)
+
+    ## numpy arrays
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, long)):
+        return nbytes
+
+    if not isinstance(value, (list, tuple, dict, set, frozenset)):
+        return 0
+
+    count = len(value)
+    if count == 0:
+        return 0
+
+    if depth <= 0:
+        return count * 8
+
+    ## a large container is estimated from its first elements, a slot costs 8 bytes
+    if isinstance(value, dict):
+        samples = [8 + SizeHint(k, depth - 1) + SizeHint(v, depth - 1) for k, v in itertools.islice(value.iteritems(), SizeHintSamples)]
+    else:
+        samples = [8 + SizeHint(x, depth - 1) for x in itertools.islice(value, SizeHintSamples)]
+
+    return sum(samples) * count // len(samples)
+
+
 class Proxy():
     pass
 
@@ -10,6 +44,19 @@ class PBEnum():
     pass
 
 
+class Network(object):
+    __Generation = 0
+
+    @staticmethod
+    def Changed():
+        ## chains, blocks or proxies were added or removed
+        Network.__Generation += 1
+
+    @staticmethod
+    def Generation():
+        return Network.__Generation
+
+
 class ParameterBase(object):
     def __init__(self, name, typeClass=None, value=None, parent=None):
         super(ParameterBase, self).__init__()
@@ -40,6 +87,9 @@ class ParameterBase(object):
     def getExpression(self):
         return ""
 
+    def dependencies(self):
+        return []
+
     def ancestor(self):
         if self.__parent is None:
             return None
@@ -69,10 +119,18 @@ class ParameterBase(object):
 
 
 class PacketBase(object):
-    def __init__(self, value=None):
+    def __init__(self, value=None, freeze=False):
         super(PacketBase, self).__init__()
-        self.__value = value
         self.__type_class = value.__class__
+        self.__value = value
+        self.__need_to_copy = not frozen.IsImmutable(value)
+
+        if freeze and self.__need_to_copy:
+            try:
+                self.__value = frozen.Freeze(value)
+                self.__need_to_copy = False
+            except TypeError:
+                pass
 
     def __repr__(self):
         self.__str__()
@@ -83,7 +141,13 @@ class PacketBase(object):
     def typeClass(self):
         return self.__type_class
 
+    def sizeHint(self):
+        return SizeHint(self.__value)
+
     def value(self):
+        if not self.__need_to_copy:
+            return self.__value
+
         return copy.deepcopy(self.__value)
 
     def _del(self):
@@ -147,9 +211,18 @@ class PortBase(object):
     def send(self):
         return False
 
+    def sendMany(self, values):
+        return False
+
+    def flush(self):
+        return False
+
     def receive(self):
         return None
 
+    def receiveMany(self, count):
+        return []
+
     def typeClass(self):
         return self.__type_class
 
@@ -171,6 +244,9 @@ class PortBase(object):
     def packetHistory(self):
         return []
 
+    def reachedEOP(self):
+        return False
+
 
 class ChainBase(object):
     def __new__(self, srcPort, dstPort):
@@ -190,6 +266,7 @@ class ChainBase(object):
 
         srcPort.connect(self)
         dstPort.connect(self)
+        Network.Changed()
 
         if srcPort.typeClass() != dstPort.typeClass():
             self.__need_to_cast = True
@@ -211,6 +288,7 @@ class ChainBase(object):
         self.__dst.disconnect(self)
         self.__src = None
         self.__dst = None
+        Network.Changed()
 
     def activate(self):
         pass
@@ -221,12 +299,21 @@ class ChainBase(object):
     def send(self, pack):
         return False
 
+    def sendMany(self, packs):
+        return False
+
     def sendEOP(self):
         return False
 
+    def flush(self):
+        return False
+
     def receive(self, timeout=None):
         return None
 
+    def receiveMany(self, count, timeout=None):
+        return []
+
     def needToCast(self):
         return self.__need_to_cast
 
@@ -267,6 +354,9 @@ class ComponentBase(object):
     def expandable(self):
         return False
 
+    def cacheable(self):
+        return False
+
     def rename(self, name):
         self.__name = name
 
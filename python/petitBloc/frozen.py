@@ -0,0 +1,120 @@
+import types
+import sys
+
+
+ImmutableTypes = (types.NoneType, bool, int, long, float, complex, str, unicode)
+
+
+def _isNdArray(value):
+    ## numpy is optional and slow to import, an array can only exist once it is loaded
+    numpy = sys.modules.get("numpy")
+    if numpy is None:
+        return False
+
+    return isinstance(value, numpy.ndarray)
+
+
+def _readOnly(self, *args, **kwargs):
+    raise TypeError("'{}' is read-only, copy it before modifying".format(self.__class__.__name__))
+
+
+class FrozenList(list):
+    __setitem__ = _readOnly
+    __delitem__ = _readOnly
+    __setslice__ = _readOnly
+    __delslice__ = _readOnly
+    __iadd__ = _readOnly
+    __imul__ = _readOnly
+    append = _readOnly
+    extend = _readOnly
+    insert = _readOnly
+    pop = _readOnly
+    remove = _readOnly
+    reverse = _readOnly
+    sort = _readOnly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self), ))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+
+class FrozenDict(dict):
+    __setitem__ = _readOnly
+    __delitem__ = _readOnly
+    clear = _readOnly
+    pop = _readOnly
+    popitem = _readOnly
+    setdefault = _readOnly
+    update = _readOnly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self), ))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __hash__(self):
+        return hash(frozenset(self.iteritems()))
+
+
+def IsImmutable(value):
+    if isinstance(value, ImmutableTypes):
+        return True
+
+    if isinstance(value, (FrozenList, FrozenDict)):
+        return True
+
+    ## a read-only array which owns its data cannot be changed through another view
+    if _isNdArray(value):
+        return not value.flags.writeable and value.base is None and value.dtype != object
+
+    if isinstance(value, (tuple, frozenset)):
+        for v in value:
+            if not IsImmutable(v):
+                return False
+
+        return True
+
+    return False
+
+
+def Freeze(value):
+    if isinstance(value, ImmutableTypes):
+        return value
+
+    if isinstance(value, (FrozenList, FrozenDict)):
+        return value
+
+    if isinstance(value, list):
+        return FrozenList([Freeze(v) for v in value])
+
+    if isinstance(value, tuple):
+        return tuple([Freeze(v) for v in value])
+
+    if isinstance(value, dict):
+        return FrozenDict([(k, Freeze(v)) for k, v in value.iteritems()])
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset([Freeze(v) for v in value])
+
+    if _isNdArray(value) and value.dtype != object:
+        if IsImmutable(value):
+            return value
+
+        arr = value.copy()
+        arr.flags.writeable = False
+
+        return arr
+
+    raise TypeError("cannot freeze '{}'".format(value.__class__.__name__))
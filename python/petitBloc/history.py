@@ -0,0 +1,213 @@
+from . import const
+from . import workerManager
+import collections
+import tempfile
+import cPickle
+import random
+import os
+
+
+class Capture(object):
+    def __init__(self, size=0):
+        super(Capture, self).__init__()
+        self.__size = size
+        self.__queue = None
+        self.__values = []
+
+    def size(self):
+        return self.__size
+
+    def activate(self):
+        self.__values = []
+        self.__queue = workerManager.WorkerManager.CreateQueue()
+
+    def record(self, pack):
+        self.__queue.put(pack.value())
+
+    def flush(self):
+        pass
+
+    def terminate(self):
+        if self.__queue is None:
+            return
+
+        while (not self.__queue.empty()):
+            self._collect(self.__queue.get())
+
+        workerManager.WorkerManager.DeleteQueue(self.__queue)
+        self.__queue = None
+
+    def release(self):
+        if self.__queue is not None:
+            workerManager.WorkerManager.DeleteQueue(self.__queue)
+            self.__queue = None
+
+        self.__values = []
+
+    def values(self):
+        return list(self.__values)
+
+    def _put(self, value):
+        self.__queue.put(value)
+
+    def _collect(self, value):
+        self.__values.append(value)
+
+    def _clear(self):
+        self.__values = []
+
+
+class FirstCapture(Capture):
+    def __init__(self, size=0):
+        super(FirstCapture, self).__init__(size=size)
+        self.__count = 0
+
+    def activate(self):
+        super(FirstCapture, self).activate()
+        self.__count = 0
+
+    def record(self, pack):
+        if self.__count >= self.size():
+            return
+
+        self.__count += 1
+        self._put(pack.value())
+
+
+class LastCapture(Capture):
+    def __init__(self, size=0):
+        super(LastCapture, self).__init__(size=size)
+        self.__ring = collections.deque(maxlen=size)
+
+    def activate(self):
+        super(LastCapture, self).activate()
+        self.__ring = collections.deque(maxlen=self.size())
+
+    def record(self, pack):
+        self.__ring.append(pack.value())
+
+    def flush(self):
+        ## the ring lives in the worker, a copy of it is handed to the main process in one piece
+        ## and the ring is kept, so a flush in the middle of a run does not split it
+        if self.__ring:
+            self._put(list(self.__ring))
+
+    def _collect(self, values):
+        ## every copy replaces the previous one
+        self._clear()
+        for v in values:
+            super(LastCapture, self)._collect(v)
+
+
+class ReservoirCapture(Capture):
+    def __init__(self, size=0):
+        super(ReservoirCapture, self).__init__(size=size)
+        self.__reservoir = []
+        self.__count = 0
+        self.__random = None
+
+    def activate(self):
+        super(ReservoirCapture, self).activate()
+        self.__reservoir = []
+        self.__count = 0
+        self.__random = None
+
+    def record(self, pack):
+        self.__count += 1
+
+        if len(self.__reservoir) < self.size():
+            self.__reservoir.append(pack.value())
+            return
+
+        ## seeded in the worker so forked processes do not share one sequence
+        if self.__random is None:
+            self.__random = random.Random()
+
+        index = self.__random.randint(0, self.__count - 1)
+        if index < self.size():
+            self.__reservoir[index] = pack.value()
+
+    def flush(self):
+        ## the sample keeps going after a flush in the middle of a run to stay uniform
+        if self.__reservoir:
+            self._put(list(self.__reservoir))
+
+    def _collect(self, values):
+        self._clear()
+        for v in values:
+            super(ReservoirCapture, self)._collect(v)
+
+
+class SpillCapture(Capture):
+    def __init__(self, size=0):
+        super(SpillCapture, self).__init__(size=size)
+        self.__path = None
+        self.__file = None
+
+    def activate(self):
+        self.release()
+
+        fd, self.__path = tempfile.mkstemp(prefix="petitBloc_history_")
+        os.close(fd)
+
+    def record(self, pack):
+        if self.__file is None:
+            self.__file = open(self.__path, "ab")
+
+        cPickle.dump(pack.value(), self.__file, cPickle.HIGHEST_PROTOCOL)
+
+    def flush(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def terminate(self):
+        self.flush()
+
+    def release(self):
+        self.flush()
+
+        if self.__path is not None:
+            if os.path.isfile(self.__path):
+                os.remove(self.__path)
+
+            self.__path = None
+
+    def path(self):
+        return self.__path
+
+    def values(self):
+        values = []
+        if self.__path is None or not os.path.isfile(self.__path):
+            return values
+
+        with open(self.__path, "rb") as f:
+            while (True):
+                try:
+                    values.append(cPickle.load(f))
+                except EOFError:
+                    break
+
+        return values
+
+    def __del__(self):
+        self.release()
+
+
+def CreateCapture(mode, size=0):
+    if mode == const.HistoryMode.Off:
+        return None
+
+    if mode == const.HistoryMode.First:
+        return FirstCapture(size)
+
+    if mode == const.HistoryMode.Last:
+        return LastCapture(size)
+
+    if mode == const.HistoryMode.Reservoir:
+        return ReservoirCapture(size)
+
+    if mode == const.HistoryMode.Spill:
+        return SpillCapture(size)
+
+    return Capture(size)
@@ -0,0 +1,486 @@
+from . import core
+import collections
+import tempfile
+import hashlib
+import cPickle
+import sys
+import os
+
+try:
+    import fcntl as _fcntl
+except ImportError:
+    _fcntl = None
+
+
+class Recording(object):
+    def __init__(self):
+        super(Recording, self).__init__()
+        self.__file = None
+        fd, self.__path = tempfile.mkstemp(prefix="petitBloc_memo_")
+        os.close(fd)
+
+    def record(self, name, value):
+        if self.__file is None:
+            self.__file = open(self.__path, "ab")
+
+        cPickle.dump((name, value), self.__file, cPickle.HIGHEST_PROTOCOL)
+
+    def flush(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def size(self):
+        if self.__path is None or not os.path.isfile(self.__path):
+            return 0
+
+        return os.path.getsize(self.__path)
+
+    def load(self):
+        outputs = {}
+        if self.__path is None or not os.path.isfile(self.__path):
+            return outputs
+
+        with open(self.__path, "rb") as f:
+            while (True):
+                try:
+                    name, value = cPickle.load(f)
+                except EOFError:
+                    break
+
+                outputs.setdefault(name, []).append(value)
+
+        return outputs
+
+    def release(self):
+        self.flush()
+
+        if self.__path is not None:
+            if os.path.isfile(self.__path):
+                os.remove(self.__path)
+
+            self.__path = None
+
+
+class Replay(object):
+    ChunkSize = 1000
+
+    def __init__(self, outputs):
+        super(Replay, self).__init__()
+        self.__outputs = outputs
+
+    def run(self, bloc):
+        for name, values in self.__outputs.iteritems():
+            port = bloc.output(name)
+            if port is None:
+                continue
+
+            for i in range(0, len(values), Replay.ChunkSize):
+                port.sendMany(values[i:i + Replay.ChunkSize])
+
+
+class DiskStore(object):
+    Extension = ".memo"
+    SizeFile = "size"
+
+    def __init__(self, directory, maxSize):
+        super(DiskStore, self).__init__()
+        self.__directory = os.path.abspath(directory)
+        self.__max_size = maxSize
+
+    def directory(self):
+        return self.__directory
+
+    def setMaxSize(self, size):
+        self.__max_size = size
+
+    def maxSize(self):
+        return self.__max_size
+
+    def __path(self, fingerprint):
+        return os.path.join(self.__directory, fingerprint[:2], fingerprint + DiskStore.Extension)
+
+    def get(self, fingerprint):
+        path = self.__path(fingerprint)
+
+        ## another process may evict the entry at any time, treat it as a miss
+        try:
+            with open(path, "rb") as f:
+                outputs = cPickle.load(f)
+                size = f.tell()
+
+            os.utime(path, None)
+        except Exception:
+            return None
+
+        return (outputs, size)
+
+    def put(self, fingerprint, outputs):
+        path = self.__path(fingerprint)
+        dirname = os.path.dirname(path)
+
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+        except OSError:
+            if not os.path.isdir(dirname):
+                return False
+
+        ## write next to the target and rename, readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(prefix=".petitBloc_", dir=dirname)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                cPickle.dump(outputs, f, cPickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+
+            try:
+                size -= os.path.getsize(path)
+            except OSError:
+                pass
+
+            os.rename(tmp, path)
+        except Exception:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+
+            return False
+
+        ## the directory is walked only once the running total goes over the limit
+        total = self.__updateSize(delta=size)
+        if total is None or total > self.__max_size:
+            self.evict()
+
+        return True
+
+    def __updateSize(self, delta=0, total=None):
+        ## the total of the entries is kept in a small file shared by every process using
+        ## the directory, it is locked while it is updated when the platform supports it
+        try:
+            if not os.path.isdir(self.__directory):
+                os.makedirs(self.__directory)
+
+            fd = os.open(os.path.join(self.__directory, DiskStore.SizeFile), os.O_RDWR | os.O_CREAT, 0666)
+        except OSError:
+            return None
+
+        try:
+            if _fcntl is not None:
+                _fcntl.lockf(fd, _fcntl.LOCK_EX)
+
+            if total is None:
+                data = os.read(fd, 64).strip()
+                try:
+                    total = int(data) + delta
+                except ValueError:
+                    ## a new or broken size file starts from the entries on disk
+                    total = self.size()
+
+            ## fixed width, so the file never has to be truncated
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, "{:20d}".format(max(total, 0)))
+
+            return total
+        except (OSError, IOError):
+            return None
+        finally:
+            os.close(fd)
+
+    def entries(self):
+        entries = []
+        for root, _, files in os.walk(self.__directory):
+            for f in files:
+                if not f.endswith(DiskStore.Extension):
+                    continue
+
+                path = os.path.join(root, f)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+
+                entries.append((st.st_mtime, st.st_size, path))
+
+        return entries
+
+    def size(self):
+        return sum(map(lambda x: x[1], self.entries()))
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(map(lambda x: x[1], entries))
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.__max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            total -= size
+
+        self.__updateSize(total=total)
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        self.__updateSize(total=0)
+
+
+class MemoManager(object):
+    __Enabled = False
+    __MaxEntries = 256
+    __MaxSize = 512 * 1024 * 1024
+    __Entries = collections.OrderedDict()
+    __Size = 0
+    __Hits = 0
+    __Misses = 0
+    __DiskHits = 0
+    __DiskStore = None
+    __MaxDiskSize = 1024 * 1024 * 1024
+
+    @staticmethod
+    def SetEnabled(value):
+        MemoManager.__Enabled = value
+
+    @staticmethod
+    def Enabled():
+        return MemoManager.__Enabled
+
+    @staticmethod
+    def SetMaxEntries(num):
+        MemoManager.__MaxEntries = max(num, 0)
+        MemoManager.__Evict()
+
+    @staticmethod
+    def MaxEntries():
+        return MemoManager.__MaxEntries
+
+    @staticmethod
+    def SetMaxSize(size):
+        MemoManager.__MaxSize = max(size, 0)
+        MemoManager.__Evict()
+
+    @staticmethod
+    def MaxSize():
+        return MemoManager.__MaxSize
+
+    @staticmethod
+    def SetDirectory(directory):
+        if not directory:
+            MemoManager.__DiskStore = None
+            return
+
+        MemoManager.__DiskStore = DiskStore(directory, MemoManager.__MaxDiskSize)
+
+    @staticmethod
+    def Directory():
+        if MemoManager.__DiskStore is None:
+            return None
+
+        return MemoManager.__DiskStore.directory()
+
+    @staticmethod
+    def SetMaxDiskSize(size):
+        MemoManager.__MaxDiskSize = max(size, 0)
+        if MemoManager.__DiskStore is not None:
+            MemoManager.__DiskStore.setMaxSize(MemoManager.__MaxDiskSize)
+            MemoManager.__DiskStore.evict()
+
+    @staticmethod
+    def MaxDiskSize():
+        return MemoManager.__MaxDiskSize
+
+    @staticmethod
+    def Clear():
+        MemoManager.__Entries = collections.OrderedDict()
+        MemoManager.__Size = 0
+        MemoManager.__Hits = 0
+        MemoManager.__Misses = 0
+        MemoManager.__DiskHits = 0
+
+    @staticmethod
+    def ClearDisk():
+        if MemoManager.__DiskStore is not None:
+            MemoManager.__DiskStore.clear()
+
+    @staticmethod
+    def Stats():
+        stats = {"hits": MemoManager.__Hits, "misses": MemoManager.__Misses, "diskHits": MemoManager.__DiskHits, "entries": len(MemoManager.__Entries), "size": MemoManager.__Size}
+        if MemoManager.__DiskStore is not None:
+            stats["diskSize"] = MemoManager.__DiskStore.size()
+
+        return stats
+
+    @staticmethod
+    def IsCacheable(bloc):
+        if isinstance(bloc, core.Proxy) or bloc.expandable():
+            return False
+
+        ## a block without outputs only runs for its side effects
+        if not list(bloc.outputs()):
+            return False
+
+        return bloc.cacheable()
+
+    @staticmethod
+    def Fingerprint(bloc, fingerprints=None):
+        """Returns a key of a block run or None when it must not be cached.
+
+        The inputs are identified by the fingerprints of the upstream blocks and
+        not by hashing the received streams, so nothing is read before a hit and
+        a large stream costs nothing to key. This only holds for deterministic
+        blocks, which is why memoization is opt-in by setCacheable(True), and
+        why anything downstream of a block which does not opt in is not cached.
+        """
+        if fingerprints is None:
+            fingerprints = {}
+
+        if bloc in fingerprints:
+            return fingerprints[bloc]
+
+        ## reached again through a cycle
+        fingerprints[bloc] = None
+
+        if not isinstance(bloc, core.Proxy) and not MemoManager.IsCacheable(bloc):
+            return None
+
+        params = []
+        for p in bloc.params():
+            params.append((p.name(), p.get()))
+
+        inputs = []
+        for inp in bloc.inputs():
+            srcs = []
+            for chn in inp.chains():
+                src = chn.src()
+                if src is None:
+                    continue
+
+                ## the stream of an input is identified by the upstream that produces it
+                up = MemoManager.Fingerprint(src.parent(), fingerprints)
+                if up is None:
+                    return None
+
+                srcs.append((up, src.name()))
+
+            inputs.append((inp.name(), srcs))
+
+        key = (MemoManager.__TypeKey(bloc), bloc.cacheKey(), sorted(params), inputs)
+        fingerprints[bloc] = hashlib.sha1(repr(key)).hexdigest()
+
+        return fingerprints[bloc]
+
+    @staticmethod
+    def __TypeKey(bloc):
+        ## results stored on disk must not outlive a change of the block code
+        mtime = None
+        module = sys.modules.get(bloc.__class__.__module__)
+        module_file = getattr(module, "__file__", None)
+        if module_file:
+            module_file = os.path.splitext(module_file)[0] + ".py"
+            if os.path.isfile(module_file):
+                mtime = os.path.getmtime(module_file)
+
+        return ("{}.{}".format(bloc.__class__.__module__, bloc.__class__.__name__), mtime)
+
+    @staticmethod
+    def Lookup(fingerprint):
+        entry = MemoManager.__Entries.pop(fingerprint, None)
+        if entry is None and MemoManager.__DiskStore is not None:
+            disk_entry = MemoManager.__DiskStore.get(fingerprint)
+            if disk_entry is not None:
+                MemoManager.__DiskHits += 1
+                MemoManager.__Hits += 1
+                MemoManager.__Store(fingerprint, disk_entry[0], disk_entry[1])
+
+                return disk_entry[0]
+
+        if entry is None:
+            MemoManager.__Misses += 1
+            return None
+
+        MemoManager.__Entries[fingerprint] = entry
+        MemoManager.__Hits += 1
+
+        return entry[0]
+
+    @staticmethod
+    def Store(fingerprint, outputs, size):
+        MemoManager.__Store(fingerprint, outputs, size)
+
+        if MemoManager.__DiskStore is not None:
+            MemoManager.__DiskStore.put(fingerprint, outputs)
+
+    @staticmethod
+    def __Store(fingerprint, outputs, size):
+        old = MemoManager.__Entries.pop(fingerprint, None)
+        if old is not None:
+            MemoManager.__Size -= old[1]
+
+        MemoManager.__Entries[fingerprint] = (outputs, size)
+        MemoManager.__Size += size
+        MemoManager.__Evict()
+
+    @staticmethod
+    def __Evict():
+        while (MemoManager.__Entries):
+            if len(MemoManager.__Entries) <= MemoManager.__MaxEntries and MemoManager.__Size <= MemoManager.__MaxSize:
+                break
+
+            _, old = MemoManager.__Entries.popitem(last=False)
+            MemoManager.__Size -= old[1]
+
+
+class MemoSchedule(object):
+    def __init__(self, schedule):
+        super(MemoSchedule, self).__init__()
+        self.__fingerprints = {}
+        self.__recordings = {}
+
+        for bloc in schedule:
+            if MemoManager.IsCacheable(bloc):
+                MemoManager.Fingerprint(bloc, self.__fingerprints)
+
+    def fingerprint(self, bloc):
+        return self.__fingerprints.get(bloc)
+
+    def prepare(self, bloc):
+        if not MemoManager.IsCacheable(bloc):
+            return None
+
+        fp = self.__fingerprints.get(bloc)
+        if fp is None:
+            return None
+
+        outputs = MemoManager.Lookup(fp)
+        if outputs is not None:
+            return Replay(outputs)
+
+        recording = Recording()
+        for out in bloc.outputs():
+            out.setRecorder(recording)
+
+        self.__recordings[bloc] = recording
+
+        return None
+
+    def finish(self):
+        for bloc, recording in self.__recordings.iteritems():
+            for out in bloc.outputs():
+                out.setRecorder(None)
+
+            recording.flush()
+
+            if bloc.isTerminated():
+                MemoManager.Store(self.__fingerprints[bloc], recording.load(), recording.size())
+
+            recording.release()
+
+        self.__recordings = {}
@@ -0,0 +1,232 @@
+import collections
+import json
+import math
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+## the thread cpu time is only available through getrusage on linux
+RusageThread = 1
+
+
+def CpuTime():
+    if resource is None:
+        return None
+
+    try:
+        usage = resource.getrusage(getattr(resource, "RUSAGE_THREAD", RusageThread))
+    except (ValueError, resource.error):
+        return None
+
+    return usage.ru_utime + usage.ru_stime
+
+
+def Percentile(values, percent):
+    if not values:
+        return None
+
+    values = sorted(values)
+    ## nearest rank
+    index = int(math.ceil(percent / 100.0 * len(values))) - 1
+
+    return values[min(max(index, 0), len(values) - 1)]
+
+
+class Meter(object):
+    MinPacketSize = 8
+
+    def __init__(self, bloc):
+        super(Meter, self).__init__()
+        self.__path = bloc.path()
+        self.__type = bloc.__class__.__name__
+        self.__start = None
+        self.__end = None
+        self.__busy = 0.0
+        self.__cpu = 0.0
+        self.__resume_time = None
+        self.__resume_cpu = None
+        self.__receive_time = 0.0
+        self.__send_time = 0.0
+        self.__inputs = {}
+        self.__outputs = {}
+
+        self.__bloc = bloc
+
+        for inp in bloc.inputs():
+            self.__inputs[inp.name()] = [0, 0]
+
+        for out in bloc.outputs():
+            self.__outputs[out.name()] = [0, 0]
+
+    def attach(self):
+        for inp in self.__bloc.inputs():
+            inp.setMeter(self)
+
+        for out in self.__bloc.outputs():
+            out.setMeter(self)
+
+        self.resume()
+
+    def detach(self, success=True):
+        for inp in self.__bloc.inputs():
+            inp.setMeter(None)
+
+        for out in self.__bloc.outputs():
+            out.setMeter(None)
+
+        return self.result(success)
+
+    def resume(self):
+        self.__resume_time = time.time()
+        self.__resume_cpu = CpuTime()
+
+        if self.__start is None:
+            self.__start = self.__resume_time
+
+    def pause(self):
+        if self.__resume_time is None:
+            return
+
+        self.__end = time.time()
+        self.__busy += self.__end - self.__resume_time
+
+        cpu = CpuTime()
+        if cpu is None or self.__resume_cpu is None or self.__cpu is None:
+            self.__cpu = None
+        else:
+            self.__cpu += cpu - self.__resume_cpu
+
+        self.__resume_time = None
+        self.__resume_cpu = None
+
+    def received(self, name, packs, sec):
+        self.__receive_time += sec
+        counts = self.__inputs.setdefault(name, [0, 0])
+
+        for p in packs:
+            if p.isEOP():
+                continue
+
+            counts[0] += 1
+            counts[1] += max(p.sizeHint(), Meter.MinPacketSize)
+
+    def sent(self, name, packs, sec):
+        self.__send_time += sec
+        counts = self.__outputs.setdefault(name, [0, 0])
+        counts[0] += len(packs)
+
+        for p in packs:
+            counts[1] += max(p.sizeHint(), Meter.MinPacketSize)
+
+    def result(self, success=True):
+        self.pause()
+
+        start = self.__start if self.__start is not None else time.time()
+        end = self.__end if self.__end is not None else start
+
+        return {"path": self.__path,
+                "type": self.__type,
+                "success": success,
+                "start": start,
+                "end": end,
+                "wall": end - start,
+                "busy": self.__busy,
+                "cpu": self.__cpu,
+                "receiveTime": self.__receive_time,
+                "sendTime": self.__send_time,
+                "computeTime": max(self.__busy - self.__receive_time - self.__send_time, 0.0),
+                "inputs": dict(map(lambda x: (x[0], {"packets": x[1][0], "bytes": x[1][1]}), self.__inputs.iteritems())),
+                "outputs": dict(map(lambda x: (x[0], {"packets": x[1][0], "bytes": x[1][1]}), self.__outputs.iteritems()))}
+
+
+class MetricsManager(object):
+    __Enabled = False
+    __HistorySize = 100
+    __History = {}
+    __Percents = [50, 95, 99]
+    __Fields = ["wall", "busy", "cpu", "receiveTime", "sendTime", "computeTime"]
+
+    @staticmethod
+    def SetEnabled(value):
+        MetricsManager.__Enabled = value
+
+    @staticmethod
+    def Enabled():
+        return MetricsManager.__Enabled
+
+    @staticmethod
+    def SetHistorySize(num):
+        MetricsManager.__HistorySize = max(num, 1)
+
+        for path, runs in MetricsManager.__History.items():
+            MetricsManager.__History[path] = collections.deque(runs, maxlen=MetricsManager.__HistorySize)
+
+    @staticmethod
+    def HistorySize():
+        return MetricsManager.__HistorySize
+
+    @staticmethod
+    def Clear():
+        MetricsManager.__History = {}
+
+    @staticmethod
+    def Record(result):
+        runs = MetricsManager.__History.get(result["path"])
+        if runs is None:
+            runs = collections.deque(maxlen=MetricsManager.__HistorySize)
+            MetricsManager.__History[result["path"]] = runs
+
+        runs.append(result)
+
+    @staticmethod
+    def Last(path):
+        runs = MetricsManager.__History.get(path)
+        if not runs:
+            return None
+
+        return runs[-1]
+
+    @staticmethod
+    def History(path):
+        return list(MetricsManager.__History.get(path, []))
+
+    @staticmethod
+    def Summary():
+        summary = {}
+
+        for path, runs in MetricsManager.__History.iteritems():
+            if not runs:
+                continue
+
+            info = {"type": runs[-1]["type"], "runs": len(runs)}
+            for field in MetricsManager.__Fields:
+                values = filter(lambda x: x is not None, map(lambda x: x[field], runs))
+                info[field] = dict(map(lambda x: ("p{}".format(x), Percentile(values, x)), MetricsManager.__Percents))
+
+            for direction in ["inputs", "outputs"]:
+                info[direction] = {}
+                for name in runs[-1][direction].keys():
+                    packets = map(lambda x: x[direction].get(name, {}).get("packets", 0), runs)
+                    sizes = map(lambda x: x[direction].get(name, {}).get("bytes", 0), runs)
+                    info[direction][name] = {"packets": dict(map(lambda x: ("p{}".format(x), Percentile(packets, x)), MetricsManager.__Percents)),
+                                             "bytes": dict(map(lambda x: ("p{}".format(x), Percentile(sizes, x)), MetricsManager.__Percents))}
+
+            summary[path] = info
+
+        return summary
+
+    @staticmethod
+    def Dump(filePath=None):
+        data = {"summary": MetricsManager.Summary(), "runs": dict(map(lambda x: (x[0], list(x[1])), MetricsManager.__History.iteritems()))}
+
+        if filePath is None:
+            return json.dumps(data, indent=4, sort_keys=True)
+
+        with open(filePath, "w") as f:
+            json.dump(data, f, indent=4, sort_keys=True)
+
+        return True
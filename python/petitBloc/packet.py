@@ -43,8 +43,8 @@ EndOfPacket = EndOfPacketObject()
 
 
 class Packet(core.PacketBase):
-    def __init__(self, value=None):
-        super(Packet, self).__init__(value=value)
+    def __init__(self, value=None, freeze=False):
+        super(Packet, self).__init__(value=value, freeze=freeze)
         self.__ref_count = 0
 
     def refCount(self):
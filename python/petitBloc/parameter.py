@@ -9,6 +9,115 @@ RePathParam = re.compile("[.]{0,2}[/][^@]*[@][a-zA-Z0-9_]+")
 ReEqual = re.compile("^\s*[=]\s*")
 
 
+class Expression(object):
+    __Generation = 0
+    __CodeCache = {}
+    __MaxCodeCache = 1024
+
+    @staticmethod
+    def Invalidate():
+        ## blocks or parameters were added, removed, renamed or reparented
+        Expression.__Generation += 1
+
+    @staticmethod
+    def Generation():
+        return Expression.__Generation
+
+    @staticmethod
+    def Compile(text):
+        if text in Expression.__CodeCache:
+            return Expression.__CodeCache[text]
+
+        if len(Expression.__CodeCache) >= Expression.__MaxCodeCache:
+            Expression.__CodeCache.clear()
+
+        try:
+            code = compile(text, "<expression>", "eval")
+        except Exception:
+            code = None
+
+        Expression.__CodeCache[text] = code
+
+        return code
+
+    def __init__(self, expression):
+        super(Expression, self).__init__()
+        self.__segments = []
+        self.__paths = []
+        self.__tokens = []
+
+        body = ReEqual.sub("", expression)
+        pos = 0
+        for res in RePathParam.finditer(body):
+            self.__segments += self.__tokenize(body[pos:res.start()])
+            self.__segments.append((Expression.Path, res.group(), self.__tokenize(res.group())))
+            pos = res.end()
+
+        self.__segments += self.__tokenize(body[pos:])
+
+        for seg in self.__segments:
+            if seg[0] == Expression.Path and seg[1] not in self.__paths:
+                self.__paths.append(seg[1])
+
+            for sub in (seg[2] if seg[0] == Expression.Path else [seg]):
+                if sub[0] == Expression.Token and sub[1] not in self.__tokens:
+                    self.__tokens.append(sub[1])
+
+    Text = 0
+    Path = 1
+    Token = 2
+
+    def __tokenize(self, text):
+        segments = []
+        pos = 0
+        for res in ReContextParam.finditer(text):
+            if res.start() > pos:
+                segments.append((Expression.Text, text[pos:res.start()]))
+
+            segments.append((Expression.Token, res.group()[1:]))
+            pos = res.end()
+
+        if pos < len(text):
+            segments.append((Expression.Text, text[pos:]))
+
+        return segments
+
+    def paths(self):
+        return list(self.__paths)
+
+    def tokens(self):
+        return list(self.__tokens)
+
+    def __render(self, segments, paths, tokens):
+        texts = []
+        for seg in segments:
+            if seg[0] == Expression.Text:
+                texts.append(seg[1])
+
+            elif seg[0] == Expression.Token:
+                val = tokens.get(seg[1])
+                texts.append("$" + seg[1] if val is None else val)
+
+            else:
+                val = paths.get(seg[1])
+                texts.append(self.__render(seg[2], paths, tokens) if val is None else val)
+
+        return "".join(texts)
+
+    def resolve(self, paths, tokens):
+        return self.__render(self.__segments, paths, tokens)
+
+    def evaluate(self, paths, tokens):
+        code = Expression.Compile(self.resolve(paths, tokens))
+        if code is None:
+            return None
+
+        try:
+            return eval(code)
+        except Exception as e:
+            return None
+
+
 class Parameter(core.ParameterBase):
     def __new__(self, name, typeClass=None, value=None, parent=None):
         if value is None and typeClass is None:
@@ -32,7 +141,17 @@ class Parameter(core.ParameterBase):
     def __init__(self, name, typeClass=None, value=None, parent=None):
         super(Parameter, self).__init__(name, typeClass=typeClass, value=value, parent=parent)
         self.__expression = None
+        self.__compiled = None
         self.__pre_evaluated_value = None
+        self.__generation = None
+        self.__path_params = {}
+        self.__token_params = {}
+        self.__cache_key = None
+        self.__cache_value = None
+        self.__evaluating = False
+        self.__graph = None
+        self.__graph_value = None
+        self.__graph_generation = None
 
         if value is None:
             self.__value = typeClass()
@@ -56,7 +175,7 @@ class Parameter(core.ParameterBase):
         if not self.hasExpression():
             return True
 
-        value = self.__evalExpression(self.__expression)
+        value = self.__evalExpression()
 
         if value is None:
             return False
@@ -77,7 +196,11 @@ class Parameter(core.ParameterBase):
             self.__pre_evaluated_value = None
             return
 
-        value = self.__evalExpression(self.__expression)
+        if self.__graph_value is not None and self.__graph_generation == Expression.Generation():
+            self.__pre_evaluated_value = self.__graph_value
+            return
+
+        value = self.__evalExpression()
 
         if value is None:
             self.__pre_evaluated_value = self.__type_class()
@@ -96,53 +219,16 @@ class Parameter(core.ParameterBase):
     def typeClass(self):
         return self.__type_class
 
-    def __popEqual(self, expression):
-        return ReEqual.sub("", expression)
-
-    def __resolveTokens(self, expression):
-        subs = []
-        tokens = set()
-
-        for tkn_txt in ReContextParam.findall(expression):
-            tokens.add(tkn_txt[1:])
-
-        if not tokens:
-            return expression
-
-        ctx = self.__getContext()
-
-        for tkn in tokens:
-            val = None
-            val = ctx.get(tkn, None)
-            if val is None:
-                val = os.environ.get(tkn, None)
-
-            if val is None:
-                continue
-
-            subs.append((re.compile("[$]{}".format(tkn)), str(val)))
-
-        for reg, v in subs:
-            expression = reg.sub(str(v), expression)
-
-        return expression
-
-    def __resolvePaths(self, expression):
-        pths = set()
-        subs = []
-
-        for pth in RePathParam.findall(expression):
-            pths.add(pth)
-
-        if not pths:
-            return expression
+    def __resolveDependencies(self):
+        ## find the parameters the expression refers to, once per scene change
+        self.__generation = Expression.Generation()
+        self.__path_params = {}
+        self.__token_params = {}
 
         top = self.ancestor()
-        if top is None:
-            return expression
 
-        for pth in pths:
-            if pth.count("@") != 1:
+        for pth in self.__compiled.paths():
+            if top is None or pth.count("@") != 1:
                 continue
 
             t_path, t_param = pth.split("@")
@@ -150,51 +236,124 @@ class Parameter(core.ParameterBase):
             bloc_full = os.path.abspath(os.path.join(self.path().split("@")[0], t_path)).replace("\\", "/")
 
             bloc = top.findBlock(bloc_full)
-
             if bloc is None:
                 continue
 
             p = bloc.param(t_param)
-            if p is None:
+            if p is None or p == self:
                 continue
 
-            if p == self:
-                continue
+            self.__path_params[pth] = p
 
-            subs.append((pth, re.compile(pth.replace(".", "[.]").replace("\/", "[/]")), str(p.get())))
+        if top is None:
+            return
 
-        subs.sort(cmp=lambda x, y: cmp(len(x[0]), len(y[0])), reverse=True)
+        for tkn in self.__compiled.tokens():
+            p = top.context(tkn)
+            if p is not None:
+                self.__token_params[tkn] = p
 
-        for _, reg, v in subs:
-            expression = reg.sub(v, expression)
+    def dependencies(self):
+        if not self.hasExpression():
+            return []
 
-        return expression
+        if self.__generation != Expression.Generation():
+            self.__resolveDependencies()
 
-    def __resolveExpression(self, expression):
-        return self.__popEqual(self.__resolveTokens(self.__resolvePaths(expression)))
+        deps = []
+        for pth in self.__compiled.paths():
+            p = self.__path_params.get(pth)
+            if p is not None and p not in deps:
+                deps.append(p)
 
-    def __evalExpression(self, expression):
-        exp = self.__resolveExpression(expression)
-        try:
-            return eval(exp)
-        except Exception as e:
+        for tkn in self.__compiled.tokens():
+            p = self.__token_params.get(tkn)
+            if p is not None and p not in deps:
+                deps.append(p)
+
+        return deps
+
+    def __evalExpression(self):
+        ## a cyclic expression reaches itself again, evaluate it as the default
+        if self.__evaluating:
             return None
 
-    def __getContext(self):
-        cur = None
-        top = self.ancestor()
+        self.__evaluating = True
+        try:
+            return self.__evalCached()
+        finally:
+            self.__evaluating = False
+
+    def __evalCached(self):
+        if self.__generation != Expression.Generation():
+            self.__resolveDependencies()
+
+        paths = {}
+        for pth, p in self.__path_params.iteritems():
+            paths[pth] = str(p.get())
+
+        tokens = {}
+        for tkn in self.__compiled.tokens():
+            p = self.__token_params.get(tkn)
+            val = p.get() if p is not None else os.environ.get(tkn, None)
+            if val is not None:
+                tokens[tkn] = str(val)
+
+        key = (paths, tokens)
+        if key != self.__cache_key:
+            self.__cache_value = self.__compiled.evaluate(paths, tokens)
+            self.__cache_key = key
+
+        return self.__cache_value
+
+    def attachGraph(self, graph):
+        self.__graph = graph
+        self.__graph_value = None
+
+    def invalidate(self):
+        self.__graph_value = None
+
+    def update(self):
+        ## evaluated by the expression graph, get returns this value until an upstream changes
+        self.__graph_value = None
+        if not self.hasExpression():
+            return self.__value
+
+        self.__graph_value = self.__convert(self.__evalExpression())
+        self.__graph_generation = Expression.Generation()
 
-        return top.getContext()
+        return self.__graph_value
+
+    def fallback(self):
+        ## a parameter on a cycle of expressions takes the default value of its type
+        self.__graph_value = self.__type_class()
+        self.__graph_generation = Expression.Generation()
+
+        return self.__graph_value
+
+    def __changed(self):
+        if self.__graph is not None:
+            self.__graph.changed(self)
 
     def setExpression(self, expression):
+        self.__graph_value = None
+        self.__changed()
+
         if expression is None:
             self.__expression = None
+            self.__compiled = None
+            self.__cache_key = None
+            self.__cache_value = None
             return True
 
         if ReEqual.search(expression) is None:
             return False
 
         self.__expression = expression
+        self.__compiled = Expression(expression)
+        self.__generation = None
+        self.__cache_key = None
+        self.__cache_value = None
 
         return True
 
@@ -208,8 +367,12 @@ class Parameter(core.ParameterBase):
         if self.__pre_evaluated_value is not None:
             return self.__pre_evaluated_value
 
-        value = self.__evalExpression(self.__expression)
+        if self.__graph_value is not None and self.__graph_generation == Expression.Generation():
+            return self.__graph_value
+
+        return self.__convert(self.__evalExpression())
 
+    def __convert(self, value):
         if value is None:
             return self.__type_class()
 
@@ -227,14 +390,17 @@ class Parameter(core.ParameterBase):
     def set(self, value):
         if isinstance(value, self.__type_class):
             self.__value = value
+            self.__changed()
             return True
 
         if isinstance(value, Number) and issubclass(self.__type_class, Number):
             self.__value = self.__type_class(value)
+            self.__changed()
             return True
 
         if isinstance(value, basestring) and issubclass(self.__type_class, basestring):
             self.__value = str(value)
+            self.__changed()
             return True
 
         return False
@@ -285,3 +451,167 @@ class EnumParameter(core.ParameterBase):
         self.__value = int(value)
 
         return True
+
+
+class ExpressionGraph(object):
+    def __init__(self, root):
+        super(ExpressionGraph, self).__init__()
+        self.__root = root
+        self.__params = []
+        self.__downstreams = {}
+        self.__upstreams = {}
+        self.__order = []
+        self.__cycles = []
+        self.build()
+
+    def __collect(self, bloc):
+        params = list(bloc.params())
+
+        if bloc.hasNetwork():
+            for b in bloc.blocks():
+                params += self.__collect(b)
+
+        return params
+
+    def build(self):
+        self.__params = list(self.__root.contexts()) + self.__collect(self.__root)
+        self.__downstreams = {}
+        self.__upstreams = {}
+        self.__order = []
+        self.__cycles = []
+
+        for p in self.__params:
+            if isinstance(p, Parameter):
+                p.attachGraph(self)
+
+        for p in self.__params:
+            self.__downstreams[p] = []
+            self.__upstreams[p] = []
+
+        for p in self.__params:
+            for up in p.dependencies():
+                if up not in self.__downstreams:
+                    continue
+
+                self.__downstreams[up].append(p)
+                self.__upstreams[p].append(up)
+
+        ## only the members of a strongly connected component are cyclic, the parameters
+        ## behind a cycle are ordered after it and evaluated against its fallback values
+        for component in self.__components():
+            if len(component) > 1 or component[0] in self.__upstreams[component[0]]:
+                self.__cycles += component
+                continue
+
+            if component[0].hasExpression():
+                self.__order.append(component[0])
+
+    def __components(self):
+        ## Tarjan's algorithm following the upstreams, a component comes out after all of its upstreams
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+
+        for root in self.__params:
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.__upstreams[root]))]
+
+            while (work):
+                p, ups = work[-1]
+                for up in ups:
+                    if up not in index:
+                        index[up] = lowlink[up] = len(index)
+                        stack.append(up)
+                        on_stack.add(up)
+                        work.append((up, iter(self.__upstreams[up])))
+                        break
+
+                    if up in on_stack:
+                        lowlink[p] = min(lowlink[p], index[up])
+
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[p])
+
+                    if lowlink[p] != index[p]:
+                        continue
+
+                    component = []
+                    while (True):
+                        q = stack.pop()
+                        on_stack.discard(q)
+                        component.append(q)
+                        if q == p:
+                            break
+
+                    components.append(component)
+
+        return components
+
+    def params(self):
+        return list(self.__params)
+
+    def order(self):
+        return list(self.__order)
+
+    def cycles(self):
+        return list(self.__cycles)
+
+    def hasCycle(self):
+        return len(self.__cycles) > 0
+
+    def downstreams(self, params):
+        found = set()
+        stack = list(params)
+
+        while (stack):
+            p = stack.pop()
+            for down in self.__downstreams.get(p, []):
+                if down not in found:
+                    found.add(down)
+                    stack.append(down)
+
+        return found
+
+    def changed(self, param):
+        ## the stored values behind a changed parameter are evaluated again on demand until the next update
+        for p in self.downstreams([param]):
+            p.invalidate()
+
+    def evaluate(self):
+        for p in self.__order:
+            p.invalidate()
+
+        for p in self.__cycles:
+            p.fallback()
+
+        for p in self.__order:
+            p.update()
+
+        return self.order()
+
+    def update(self, params):
+        ## re-evaluate only the expressions which depend on the changed parameters, upstreams first
+        targets = self.downstreams(params)
+        updated = [p for p in self.__order if p in targets]
+
+        for p in updated:
+            p.invalidate()
+
+        for p in self.__cycles:
+            if p in targets:
+                p.fallback()
+
+        for p in updated:
+            p.update()
+
+        return updated
@@ -1,23 +1,56 @@
 from numbers import Number
 from . import packet
 from . import core
+from . import const
+from . import history
 from . import workerManager
-import copy
+import time
 
 
 class InPort(core.PortBase):
     def __init__(self, typeClass, name=None, parent=None):
         super(InPort, self).__init__(typeClass, name=name, parent=parent)
         self.__in_chain = None
-        self.__values = []
-        self.__value_queue = None
+        self.__history_mode = None
+        self.__history_size = None
+        self.__capture = None
+        self.__meter = None
+        self.__eop = False
+
+    def setHistoryMode(self, mode, size=None):
+        self.__history_mode = mode
+        self.__history_size = size
+
+    def historyMode(self):
+        if self.__history_mode is None:
+            return workerManager.WorkerManager.HistoryMode()
+
+        return self.__history_mode
+
+    def historySize(self):
+        if self.__history_size is None:
+            return workerManager.WorkerManager.HistorySize()
+
+        return self.__history_size
 
     def packetHistory(self):
-        return copy.copy(self.__values)
+        if self.__capture is None:
+            return []
+
+        return self.__capture.values()
+
+    def setMeter(self, meter):
+        self.__meter = meter
+
+    def meter(self):
+        return self.__meter
 
     def isInPort(self):
         return True
 
+    def reachedEOP(self):
+        return self.__eop
+
     def isConnected(self):
         return self.__in_chain is not None
 
@@ -39,31 +72,63 @@ class InPort(core.PortBase):
         if self.__in_chain is None:
             return packet.EndOfPacket
 
-        p = self.__in_chain.receive()
-        if self.__value_queue is not None and not p.isEOP():
-            self.__value_queue.put(p.value())
+        if self.__meter is None:
+            p = self.__in_chain.receive()
+        else:
+            st = time.time()
+            p = self.__in_chain.receive()
+            self.__meter.received(self.name(), [p], time.time() - st)
+
+        if p.isEOP():
+            self.__eop = True
+
+        elif self.__capture is not None:
+            self.__capture.record(p)
 
         return p
 
+    def receiveMany(self, count):
+        if self.__in_chain is None:
+            return [packet.EndOfPacket]
+
+        if self.__meter is None:
+            packs = self.__in_chain.receiveMany(count)
+        else:
+            st = time.time()
+            packs = self.__in_chain.receiveMany(count)
+            self.__meter.received(self.name(), packs, time.time() - st)
+
+        for p in packs:
+            if p.isEOP():
+                self.__eop = True
+
+            elif self.__capture is not None:
+                self.__capture.record(p)
+
+        return packs
+
+    def flush(self):
+        if self.__capture is not None:
+            self.__capture.flush()
+
+        return True
+
     def activate(self):
-        self.__values = []
+        self.__eop = False
 
-        if self.__value_queue is not None:
-            workerManager.WorkerManager.DeleteQueue(self.__value_queue)
-            self.__value_queue = None
+        if self.__capture is not None:
+            self.__capture.release()
 
-        self.__value_queue = workerManager.WorkerManager.CreateQueue()
+        self.__capture = history.CreateCapture(self.historyMode(), self.historySize())
+        if self.__capture is not None:
+            self.__capture.activate()
 
         if self.__in_chain:
             self.__in_chain.activate()
 
     def terminate(self):
-        if self.__value_queue is not None:
-            while (not self.__value_queue.empty()):
-                self.__values.append(self.__value_queue.get())
-
-            workerManager.WorkerManager.DeleteQueue(self.__value_queue)
-            self.__value_queue = None
+        if self.__capture is not None:
+            self.__capture.terminate()
 
         if self.__in_chain:
             self.__in_chain.terminate()
@@ -73,11 +138,56 @@ class OutPort(core.PortBase):
     def __init__(self, typeClass, name=None, parent=None):
         super(OutPort, self).__init__(typeClass, name=name, parent=parent)
         self.__out_chains = []
-        self.__values = []
-        self.__value_queue = None
+        self.__history_mode = None
+        self.__history_size = None
+        self.__capture = None
+        self.__recorder = None
+        self.__meter = None
+        self.__packet_mode = None
+        self.__freeze = False
+
+    def setHistoryMode(self, mode, size=None):
+        self.__history_mode = mode
+        self.__history_size = size
+
+    def historyMode(self):
+        if self.__history_mode is None:
+            return workerManager.WorkerManager.HistoryMode()
+
+        return self.__history_mode
+
+    def historySize(self):
+        if self.__history_size is None:
+            return workerManager.WorkerManager.HistorySize()
+
+        return self.__history_size
+
+    def setPacketMode(self, mode):
+        self.__packet_mode = mode
+
+    def packetMode(self):
+        if self.__packet_mode is None:
+            return workerManager.WorkerManager.PacketMode(self.typeClass())
+
+        return self.__packet_mode
 
     def packetHistory(self):
-        return copy.copy(self.__values)
+        if self.__capture is None:
+            return []
+
+        return self.__capture.values()
+
+    def setRecorder(self, recorder):
+        self.__recorder = recorder
+
+    def recorder(self):
+        return self.__recorder
+
+    def setMeter(self, meter):
+        self.__meter = meter
+
+    def meter(self):
+        return self.__meter
 
     def isOutPort(self):
         return True
@@ -98,49 +208,109 @@ class OutPort(core.PortBase):
             self.__out_chains.remove(chain)
 
     def terminate(self):
-        if self.__value_queue is not None:
-            while (not self.__value_queue.empty()):
-                self.__values.append(self.__value_queue.get())
-
-            workerManager.WorkerManager.DeleteQueue(self.__value_queue)
-            self.__value_queue = None
+        if self.__capture is not None:
+            self.__capture.terminate()
 
         for chain in self.__out_chains:
             chain.sendEOP()
 
+    def __toPacket(self, value):
+        if isinstance(value, self.typeClass()):
+            return packet.Packet(value, freeze=self.__freeze)
+
+        if issubclass(self.typeClass(), Number) and isinstance(value, Number):
+            return packet.Packet(self.typeClass()(value))
+
+        if issubclass(self.typeClass(), basestring) and isinstance(value, basestring):
+            return packet.Packet(self.typeClass()(value))
+
+        return None
+
     def send(self, value):
+        if not self.__out_chains and self.__recorder is None:
+            return False
+
+        pack = self.__toPacket(value)
+        if pack is None:
+            return False
+
+        if self.__recorder is not None:
+            self.__recorder.record(self.name(), value)
+
         if not self.__out_chains:
             return False
 
-        pack = None
-        if isinstance(value, self.typeClass()):
-            pack = packet.Packet(value)
+        if self.__capture is not None:
+            self.__capture.record(pack)
 
-        elif issubclass(self.typeClass(), Number) and isinstance(value, Number):
-            pack = packet.Packet(self.typeClass()(value))
+        if self.__meter is None:
+            for chain in self.__out_chains:
+                chain.send(pack)
+        else:
+            st = time.time()
+            for chain in self.__out_chains:
+                chain.send(pack)
 
-        elif issubclass(self.typeClass(), basestring) and isinstance(value, basestring):
-            pack = packet.Packet(self.typeClass()(value))
+            self.__meter.sent(self.name(), [pack], time.time() - st)
 
-        if pack is None:
+        return True
+
+    def sendMany(self, values):
+        if not self.__out_chains and self.__recorder is None:
             return False
 
-        if self.__value_queue is not None and not pack.isEOP():
-            self.__value_queue.put(pack.value())
+        packs = []
+        for value in values:
+            pack = self.__toPacket(value)
+            if pack is None:
+                return False
+
+            packs.append(pack)
+
+        if self.__recorder is not None:
+            for value in values:
+                self.__recorder.record(self.name(), value)
+
+        if not self.__out_chains:
+            return False
+
+        if self.__capture is not None:
+            for pack in packs:
+                self.__capture.record(pack)
+
+        if self.__meter is None:
+            for chain in self.__out_chains:
+                chain.sendMany(packs)
+        else:
+            st = time.time()
+            for chain in self.__out_chains:
+                chain.sendMany(packs)
+
+            self.__meter.sent(self.name(), packs, time.time() - st)
+
+        return True
+
+    def flush(self):
+        if self.__capture is not None:
+            self.__capture.flush()
+
+        if self.__recorder is not None:
+            self.__recorder.flush()
 
         for chain in self.__out_chains:
-            chain.send(pack)
+            chain.flush()
 
         return True
 
     def activate(self):
-        self.__values = []
+        self.__freeze = self.packetMode() == const.PacketMode.Freeze
 
-        if self.__value_queue is not None:
-            workerManager.WorkerManager.DeleteQueue(self.__value_queue)
-            self.__value_queue = None
+        if self.__capture is not None:
+            self.__capture.release()
 
-        self.__value_queue = workerManager.WorkerManager.CreateQueue()
+        self.__capture = history.CreateCapture(self.historyMode(), self.historySize())
+        if self.__capture is not None:
+            self.__capture.activate()
 
         for out in self.__out_chains:
             out.activate()
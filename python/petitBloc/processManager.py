@@ -1,39 +1,30 @@
 import multiprocessing
+import threading
+import atexit
+import Queue
+import cPickle
+import tempfile
+import shutil
 import copy
 import time
+import os
 from . import const
-import subprocess
-
-
-class SubprocessWorker(object):
-    def __init__(self, cmd):
-        self.__command = cmd
-        self.__p = subprocess.Popen(cmd, shell=True)
-
-    def command(self):
-        return self.__command
-
-    def isRunning(self):
-        return self.__p.poll() is None
-
-    def result(self):
-        res = self.__p.wait() == 0
-
-        return res
+from . import core
+from . import scheduler
+from . import metrics
+from . import subprocessPool
 
 
 class SubprocessManager(object):
-    __Manager = None
-    __Processes = None
+    __Pool = None
+    __Slots = None
     __MaxProcess = multiprocessing.cpu_count() - 1 or 1
-    __WaitTime = 0.5
-    __Lock = multiprocessing.Lock()
+    __Lock = threading.Lock()
 
     @staticmethod
     def Initialize():
-        if SubprocessManager.__Manager is None:
-            SubprocessManager.__Manager = multiprocessing.Manager()
-            SubprocessManager.__Processes = SubprocessManager.__Manager.dict()
+        if SubprocessManager.__Slots is None:
+            SubprocessManager.__Slots = multiprocessing.BoundedSemaphore(SubprocessManager.__MaxProcess)
 
     @staticmethod
     def SetMaxProcess(num):
@@ -42,56 +33,62 @@ class SubprocessManager(object):
         else:
             SubprocessManager.__MaxProcess = num
 
+        SubprocessManager.__Shutdown()
+        SubprocessManager.__Slots = multiprocessing.BoundedSemaphore(SubprocessManager.__MaxProcess)
+
     @staticmethod
     def Reset():
-        if SubprocessManager.__Manager is not None:
-            for k, p in SubprocessManager.__Processes.items():
-                del p
+        SubprocessManager.__Shutdown()
+        SubprocessManager.__MaxProcess = multiprocessing.cpu_count() - 1 or 1
+        SubprocessManager.__Slots = multiprocessing.BoundedSemaphore(SubprocessManager.__MaxProcess)
 
-            SubprocessManager.__Processes.clear()
+    @staticmethod
+    def __Shutdown():
+        with SubprocessManager.__Lock:
+            if SubprocessManager.__Pool is not None and SubprocessManager.__Pool.pid() == os.getpid():
+                SubprocessManager.__Pool.shutdown()
 
-        SubprocessManager.__MaxProcess = multiprocessing.cpu_count() - 1 or 1
+            SubprocessManager.__Pool = None
 
     @staticmethod
     def Count():
-        return len(SubprocessManager.__Processes)
+        if SubprocessManager.__Pool is None or SubprocessManager.__Pool.pid() != os.getpid():
+            return 0
+
+        return SubprocessManager.__Pool.count()
 
     @staticmethod
     def Submit(cmd):
-        index = 0
-        while (True):
-            SubprocessManager.__Lock.acquire()
-            running_count = 0
-
-            for index, p in SubprocessManager.__Processes.items():
-                if p.isRunning():
-                    running_count += 1
-
-            if running_count < SubprocessManager.__MaxProcess:
-                worker = SubprocessWorker(cmd)
-                SubprocessManager.__Processes[index] = worker
+        SubprocessManager.Initialize()
 
-                index += 1
+        with SubprocessManager.__Lock:
+            ## the slot threads do not survive the fork, every worker process starts its own pool
+            if SubprocessManager.__Pool is None or SubprocessManager.__Pool.pid() != os.getpid():
+                SubprocessManager.__Pool = subprocessPool.SubprocessPool(SubprocessManager.__MaxProcess, slots=SubprocessManager.__Slots)
 
-                SubprocessManager.__Lock.release()
-
-                return worker
-
-            SubprocessManager.__Lock.release()
-
-            time.sleep(SubprocessManager.__WaitTime)
+            return SubprocessManager.__Pool.submit(cmd)
 
 
 class LogManager(object):
     __LogLevel = const.LogLevel.Error
 
-    __Manager = None
-    __Count = None
-    __TotalTime = None
-    __TimeLog = None
-    __ErrorLog = None
-    __WarnLog = None
-    __DebugLog = None
+    __Lock = threading.Lock()
+    __Owner = os.getpid()
+    __Queue = None
+    __Collector = None
+    __Buffer = []
+    __BufferTime = 0
+    __BufferSize = 1000
+    __BufferLatency = 0.5
+    __StopTimeout = 10.0
+
+    __Count = 0
+    __TotalTime = 0
+    __TimeLog = {}
+    __StallLog = {}
+    __ErrorLog = {}
+    __WarnLog = {}
+    __DebugLog = {}
 
     @staticmethod
     def SetLogLevel(l):
@@ -99,112 +96,279 @@ class LogManager(object):
 
     @staticmethod
     def Initialize():
-        if LogManager.__Manager is None:
-            LogManager.__Manager = multiprocessing.Manager()
-            LogManager.__Count = multiprocessing.Value("i", 0)
-            LogManager.__TotalTime = multiprocessing.Value("f", 0.0)
-            LogManager.__TimeLog = LogManager.__Manager.dict()
-            LogManager.__ErrorLog = LogManager.__Manager.dict()
-            LogManager.__WarnLog = LogManager.__Manager.dict()
-            LogManager.__DebugLog = LogManager.__Manager.dict()
+        LogManager.__Owner = os.getpid()
 
     @staticmethod
     def Reset():
-        if LogManager.__Manager is not None:
-            LogManager.__Count.value = 0
-            LogManager.__TotalTime.value = 0.0
-            LogManager.__TimeLog.clear()
-            LogManager.__ErrorLog.clear()
-            LogManager.__WarnLog.clear()
-            LogManager.__DebugLog.clear()
+        with LogManager.__Lock:
+            LogManager.__Count = 0
+            LogManager.__TotalTime = 0
+            LogManager.__TimeLog = {}
+            LogManager.__StallLog = {}
+            LogManager.__ErrorLog = {}
+            LogManager.__WarnLog = {}
+            LogManager.__DebugLog = {}
+
+    @staticmethod
+    def Start():
+        ## workers send their records in batches, one thread merges them into the dicts
+        LogManager.Stop()
+
+        LogManager.__Owner = os.getpid()
+        LogManager.__Buffer = []
+        LogManager.__Queue = multiprocessing.Queue()
+        LogManager.__Collector = threading.Thread(target=LogManager.__Collect, args=(LogManager.__Queue, ))
+        LogManager.__Collector.daemon = True
+        LogManager.__Collector.start()
+
+    @staticmethod
+    def Stop():
+        if LogManager.__Collector is None:
+            return
+
+        ## every worker has exited, the sentinel is behind all of their batches
+        LogManager.__Queue.put(None)
+        LogManager.__Collector.join(LogManager.__StopTimeout)
+        LogManager.__Queue.close()
+        LogManager.__Queue = None
+        LogManager.__Collector = None
+
+    @staticmethod
+    def Flush():
+        if not LogManager.__Buffer:
+            return
+
+        if LogManager.__Queue is not None:
+            LogManager.__Queue.put(LogManager.__Buffer)
+
+        LogManager.__Buffer = []
+
+    @staticmethod
+    def __Collect(queue):
+        while (True):
+            records = queue.get()
+            if records is None:
+                break
+
+            with LogManager.__Lock:
+                for record in records:
+                    LogManager.__Apply(record)
+
+    @staticmethod
+    def __Record(*record):
+        if os.getpid() == LogManager.__Owner:
+            with LogManager.__Lock:
+                LogManager.__Apply(record)
+
+            return
+
+        if not LogManager.__Buffer:
+            LogManager.__BufferTime = time.time()
+
+        LogManager.__Buffer.append(record)
+
+        if len(LogManager.__Buffer) >= LogManager.__BufferSize or time.time() - LogManager.__BufferTime >= LogManager.__BufferLatency:
+            LogManager.Flush()
+
+    @staticmethod
+    def __Apply(record):
+        kind = record[0]
+
+        if kind == "count":
+            LogManager.__Count += 1
+
+        elif kind == "time":
+            LogManager.__TotalTime += record[2]
+            LogManager.__TimeLog[record[1]] = record[2]
+
+        elif kind == "stall":
+            count, total = LogManager.__StallLog.get(record[1], (0, 0.0))
+            LogManager.__StallLog[record[1]] = (count + 1, total + record[2])
+
+        elif kind == "error":
+            LogManager.__ErrorLog.setdefault(record[1], []).append(record[2])
+
+        elif kind == "warn":
+            LogManager.__WarnLog.setdefault(record[1], []).append(record[2])
+
+        elif kind == "debug":
+            LogManager.__DebugLog.setdefault(record[1], []).append(record[2])
+
+        elif kind == "metrics":
+            metrics.MetricsManager.Record(record[1])
 
     @staticmethod
     def IncreaseCount():
-        LogManager.__Count.value += 1
+        LogManager.__Record("count")
 
     @staticmethod
     def TimeReport(path, v):
-        LogManager.__TotalTime.value += v
-        LogManager.__TimeLog[path] = v
+        LogManager.__Record("time", path, v)
 
     @staticmethod
     def ExecutionCount():
-        return LogManager.__Count.value
+        return LogManager.__Count
 
     @staticmethod
     def TotalTime():
-        return LogManager.__TotalTime.value
+        return LogManager.__TotalTime
 
     @staticmethod
     def TimeLog(path):
-        return LogManager.__TimeLog.get(path, -1)
+        with LogManager.__Lock:
+            return LogManager.__TimeLog.get(path, -1)
 
     @staticmethod
     def AverageTime():
-        if LogManager.__Count.value == 0:
-            return 0
+        with LogManager.__Lock:
+            if LogManager.__Count == 0:
+                return 0
 
-        return LogManager.__TotalTime.value / float(LogManager.__Count.value)
+            return LogManager.__TotalTime / float(LogManager.__Count)
 
     @staticmethod
     def TimeLogs():
-        return LogManager.__TimeLog.copy()
+        with LogManager.__Lock:
+            return copy.copy(LogManager.__TimeLog)
+
+    @staticmethod
+    def StallReport(path, v):
+        LogManager.__Record("stall", path, v)
+
+    @staticmethod
+    def MetricsReport(result):
+        LogManager.__Record("metrics", result)
+
+    @staticmethod
+    def StallLog(path):
+        with LogManager.__Lock:
+            return LogManager.__StallLog.get(path, (0, 0.0))
+
+    @staticmethod
+    def StallLogs():
+        with LogManager.__Lock:
+            return copy.copy(LogManager.__StallLog)
 
     @staticmethod
     def ErrorLogs():
-        return LogManager.__ErrorLog.copy()
+        with LogManager.__Lock:
+            return copy.deepcopy(LogManager.__ErrorLog)
 
     @staticmethod
     def WarnLogs():
-        return LogManager.__WarnLog.copy()
+        with LogManager.__Lock:
+            return copy.deepcopy(LogManager.__WarnLog)
 
     @staticmethod
     def DebugLogs():
-        return LogManager.__DebugLog.copy()
+        with LogManager.__Lock:
+            return copy.deepcopy(LogManager.__DebugLog)
 
     @staticmethod
     def ErrorLog(path):
-        return copy.copy(LogManager.__ErrorLog.get(path, []))
+        with LogManager.__Lock:
+            return copy.copy(LogManager.__ErrorLog.get(path, []))
 
     @staticmethod
     def WarnLog(path):
-        return copy.copy(LogManager.__WarnLog.get(path, []))
+        with LogManager.__Lock:
+            return copy.copy(LogManager.__WarnLog.get(path, []))
 
     @staticmethod
     def DebugLog(path):
-        return copy.copy(LogManager.__DebugLog.get(path, []))
+        with LogManager.__Lock:
+            return copy.copy(LogManager.__DebugLog.get(path, []))
 
     @staticmethod
     def Error(path, message):
         if LogManager.__LogLevel >= const.LogLevel.Error:
             print("Error : {}".format(message))
 
-        log_list = LogManager.__ErrorLog.get(path, [])
-        log_list.append(str(message))
-        LogManager.__ErrorLog[path] = log_list
+        LogManager.__Record("error", path, str(message))
 
     @staticmethod
     def Warn(path, message):
         if LogManager.__LogLevel >= const.LogLevel.Warn:
             print("Warning : {}".format(message))
 
-        log_list = LogManager.__WarnLog.get(path, [])
-        log_list.append(str(message))
-        LogManager.__WarnLog[path] = log_list
+        LogManager.__Record("warn", path, str(message))
 
     @staticmethod
     def Debug(path, message):
         if LogManager.__LogLevel >= const.LogLevel.Debug:
             print("Debug : {}".format(message))
 
-        log_list = LogManager.__DebugLog.get(path, [])
-        log_list.append(str(message))
-        LogManager.__DebugLog[path] = log_list
+        LogManager.__Record("debug", path, str(message))
+
+
+class WaitManager(object):
+    ## one slot per block shared with the worker processes, the blocked ones
+    ## store the index of the block they wait on after the states
+    __Indices = {}
+    __Paths = []
+    __Slots = None
+    __Enabled = False
+
+    @staticmethod
+    def Reset(schedule):
+        WaitManager.__Indices = {}
+        WaitManager.__Paths = []
+        WaitManager.__Enabled = False
+
+        for s in schedule:
+            path = s.path()
+            if path in WaitManager.__Indices:
+                continue
+
+            WaitManager.__Indices[path] = len(WaitManager.__Paths)
+            WaitManager.__Paths.append(path)
+
+            for out in s.outputs():
+                for chn in out.chains():
+                    if chn.capacity() > 0:
+                        WaitManager.__Enabled = True
+
+        WaitManager.__Slots = multiprocessing.RawArray("i", max(len(WaitManager.__Paths), 1))
+
+    @staticmethod
+    def Enabled():
+        return WaitManager.__Enabled
+
+    @staticmethod
+    def SetState(path, state, target=None):
+        index = WaitManager.__Indices.get(path)
+        if index is None or WaitManager.__Slots is None:
+            return
+
+        if state is const.WaitState.Blocked:
+            target_index = WaitManager.__Indices.get(target)
+            if target_index is None:
+                return
+
+            WaitManager.__Slots[index] = const.WaitState.Blocked.value + target_index
+        else:
+            WaitManager.__Slots[index] = state.value
+
+    @staticmethod
+    def State(path):
+        index = WaitManager.__Indices.get(path)
+        if index is None or WaitManager.__Slots is None:
+            return (const.WaitState.Running, None)
+
+        value = WaitManager.__Slots[index]
+        if value >= const.WaitState.Blocked.value:
+            return (const.WaitState.Blocked, WaitManager.__Paths[value - const.WaitState.Blocked.value])
+
+        return (const.WaitState(value), None)
+
+    @staticmethod
+    def Paths():
+        return list(WaitManager.__Paths)
 
 
 class ValueManager(object):
     __Count = 0
-    __Values = []
+    __Values = set()
 
     @staticmethod
     def Reset():
@@ -224,7 +388,7 @@ class ValueManager(object):
         else:
             v = multiprocessing.Value(valueType)
 
-        ValueManager.__Values.append(v)
+        ValueManager.__Values.add(v)
 
         return v
 
@@ -236,9 +400,102 @@ class ValueManager(object):
         del v
 
 
+class SharedPayload(object):
+    def __init__(self, obj, directory):
+        super(SharedPayload, self).__init__()
+        data = cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL)
+        fd, self.__path = tempfile.mkstemp(dir=directory)
+
+        try:
+            view = memoryview(data)
+            while (view):
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    def load(self):
+        with open(self.__path, "rb") as f:
+            data = f.read()
+
+        os.remove(self.__path)
+
+        return cPickle.loads(data)
+
+
+class SharedQueue(object):
+    def __init__(self, directory, threshold, maxsize=0):
+        super(SharedQueue, self).__init__()
+        self.__queue = multiprocessing.Queue()
+        self.__directory = directory
+        self.__threshold = threshold
+        self.__slots = None
+        self.__bounded = False
+
+        if maxsize > 0:
+            self.__slots = multiprocessing.Semaphore(maxsize)
+            self.__bounded = True
+
+    def __isBatch(self, obj):
+        return isinstance(obj, list) and obj and isinstance(obj[0], (core.PacketBase, SharedPayload))
+
+    def __share(self, obj):
+        if self.__isBatch(obj):
+            return [self.__share(x) for x in obj]
+
+        if isinstance(obj, core.PacketBase):
+            size = obj.sizeHint()
+        else:
+            size = core.SizeHint(obj)
+
+        if self.__threshold <= 0 or size < self.__threshold:
+            return obj
+
+        return SharedPayload(obj, self.__directory)
+
+    def __unshare(self, obj):
+        if isinstance(obj, SharedPayload):
+            return obj.load()
+
+        if self.__isBatch(obj):
+            return [self.__unshare(x) for x in obj]
+
+        return obj
+
+    def put(self, obj, block=True, timeout=None):
+        if self.__bounded and not self.__slots.acquire(block, timeout):
+            raise Queue.Full
+
+        self.__queue.put(self.__share(obj))
+
+    def forcePut(self, obj):
+        self.__queue.put(self.__share(obj))
+
+    def unbound(self):
+        ## the consumer keeps releasing slots, which only loosens the bound
+        self.__bounded = False
+
+    def get(self, block=True, timeout=None):
+        obj = self.__queue.get(block, timeout)
+        if self.__slots is not None:
+            self.__slots.release()
+
+        return self.__unshare(obj)
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def empty(self):
+        return self.__queue.empty()
+
+    def close(self):
+        self.__queue.close()
+
+
 class QueueManager(object):
     __Count = 0
-    __Queues = []
+    __Queues = set()
+    __SharedThreshold = 1024 * 1024
+    __SharedDirectory = None
 
     @staticmethod
     def Reset():
@@ -246,18 +503,48 @@ class QueueManager(object):
             q.close()
             del q
 
-        QueueManager.__Queues = []
+        QueueManager.ClearShared()
+
+        QueueManager.__Queues = set()
         QueueManager.__Count = 0
 
+    @staticmethod
+    def ClearShared():
+        if QueueManager.__SharedDirectory is not None:
+            shutil.rmtree(QueueManager.__SharedDirectory, ignore_errors=True)
+            QueueManager.__SharedDirectory = None
+
     @staticmethod
     def Count():
         return QueueManager.__Count
 
     @staticmethod
-    def CreateQueue():
+    def SetSharedThreshold(size):
+        QueueManager.__SharedThreshold = size
+
+    @staticmethod
+    def SharedThreshold():
+        return QueueManager.__SharedThreshold
+
+    @staticmethod
+    def SharedDirectory():
+        return QueueManager.__SharedDirectory
+
+    @staticmethod
+    def CreateQueue(maxsize=0):
         QueueManager.__Count += 1
-        q = multiprocessing.Queue()
-        QueueManager.__Queues.append(q)
+
+        if QueueManager.__SharedThreshold > 0 or maxsize > 0:
+            if QueueManager.__SharedDirectory is None:
+                ## prefer tmpfs so that payloads stay in memory
+                shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+                QueueManager.__SharedDirectory = tempfile.mkdtemp(prefix="petitBloc_", dir=shm)
+
+            q = SharedQueue(QueueManager.__SharedDirectory, QueueManager.__SharedThreshold, maxsize=maxsize)
+        else:
+            q = multiprocessing.Queue()
+
+        QueueManager.__Queues.add(q)
 
         return q
 
@@ -270,24 +557,56 @@ class QueueManager(object):
         del q
 
 
+atexit.register(QueueManager.ClearShared)
+
+
 class ProcessWorker(multiprocessing.Process):
-    def __init__(self, obj, args=(), kwargs={}):
+    def __init__(self, obj, args=(), kwargs={}, done=None, replay=None):
         super(ProcessWorker, self).__init__()
         self.daemon = True
         self.__obj = obj
+        self.__replay = replay
         self.__has_error = ValueManager.CreateValue("i", 0)
+        self.__done = done
 
     def run(self):
         LogManager.IncreaseCount()
+        WaitManager.SetState(self.__obj.path(), const.WaitState.Running)
         st = time.time()
 
+        meter = None
+        if metrics.MetricsManager.Enabled():
+            meter = metrics.Meter(self.__obj)
+            meter.attach()
+
         try:
-            self.__obj.run()
+            if self.__replay is not None:
+                self.__replay.run(self.__obj)
+            else:
+                self.__obj.run()
         except Exception as e:
             self.__has_error.value = 1
             LogManager.Error(self.__obj.path(), e)
+        except:
+            self.__has_error.value = 1
+            raise
+        finally:
+            for inp in self.__obj.inputs():
+                inp.flush()
+
+            for out in self.__obj.outputs():
+                out.flush()
+
+            LogManager.TimeReport(self.__obj.path(), time.time() - st)
+
+            if meter is not None:
+                LogManager.MetricsReport(meter.detach(self.__has_error.value == 0))
+
+            LogManager.Flush()
+            WaitManager.SetState(self.__obj.path(), const.WaitState.Finished)
 
-        LogManager.TimeReport(self.__obj.path(), time.time() - st)
+            if self.__done is not None:
+                self.__done.put(self.name)
 
     def start(self):
         self.__obj.activate()
@@ -304,11 +623,18 @@ class ProcessWorker(multiprocessing.Process):
 
 class ProcessManager(object):
     __Processes = []
+    __Finishing = []
     __MaxProcess = multiprocessing.cpu_count() - 1 or 1
     __PerProcessCallback = None
+    __Done = None
+    __WaitTime = 1.0
+    __FlushWaitTime = 0.01
 
     @staticmethod
     def SetPerProcessCallback(callback):
+        if callback is not None:
+            callback = staticmethod(callback)
+
         ProcessManager.__PerProcessCallback = callback
 
     @staticmethod
@@ -329,7 +655,12 @@ class ProcessManager(object):
             p.terminate()
             del p
 
+        if ProcessManager.__Done is not None:
+            ProcessManager.__Done.close()
+            ProcessManager.__Done = None
+
         ProcessManager.__Processes = []
+        ProcessManager.__Finishing = []
         ProcessManager.__MaxProcess = multiprocessing.cpu_count() - 1 or 1
         ProcessManager.__PerProcessCallback = None
 
@@ -338,19 +669,51 @@ class ProcessManager(object):
         return len(ProcessManager.__Processes)
 
     @staticmethod
-    def Submit(obj, args=(), kwargs={}):
+    def Submit(obj, args=(), kwargs={}, replay=None):
         while (len(ProcessManager.__Processes) >= ProcessManager.__MaxProcess):
-            for p in ProcessManager.__Processes:
-                if p.is_alive():
-                    continue
-                else:
-                    ProcessManager.RunPerProcessCallback()
-                    ProcessManager.DeleteProcess(p)
+            ProcessManager.WaitProcess()
 
-        p = ProcessWorker(obj, args=args, kwargs=kwargs)
+        if ProcessManager.__Done is None:
+            ProcessManager.__Done = multiprocessing.Queue()
+
+        p = ProcessWorker(obj, args=args, kwargs=kwargs, done=ProcessManager.__Done, replay=replay)
         ProcessManager.__Processes.append(p)
         p.start()
 
+    @staticmethod
+    def WaitProcess():
+        ## a worker reports its name when the block is done, but the process
+        ## still has to flush its queues before it exits
+        while (True):
+            for p in ProcessManager.__Finishing:
+                if not p.is_alive():
+                    ProcessManager.__Finishing.remove(p)
+                    ProcessManager.RunPerProcessCallback()
+                    ProcessManager.DeleteProcess(p)
+
+                    return
+
+            if ProcessManager.__Finishing:
+                timeout = ProcessManager.__FlushWaitTime
+            else:
+                timeout = ProcessManager.__WaitTime
+
+            try:
+                name = ProcessManager.__Done.get(timeout=timeout)
+            except Queue.Empty:
+                ## the process died without reporting
+                for p in ProcessManager.__Processes:
+                    if p not in ProcessManager.__Finishing and not p.is_alive():
+                        ProcessManager.__Finishing.append(p)
+
+                continue
+
+            for p in ProcessManager.__Processes:
+                if p.name == name:
+                    p.join(ProcessManager.__FlushWaitTime)
+                    ProcessManager.__Finishing.append(p)
+                    break
+
     @staticmethod
     def DeleteProcess(p):
         p.terminate()
@@ -360,47 +723,39 @@ class ProcessManager(object):
     @staticmethod
     def Join():
         while (ProcessManager.__Processes):
-            for p in ProcessManager.__Processes:
-                if not p.is_alive():
-                    ProcessManager.RunPerProcessCallback()
-                    ProcessManager.DeleteProcess(p)
-
+            ProcessManager.WaitProcess()
 
-def RunSchedule(schedule, maxProcess=0, perProcessCallback=None):
+def RunSchedule(schedule, maxProcess=0, perProcessCallback=None, memo=None):
     SubprocessManager.Initialize()
     SubprocessManager.Reset()
     LogManager.Initialize()
     LogManager.Reset()
+    LogManager.Start()
     ValueManager.Reset()
     QueueManager.Reset()
     ProcessManager.Reset()
     ProcessManager.SetMaxProcess(maxProcess)
     ProcessManager.SetPerProcessCallback(perProcessCallback)
 
-    work_schedule = copy.copy(schedule)
-
-    for s in work_schedule:
+    for s in schedule:
         s.resetState()
 
-    while (work_schedule):
-        bloc = work_schedule.pop(0)
-        if bloc.isTerminated() or bloc.isWorking() or bloc.isFailed():
-            continue
+    WaitManager.Reset(schedule)
 
-        suspend = False
+    work_schedule = scheduler.Scheduler(schedule)
 
-        for up in bloc.upstream():
-            if up.isWaiting():
-                suspend = True
-                break
+    while (True):
+        bloc = work_schedule.next()
+        if bloc is None:
+            break
 
-        if suspend:
-            work_schedule.append(bloc)
-            continue
+        if bloc.isWaiting():
+            ProcessManager.Submit(bloc, replay=memo.prepare(bloc) if memo is not None else None)
 
-        ProcessManager.Submit(bloc)
+        work_schedule.started(bloc)
 
     ProcessManager.Join()
+    LogManager.Stop()
 
     for s in schedule:
         if not s.hasNetwork():
@@ -414,6 +769,9 @@ def RunSchedule(schedule, maxProcess=0, perProcessCallback=None):
 
         s.terminate(success)
 
+    if memo is not None:
+        memo.finish()
+
     if perProcessCallback is not None:
         perProcessCallback()
 
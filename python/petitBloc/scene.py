@@ -1,11 +1,13 @@
 import re
 import json
-import operator
 from . import box
 from . import chain
 from . import blockManager
+from . import catalog
 from . import workerManager
 from . import const
+from . import parameter
+from . import util
 import os
 
 
@@ -13,14 +15,7 @@ ReBootNode = re.compile("^{}\/".format(const.RootBoxName))
 
 
 def __sortDataBtPath(data):
-    return sorted(data, cmp=__blockCompare, key=operator.itemgetter("path"))
-
-
-def __blockCompare(x, y):
-    xc = x.count("/")
-    yc = y.count("/")
-
-    return cmp(x, y) if xc == yc else cmp(xc, yc)
+    return util.SortByPath(data)
 
 
 def __addRootPath(path):
@@ -53,37 +48,26 @@ def __setVerboseLevel(l):
         workerManager.WorkerManager.SetLogLevel(const.LogLevel.Debug)
 
 
-def __query(filePath):
-    data = Read(filePath)
-
-    if (data["blocks"]):
-        print("# List Blocks")
-    for b in data["blocks"]:
-        print("    '{}'({})".format(__addRootPath(b["path"]), b["type"]))
-
-        for k, v in b.get("params", {}).iteritems():
-            if v["expression"]:
-                print("        {}@{}: {}".format(__addRootPath(b["path"]), k, str(v["expression"])))
-            else:
-                print("        {}@{}: {}".format(__addRootPath(b["path"]), k, str(v["value"])))
-        for k, v in b.get("extraParams", {}).iteritems():
-            if v["expression"]:
-                print("        {}@{}: {} ({})".format(__addRootPath(b["path"]), k, str(v["expression"]), str(v["type"])))
-            else:
-                print("        {}@{}: {} ({})".format(__addRootPath(b["path"]), k, str(v["value"]), str(v["type"])))
-
-    if data["connections"]:
-        print("# List Connections")
-    for con in data["connections"]:
-        print("    {} >> {}".format(__addRootPath(con["src"]), __addRootPath(con["path"])))
-
-
 def __read(filePath):
     manager = blockManager.BlockManager()
     root = box.Box(const.RootBoxName)
 
     data = Read(filePath)
 
+    packet_mode = data.get("packetMode")
+    if packet_mode is not None:
+        if packet_mode in const.PacketMode.__members__:
+            workerManager.WorkerManager.SetPacketMode(const.PacketMode[packet_mode])
+        else:
+            print("Warning : Unknown packet mode : {}".format(packet_mode))
+
+    history_mode = data.get("historyMode")
+    if history_mode is not None:
+        if history_mode in const.HistoryMode.__members__:
+            workerManager.WorkerManager.SetHistoryMode(const.HistoryMode[history_mode], data.get("historySize"))
+        else:
+            print("Warning : Unknown history mode : {}".format(history_mode))
+
     ## create blocks
     for b in data["blocks"]:
         full_path = __addRootPath(b["path"])
@@ -216,6 +200,8 @@ def __read(filePath):
 
 
 def __overrideContext(root, parameters):
+    changed = []
+
     for p in parameters:
         if p.count("=") != 1:
             print("Warning : Invalid context setting - {}".format(p))
@@ -235,12 +221,17 @@ def __overrideContext(root, parameters):
             else:
                 v = type_class(value)
 
-            param.set(v)
+            if param.set(v):
+                changed.append(param)
         except Exception as e:
             print("Warning : Failed to override context. Invalid value - {} : {}".format(type_class.__name__, value))
 
+    return changed
+
 
 def __override(root, parameters):
+    changed = []
+
     for p in parameters:
         if p.count("@") != 1 or p.count("=") != 1:
             print("Warning : Invalid parameter setting - {}".format(p))
@@ -265,10 +256,13 @@ def __override(root, parameters):
             else:
                 v = type_class(value)
 
-            param.set(v)
+            if param.set(v):
+                changed.append(param)
         except Exception as e:
             print("Warning : Failed to override parameter. Invalid value - {} : {}".format(type_class.__name__, value))
 
+    return changed
+
 
 def Write(path, data):
     data["blocks"] = __sortDataBtPath(data["blocks"])
@@ -296,66 +290,38 @@ def Read(path):
 
 
 def BlockInfo(blockType):
-    manager = blockManager.BlockManager()
-    bc = manager.block(blockType)
-
-    if bc:
-        try:
-            bloc = bc()
-            print("# <{}>".format(bloc.__class__.__name__))
-
-            print("    InPort")
-            for inp in bloc.inputs():
-                print("        '{}' ({})".format(inp.name(), inp.typeClass().__name__))
-            print("    OutPort")
-            for inp in bloc.outputs():
-                print("        '{}' ({})".format(inp.name(), inp.typeClass().__name__))
-            print("    Parameter")
-            for param in bloc.params():
-                print("        '{}' ({})".format(param.name(), param.typeClass().__name__))
-
-        except Exception as e:
-            print("Warning : Could not create an instance of {}".format(blockType))
-            print(e)
-            return False
-
-    else:
-        print("Warning : Unknown block type : {}".format(blockType))
-        return False
-
-    return True
+    return catalog.BlockInfo(blockType)
 
 
 def BlockList():
-    manager = blockManager.BlockManager()
-
-    print("# Block List")
-    for b in manager.blockNames():
-        print("    {}".format(b))
+    return catalog.BlockList()
 
 
 def Query(filePath):
-    try:
-        __query(filePath)
-
-    except Exception as e:
-        print("ERROR : {}".format(str(e)))
-
-        return False
-
-    return True
+    return catalog.Query(filePath)
 
 
-def Run(filePath, contexts=[], parameters=[], multiProcessing=False, attrbutes=[], verbose=1):
+def Run(filePath, contexts=[], parameters=[], multiProcessing=False, attrbutes=[], verbose=1, cache=None):
     try:
         __setVerboseLevel(verbose)
 
         workerManager.WorkerManager.SetUseProcess(multiProcessing)
 
+        if cache:
+            workerManager.WorkerManager.SetMemoize(True)
+            workerManager.WorkerManager.SetMemoDirectory(cache)
+
         root = __read(filePath)
 
-        __override(root, parameters)
-        __overrideContext(root, contexts)
+        graph = parameter.ExpressionGraph(root)
+        for param in graph.cycles():
+            print("Warning : Cyclic expression - {}".format(param.path()))
+
+        graph.evaluate()
+
+        changed = __override(root, parameters)
+        changed += __overrideContext(root, contexts)
+        graph.update(changed)
 
         schedule = root.getSchedule()
         workerManager.WorkerManager.RunSchedule(schedule)
@@ -0,0 +1,84 @@
+import collections
+
+
+class Scheduler(object):
+    def __init__(self, schedule):
+        super(Scheduler, self).__init__()
+        self.__blocks = []
+        self.__indegree = {}
+        self.__downstreams = {}
+        self.__ready = collections.deque()
+        self.__pending = 0
+
+        members = set()
+        for bloc in schedule:
+            if bloc in members:
+                continue
+
+            members.add(bloc)
+            self.__blocks.append(bloc)
+
+        for bloc in self.__blocks:
+            self.__downstreams[bloc] = []
+
+        for bloc in self.__blocks:
+            ups = set()
+            for up in bloc.upstream():
+                if up in members and up is not bloc:
+                    ups.add(up)
+
+            for up in ups:
+                self.__downstreams[up].append(bloc)
+
+            self.__indegree[bloc] = len(ups)
+
+        for bloc in self.__blocks:
+            if self.__indegree[bloc] == 0:
+                self.__ready.append(bloc)
+
+        self.__pending = len(self.__blocks)
+
+    def blocks(self):
+        return list(self.__blocks)
+
+    def pending(self):
+        return self.__pending
+
+    def hasReady(self):
+        return len(self.__ready) > 0
+
+    def next(self):
+        while (self.__ready):
+            bloc = self.__ready.popleft()
+            if self.__indegree.get(bloc) is None:
+                continue
+
+            return bloc
+
+        if self.__pending <= 0:
+            return None
+
+        ## every remaining block waits on another remaining block (a cycle),
+        ## start the earliest one in the schedule to keep the graph moving
+        for bloc in self.__blocks:
+            if self.__indegree.get(bloc) is not None:
+                return bloc
+
+        return None
+
+    def started(self, bloc):
+        if self.__indegree.pop(bloc, None) is None:
+            return
+
+        self.__pending -= 1
+
+        for down in self.__downstreams.get(bloc, []):
+            count = self.__indegree.get(down)
+            if count is None:
+                continue
+
+            count -= 1
+            self.__indegree[down] = count
+
+            if count == 0:
+                self.__ready.append(down)
@@ -0,0 +1,104 @@
+import threading
+import Queue
+import os
+import subprocess
+
+
+class SubprocessWorker(object):
+    def __init__(self, cmd):
+        self.__command = cmd
+        self.__return_code = None
+        self.__done = threading.Event()
+
+    def command(self):
+        return self.__command
+
+    def isRunning(self):
+        return not self.__done.is_set()
+
+    def isDone(self):
+        return self.__done.is_set()
+
+    def returnCode(self):
+        self.__done.wait()
+
+        return self.__return_code
+
+    def result(self):
+        return self.returnCode() == 0
+
+    def execute(self):
+        try:
+            p = subprocess.Popen(self.__command, shell=True)
+            ## each slot blocks in waitpid on its own child, the next command starts as soon as it returns
+            self.__return_code = p.wait()
+        except (OSError, ValueError):
+            self.__return_code = -1
+
+    def finish(self):
+        self.__done.set()
+
+
+class SubprocessPool(object):
+    def __init__(self, maxProcess, slots=None):
+        super(SubprocessPool, self).__init__()
+        self.__pid = os.getpid()
+        self.__queue = Queue.Queue()
+        self.__slots = slots
+        self.__lock = threading.Lock()
+        self.__count = 0
+        self.__threads = []
+
+        for i in range(max(maxProcess, 1)):
+            th = threading.Thread(target=self.__work)
+            th.daemon = True
+            th.start()
+            self.__threads.append(th)
+
+    def pid(self):
+        return self.__pid
+
+    def count(self):
+        return self.__count
+
+    def submit(self, cmd):
+        worker = SubprocessWorker(cmd)
+
+        with self.__lock:
+            self.__count += 1
+
+        self.__queue.put(worker)
+
+        return worker
+
+    def shutdown(self):
+        ## queued commands are still executed before the slots exit
+        for th in self.__threads:
+            self.__queue.put(None)
+
+        ## a thread exiting while a worker process is forked can leave the threading locks held in the child
+        for th in self.__threads:
+            th.join()
+
+        self.__threads = []
+
+    def __work(self):
+        while (True):
+            worker = self.__queue.get()
+            if worker is None:
+                break
+
+            ## the slots are shared between the worker processes in the process mode
+            if self.__slots is not None:
+                self.__slots.acquire()
+
+            try:
+                worker.execute()
+            finally:
+                if self.__slots is not None:
+                    self.__slots.release()
+
+                with self.__lock:
+                    self.__count -= 1
+
+                worker.finish()
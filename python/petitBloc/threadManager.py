@@ -1,34 +1,20 @@
 import threading
+import collections
+import atexit
 import Queue
 import copy
 import time
 from . import const
-import subprocess
+from . import core
+from . import scheduler
+from . import metrics
+from . import subprocessPool
 import multiprocessing
 
 
-class SubprocessWorker(object):
-    def __init__(self, cmd):
-        self.__command = cmd
-        self.__p = subprocess.Popen(cmd, shell=True)
-
-    def command(self):
-        return self.__command
-
-    def isRunning(self):
-        return self.__p.poll() is None
-
-    def result(self):
-        res = self.__p.wait() == 0
-        SubprocessManager.DeleteProcess(self)
-
-        return res
-
-
 class SubprocessManager(object):
-    __Processes = []
+    __Pool = None
     __MaxProcess = multiprocessing.cpu_count() - 1 or 1
-    __WaitTime = 0.5
     __Lock = threading.Lock()
 
     @staticmethod
@@ -38,46 +24,34 @@ class SubprocessManager(object):
         else:
             SubprocessManager.__MaxProcess = num
 
+        SubprocessManager.__Shutdown()
+
     @staticmethod
     def Reset():
-        for p in SubprocessManager.__Processes:
-            del p
-
-        SubprocessManager.__Processes = []
+        SubprocessManager.__Shutdown()
         SubprocessManager.__MaxProcess = multiprocessing.cpu_count() - 1 or 1
 
     @staticmethod
-    def Count():
-        return len(SubprocessManager.__Processes)
+    def __Shutdown():
+        with SubprocessManager.__Lock:
+            if SubprocessManager.__Pool is not None:
+                SubprocessManager.__Pool.shutdown()
+                SubprocessManager.__Pool = None
 
     @staticmethod
-    def DeleteProcess(p):
-        SubprocessManager.__Lock.acquire()
-
-        if p in SubprocessManager.__Processes:
-            SubprocessManager.__Processes.remove(p)
+    def Count():
+        if SubprocessManager.__Pool is None:
+            return 0
 
-        SubprocessManager.__Lock.release()
+        return SubprocessManager.__Pool.count()
 
     @staticmethod
     def Submit(cmd):
-        while (True):
-            SubprocessManager.__Lock.acquire()
+        with SubprocessManager.__Lock:
+            if SubprocessManager.__Pool is None:
+                SubprocessManager.__Pool = subprocessPool.SubprocessPool(SubprocessManager.__MaxProcess)
 
-            if SubprocessManager.Count() < SubprocessManager.__MaxProcess:
-                worker = SubprocessWorker(cmd)
-                SubprocessManager.__Processes.append(worker)
-                SubprocessManager.__Lock.release()
-
-                return worker
-
-            SubprocessManager.__Lock.release()
-
-            for p in SubprocessManager.__Processes:
-                if not p.isRunning():
-                    SubprocessManager.DeleteProcess(p)
-
-            time.sleep(SubprocessManager.__WaitTime)
+            return SubprocessManager.__Pool.submit(cmd)
 
 
 class LogManager(object):
@@ -86,6 +60,7 @@ class LogManager(object):
     __Count = 0
     __TotalTime = 0
     __TimeLog = {}
+    __StallLog = {}
     __ErrorLog = {}
     __WarnLog = {}
     __DebugLog = {}
@@ -99,6 +74,7 @@ class LogManager(object):
         LogManager.__Count = 0
         LogManager.__TotalTime = 0
         LogManager.__TimeLog = {}
+        LogManager.__StallLog = {}
         LogManager.__ErrorLog = {}
         LogManager.__WarnLog = {}
         LogManager.__DebugLog = {}
@@ -135,6 +111,23 @@ class LogManager(object):
 
         return LogManager.__TotalTime / float(LogManager.__Count)
 
+    @staticmethod
+    def StallReport(path, v):
+        count, total = LogManager.__StallLog.get(path, (0, 0.0))
+        LogManager.__StallLog[path] = (count + 1, total + v)
+
+    @staticmethod
+    def StallLog(path):
+        return LogManager.__StallLog.get(path, (0, 0.0))
+
+    @staticmethod
+    def MetricsReport(result):
+        metrics.MetricsManager.Record(result)
+
+    @staticmethod
+    def StallLogs():
+        return copy.copy(LogManager.__StallLog)
+
     @staticmethod
     def ErrorLogs():
         return copy.deepcopy(LogManager.__ErrorLog)
@@ -189,14 +182,14 @@ class LogManager(object):
 
 class QueueManager(object):
     __Count = 0
-    __Queues = []
+    __Queues = set()
 
     @staticmethod
     def Reset():
         for q in QueueManager.__Queues:
             del q
 
-        QueueManager.__Queues = []
+        QueueManager.__Queues = set()
         QueueManager.__Count = 0
 
     @staticmethod
@@ -204,10 +197,16 @@ class QueueManager(object):
         return QueueManager.__Count
 
     @staticmethod
-    def CreateQueue():
+    def CreateQueue(maxsize=0):
         QueueManager.__Count += 1
-        q = Queue.Queue()
-        QueueManager.__Queues.append(q)
+        if WorkerPool.IsCooperative():
+            q = SignalQueue(maxsize)
+        elif maxsize > 0:
+            q = BoundedQueue(maxsize)
+        else:
+            q = Queue.Queue()
+
+        QueueManager.__Queues.add(q)
 
         return q
 
@@ -219,42 +218,384 @@ class QueueManager(object):
         del q
 
 
-class ProcessWorker(threading.Thread):
-    def __init__(self, obj, args=(), kwargs={}):
+class WaitManager(object):
+    __States = {}
+    __Enabled = False
+
+    @staticmethod
+    def Reset(schedule):
+        WaitManager.__States = {}
+        WaitManager.__Enabled = False
+
+        for s in schedule:
+            WaitManager.__States[s.path()] = (const.WaitState.NotStarted, None)
+
+            ## nothing can wait on a full chain without a bounded one
+            for out in s.outputs():
+                for chn in out.chains():
+                    if chn.capacity() > 0:
+                        WaitManager.__Enabled = True
+
+    @staticmethod
+    def Enabled():
+        return WaitManager.__Enabled
+
+    @staticmethod
+    def SetState(path, state, target=None):
+        if path in WaitManager.__States:
+            WaitManager.__States[path] = (state, target)
+
+    @staticmethod
+    def State(path):
+        return WaitManager.__States.get(path, (const.WaitState.Running, None))
+
+    @staticmethod
+    def Paths():
+        return WaitManager.__States.keys()
+
+
+class BoundedQueue(Queue.Queue):
+    def forcePut(self, item):
+        with self.mutex:
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def unbound(self):
+        with self.mutex:
+            self.maxsize = 0
+            self.not_full.notify_all()
+
+
+class SignalQueue(BoundedQueue):
+    def put(self, item, block=True, timeout=None):
+        BoundedQueue.put(self, item, block=block, timeout=timeout)
+        WorkerPool.Signal()
+
+    def forcePut(self, item):
+        BoundedQueue.forcePut(self, item)
+        WorkerPool.Signal()
+
+
+class ProcessWorker(object):
+    def __init__(self, obj, args=(), kwargs={}, done=None, replay=None):
         super(ProcessWorker, self).__init__()
-        self.daemon = True
         self.__obj = obj
+        self.__replay = replay
         self.__args = args
         self.__kwargs = kwargs
         self.__success = True
+        self.__done = done
+        self.__alive = False
+        self.__start_time = None
+        self.__meter = None
 
     def run(self):
-        LogManager.IncreaseCount()
-        st = time.time()
+        self.__begin()
 
         try:
-            self.__obj.run()
+            if self.__replay is not None:
+                self.__replay.run(self.__obj)
+            else:
+                self.__obj.run()
         except Exception as e:
             self.__success = False
             LogManager.Error(self.__obj.path(), e)
+        except:
+            self.__success = False
+            raise
+        finally:
+            self.__end()
+
+    def isSteppable(self):
+        if self.__replay is not None:
+            return False
+
+        if self.__obj.__class__.run.im_func is not core.ComponentBase.run.im_func:
+            return False
+
+        ## a full bounded chain would block the whole pool worker
+        for out in self.__obj.outputs():
+            for chn in out.chains():
+                if chn.capacity() > 0:
+                    return False
+
+        return True
+
+    def isReady(self):
+        for inp in self.__obj.inputs():
+            if inp.reachedEOP():
+                continue
+
+            for chn in inp.chains():
+                if chn.empty():
+                    return False
+
+        return True
+
+    def step(self):
+        if self.__start_time is None:
+            self.__begin()
+
+        elif self.__meter is not None:
+            self.__meter.resume()
+
+        keep = False
+
+        try:
+            keep = self.__obj.process()
+        except Exception as e:
+            self.__success = False
+            LogManager.Error(self.__obj.path(), e)
+        except:
+            self.__success = False
+            self.__end()
+            raise
+
+        if not keep:
+            self.__end()
+
+        elif self.__meter is not None:
+            self.__meter.pause()
+
+        return keep
+
+    def __begin(self):
+        LogManager.IncreaseCount()
+        WaitManager.SetState(self.__obj.path(), const.WaitState.Running)
+        self.__start_time = time.time()
+
+        if metrics.MetricsManager.Enabled():
+            self.__meter = metrics.Meter(self.__obj)
+            self.__meter.attach()
+
+    def __end(self):
+        for inp in self.__obj.inputs():
+            inp.flush()
+
+        for out in self.__obj.outputs():
+            out.flush()
+
+        LogManager.TimeReport(self.__obj.path(), time.time() - self.__start_time)
+
+        if self.__meter is not None:
+            LogManager.MetricsReport(self.__meter.detach(self.__success))
+            self.__meter = None
 
-        LogManager.TimeReport(self.__obj.path(), time.time() - st)
+        self.__alive = False
+        WaitManager.SetState(self.__obj.path(), const.WaitState.Finished)
+
+        if self.__done is not None:
+            self.__done.put(self)
+
+    def is_alive(self):
+        return self.__alive
 
     def start(self):
         self.__obj.activate()
-        super(ProcessWorker, self).start()
+        self.__alive = True
+        WorkerPool.Submit(self)
 
     def terminate(self):
         if not self.__obj.isTerminated():
             self.__obj.terminate(self.__success)
 
+
+class PoolWorker(threading.Thread):
+    def __init__(self):
+        super(PoolWorker, self).__init__()
+        self.daemon = True
+        self.holding = False
+
+    def run(self):
+        held = []
+
+        while (True):
+            task, held = WorkerPool.Take(self, held)
+            if task is None and not held:
+                break
+
+            if task is not None:
+                task.run()
+                continue
+
+            for t in list(held):
+                while (t.isReady()):
+                    if not t.step():
+                        held.remove(t)
+                        break
+
+
+class WorkerPool(object):
+    __Lock = threading.Lock()
+    __TaskCondition = threading.Condition(__Lock)
+    __PacketCondition = threading.Condition(__Lock)
+    __Workers = []
+    __Idle = 0
+    __Runs = collections.deque()
+    __Steps = collections.deque()
+    __Serial = 0
+    __Size = 999
+    __Cooperative = False
+    __Closed = False
+
+    @staticmethod
+    def SetSize(num):
+        WorkerPool.__Lock.acquire()
+
+        if num <= 0:
+            WorkerPool.__Size = 999
+        else:
+            WorkerPool.__Size = num
+
+        WorkerPool.__TaskCondition.notify_all()
+        WorkerPool.__Lock.release()
+
+    @staticmethod
+    def Size():
+        return WorkerPool.__Size
+
+    @staticmethod
+    def Shutdown():
+        WorkerPool.__Lock.acquire()
+        WorkerPool.__Closed = True
+        WorkerPool.__TaskCondition.notify_all()
+        WorkerPool.__PacketCondition.notify_all()
+        workers = list(WorkerPool.__Workers)
+        WorkerPool.__Lock.release()
+
+        for w in workers:
+            w.join(0.1)
+
+    @staticmethod
+    def Count():
+        return len(WorkerPool.__Workers)
+
+    @staticmethod
+    def SetCooperative(value):
+        WorkerPool.__Cooperative = value
+
+    @staticmethod
+    def IsCooperative():
+        return WorkerPool.__Cooperative
+
+    @staticmethod
+    def Signal():
+        WorkerPool.__Lock.acquire()
+        WorkerPool.__Serial += 1
+        WorkerPool.__PacketCondition.notify_all()
+        WorkerPool.__Lock.release()
+
+    @staticmethod
+    def Submit(task):
+        WorkerPool.__Lock.acquire()
+
+        if WorkerPool.__Cooperative and task.isSteppable():
+            WorkerPool.__Steps.append(task)
+        else:
+            WorkerPool.__Runs.append(task)
+
+        WorkerPool.__Balance()
+
+        WorkerPool.__Lock.release()
+
+    @staticmethod
+    def __Spawn():
+        w = PoolWorker()
+        WorkerPool.__Workers.append(w)
+        w.start()
+
+    @staticmethod
+    def __Balance():
+        ## called with the lock held, wakes or starts a worker for the queued tasks
+        if not WorkerPool.__Runs and not WorkerPool.__Steps:
+            return
+
+        if WorkerPool.__Idle > 0:
+            WorkerPool.__TaskCondition.notify()
+            return
+
+        if len(WorkerPool.__Workers) < WorkerPool.__Size:
+            WorkerPool.__Spawn()
+            return
+
+        holding = False
+        for w in WorkerPool.__Workers:
+            if w.holding:
+                holding = True
+                break
+
+        ## a worker driving steps never starts a run task, and a run task can wait on a
+        ## step block, so the pool goes over its size rather than leaving either behind
+        if WorkerPool.__Runs and holding:
+            WorkerPool.__Spawn()
+        elif WorkerPool.__Steps:
+            if holding:
+                WorkerPool.__PacketCondition.notify_all()
+            else:
+                WorkerPool.__Spawn()
+
+    @staticmethod
+    def Take(worker, held):
+        ## returns a task to run to the end, or the list of blocks this worker
+        ## drives step by step once one of them may be able to continue
+        WorkerPool.__Lock.acquire()
+
+        try:
+            if held:
+                serial = WorkerPool.__Serial
+                while (WorkerPool.__Steps):
+                    held.append(WorkerPool.__Steps.popleft())
+
+                for t in held:
+                    if t.isReady():
+                        return (None, held)
+
+                while (serial == WorkerPool.__Serial and not WorkerPool.__Steps):
+                    WorkerPool.__PacketCondition.wait()
+
+                while (WorkerPool.__Steps):
+                    held.append(WorkerPool.__Steps.popleft())
+
+                return (None, held)
+
+            while (True):
+                if WorkerPool.__Runs:
+                    task = WorkerPool.__Runs.popleft()
+                    ## the steps still queued must not wait behind this task
+                    WorkerPool.__Balance()
+                    return (task, held)
+
+                if WorkerPool.__Steps:
+                    held.append(WorkerPool.__Steps.popleft())
+                    return (None, held)
+
+                if WorkerPool.__Closed or len(WorkerPool.__Workers) > WorkerPool.__Size:
+                    WorkerPool.__Workers.remove(worker)
+                    return (None, held)
+
+                WorkerPool.__Idle += 1
+                WorkerPool.__TaskCondition.wait()
+                WorkerPool.__Idle -= 1
+        finally:
+            worker.holding = len(held) > 0
+            WorkerPool.__Lock.release()
+
+
+atexit.register(WorkerPool.Shutdown)
+
+
 class ThreadManager(object):
     __Threads = []
     __MaxThreads = 999
     __PerProcessCallback = None
+    __Done = Queue.Queue()
 
     @staticmethod
     def SetPerProcessCallback(callback):
+        if callback is not None:
+            callback = staticmethod(callback)
+
         ThreadManager.__PerProcessCallback = callback
 
     @staticmethod
@@ -278,25 +619,30 @@ class ThreadManager(object):
         ThreadManager.__Threads = []
         ThreadManager.__MaxThreads = 999
         ThreadManager.__PerProcessCallback = None
+        ThreadManager.__Done = Queue.Queue()
 
     @staticmethod
     def Count():
         return len(ThreadManager.__Threads)
 
     @staticmethod
-    def Submit(obj, args=(), kwargs={}):
+    def Submit(obj, args=(), kwargs={}, replay=None):
         while (len(ThreadManager.__Threads) >= ThreadManager.__MaxThreads):
-            for p in ThreadManager.__Threads:
-                if p.is_alive():
-                    continue
-                else:
-                    ThreadManager.RunPerProcessCallback()
-                    ThreadManager.DeleteProcess(p)
-
-        p = ProcessWorker(obj, args=args, kwargs=kwargs)
+            ThreadManager.WaitProcess()
+
+        p = ProcessWorker(obj, args=args, kwargs=kwargs, done=ThreadManager.__Done, replay=replay)
         ThreadManager.__Threads.append(p)
         p.start()
 
+    @staticmethod
+    def WaitProcess():
+        p = ThreadManager.__Done.get()
+        if p not in ThreadManager.__Threads:
+            return
+
+        ThreadManager.RunPerProcessCallback()
+        ThreadManager.DeleteProcess(p)
+
     @staticmethod
     def DeleteProcess(p):
         p.terminate()
@@ -306,13 +652,9 @@ class ThreadManager(object):
     @staticmethod
     def Join():
         while (ThreadManager.__Threads):
-            for p in ThreadManager.__Threads:
-                if not p.is_alive():
-                    ThreadManager.RunPerProcessCallback()
-                    ThreadManager.DeleteProcess(p)
-
+            ThreadManager.WaitProcess()
 
-def RunSchedule(schedule, maxProcess=0, perProcessCallback=None):
+def RunSchedule(schedule, maxProcess=0, perProcessCallback=None, memo=None):
     LogManager.Reset()
     QueueManager.Reset()
     ThreadManager.Reset()
@@ -320,28 +662,22 @@ def RunSchedule(schedule, maxProcess=0, perProcessCallback=None):
     ThreadManager.SetMaxProcess(maxProcess)
     ThreadManager.SetPerProcessCallback(perProcessCallback)
 
-    work_schedule = copy.copy(schedule)
-
-    for s in work_schedule:
+    for s in schedule:
         s.resetState()
 
-    while (work_schedule):
-        bloc = work_schedule.pop(0)
-        if bloc.isTerminated() or bloc.isWorking() or bloc.isFailed():
-            continue
+    WaitManager.Reset(schedule)
 
-        suspend = False
+    work_schedule = scheduler.Scheduler(schedule)
 
-        for up in bloc.upstream():
-            if up.isWaiting():
-                suspend = True
-                break
+    while (True):
+        bloc = work_schedule.next()
+        if bloc is None:
+            break
 
-        if suspend:
-            work_schedule.append(bloc)
-            continue
+        if bloc.isWaiting():
+            ThreadManager.Submit(bloc, replay=memo.prepare(bloc) if memo is not None else None)
 
-        ThreadManager.Submit(bloc)
+        work_schedule.started(bloc)
 
     ThreadManager.Join()
 
@@ -357,6 +693,9 @@ def RunSchedule(schedule, maxProcess=0, perProcessCallback=None):
 
         s.terminate(success)
 
+    if memo is not None:
+        memo.finish()
+
     if perProcessCallback is not None:
         perProcessCallback()
 
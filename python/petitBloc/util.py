@@ -1,5 +1,8 @@
 import re
 import json
+import operator
+import threading
+import collections
 
 
 ReConvention = re.compile("^[a-zA-Z][a-zA-Z0-9_]*$")
@@ -29,6 +32,17 @@ def GetUniqueName(name, all_names):
     return "{}{}".format(pure, idx + 1)
 
 
+def SortByPath(data):
+    return sorted(data, cmp=__pathCompare, key=operator.itemgetter("path"))
+
+
+def __pathCompare(x, y):
+    xc = x.count("/")
+    yc = y.count("/")
+
+    return cmp(x, y) if xc == yc else cmp(xc, yc)
+
+
 def LoadConfig(filePath):
     data = {}
 
@@ -43,3 +57,142 @@ def LoadConfig(filePath):
         return {}
     else:
         return data
+
+
+class RegexCache(object):
+    ## re keeps only a small cache and clears all of it once full, this one drops the least recently used pattern
+    __MaxSize = 256
+    __Cache = collections.OrderedDict()
+    __Lock = threading.Lock()
+
+    @staticmethod
+    def SetMaxSize(num):
+        with RegexCache.__Lock:
+            RegexCache.__MaxSize = max(num, 1)
+            while (len(RegexCache.__Cache) > RegexCache.__MaxSize):
+                RegexCache.__Cache.popitem(last=False)
+
+    @staticmethod
+    def MaxSize():
+        return RegexCache.__MaxSize
+
+    @staticmethod
+    def Count():
+        return len(RegexCache.__Cache)
+
+    @staticmethod
+    def Clear():
+        with RegexCache.__Lock:
+            RegexCache.__Cache.clear()
+
+    @staticmethod
+    def Compile(pattern, flags=0):
+        key = (type(pattern), pattern, flags)
+
+        with RegexCache.__Lock:
+            regex = RegexCache.__Cache.pop(key, None)
+            if regex is None:
+                regex = re.compile(pattern, flags)
+                while (len(RegexCache.__Cache) >= RegexCache.__MaxSize):
+                    RegexCache.__Cache.popitem(last=False)
+
+            RegexCache.__Cache[key] = regex
+
+        return regex
+
+
+ReJsonSpace = re.compile(r"[ \t\n\r]*")
+
+
+class JsonStream(object):
+    def __init__(self, f, chunkSize=65536):
+        super(JsonStream, self).__init__()
+        self.__file = f
+        self.__chunk_size = chunkSize
+        self.__buffer = ""
+        self.__pos = 0
+        self.__eof = False
+        self.__decoder = json.JSONDecoder()
+
+    def __fill(self, size=None):
+        if self.__eof:
+            return False
+
+        more = self.__file.read(max(size or 0, self.__chunk_size))
+        if not more:
+            self.__eof = True
+            return False
+
+        self.__buffer = self.__buffer[self.__pos:] + more
+        self.__pos = 0
+
+        return True
+
+    def peek(self):
+        while (True):
+            self.__pos = ReJsonSpace.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+
+            if not self.__fill():
+                return None
+
+    def expect(self, chars):
+        c = self.peek()
+        if c is None or c not in chars:
+            raise ValueError("Expecting one of '{}' at {}".format(chars, c))
+
+        self.__pos += 1
+
+        return c
+
+    def decode(self):
+        self.peek()
+
+        while (True):
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__pos)
+            except ValueError:
+                ## the value continues in the next chunk
+                if not self.__fill(len(self.__buffer)):
+                    raise
+
+                continue
+
+            ## a number could have been cut at the end of the buffer
+            if end >= len(self.__buffer) and self.__fill():
+                continue
+
+            self.__pos = end
+
+            return value
+
+
+def StreamJson(filePath, chunkSize=65536):
+    ## yields the top level members one by one, items of a list are yielded separately
+    with open(filePath, "r") as f:
+        stream = JsonStream(f, chunkSize=chunkSize)
+        stream.expect("{")
+
+        if stream.peek() == "}":
+            return
+
+        while (True):
+            key = stream.decode()
+            stream.expect(":")
+
+            if stream.peek() == "[":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.expect("]")
+                else:
+                    while (True):
+                        yield key, stream.decode()
+
+                        if stream.expect(",]") == "]":
+                            break
+            else:
+                yield key, stream.decode()
+
+            if stream.expect(",}") == "}":
+                break
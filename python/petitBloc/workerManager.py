@@ -1,10 +1,20 @@
 from . import processManager
 from . import threadManager
 from . import const
+from . import memo
+from . import metrics
 
 
 class WorkerManager(object):
     __UseProcess = False
+    __BatchSize = 1
+    __BatchLatency = 0
+    __ChainCapacity = 0
+    __HistoryMode = const.HistoryMode.All
+    __HistorySize = 100
+    __DeadlockTimeout = 10.0
+    __PacketMode = const.PacketMode.Copy
+    __PacketModes = {}
     __LogManager = threadManager.LogManager
     __QueueManager = threadManager.QueueManager
     __ProcessManager = threadManager.ThreadManager
@@ -38,6 +48,111 @@ class WorkerManager(object):
     def UseProcess():
         return WorkerManager.__UseProcess
 
+    @staticmethod
+    def SetPoolSize(num):
+        threadManager.WorkerPool.SetSize(num)
+
+    @staticmethod
+    def PoolSize():
+        return threadManager.WorkerPool.Size()
+
+    @staticmethod
+    def PoolWorkerCount():
+        return threadManager.WorkerPool.Count()
+
+    @staticmethod
+    def SetCooperative(value):
+        threadManager.WorkerPool.SetCooperative(value)
+
+    @staticmethod
+    def Cooperative():
+        return threadManager.WorkerPool.IsCooperative()
+
+    @staticmethod
+    def SetBatchSize(num):
+        WorkerManager.__BatchSize = max(num, 1)
+
+    @staticmethod
+    def BatchSize():
+        return WorkerManager.__BatchSize
+
+    @staticmethod
+    def SetBatchLatency(sec):
+        WorkerManager.__BatchLatency = max(sec, 0)
+
+    @staticmethod
+    def BatchLatency():
+        return WorkerManager.__BatchLatency
+
+    @staticmethod
+    def SetChainCapacity(num):
+        WorkerManager.__ChainCapacity = max(num, 0)
+
+    @staticmethod
+    def ChainCapacity():
+        return WorkerManager.__ChainCapacity
+
+    @staticmethod
+    def SetDeadlockTimeout(sec):
+        WorkerManager.__DeadlockTimeout = max(sec, 0)
+
+    @staticmethod
+    def DeadlockTimeout():
+        return WorkerManager.__DeadlockTimeout
+
+    @staticmethod
+    def SetHistoryMode(mode, size=None):
+        if not isinstance(mode, const.HistoryMode):
+            print("Warning : Invalid history mode")
+            return False
+
+        WorkerManager.__HistoryMode = mode
+        if size is not None:
+            WorkerManager.__HistorySize = max(size, 0)
+
+        return True
+
+    @staticmethod
+    def HistoryMode():
+        return WorkerManager.__HistoryMode
+
+    @staticmethod
+    def HistorySize():
+        return WorkerManager.__HistorySize
+
+    @staticmethod
+    def SetSharedMemoryThreshold(size):
+        processManager.QueueManager.SetSharedThreshold(size)
+
+    @staticmethod
+    def SharedMemoryThreshold():
+        return processManager.QueueManager.SharedThreshold()
+
+    @staticmethod
+    def SetPacketMode(mode, typeClass=None):
+        if not isinstance(mode, const.PacketMode):
+            print("Warning : Invalid packet mode")
+            return False
+
+        if typeClass is None:
+            WorkerManager.__PacketMode = mode
+        else:
+            WorkerManager.__PacketModes[typeClass] = mode
+
+        return True
+
+    @staticmethod
+    def PacketMode(typeClass=None):
+        if typeClass is not None and typeClass in WorkerManager.__PacketModes:
+            return WorkerManager.__PacketModes[typeClass]
+
+        return WorkerManager.__PacketMode
+
+    @staticmethod
+    def ResetPacketMode():
+        WorkerManager.__PacketMode = const.PacketMode.Copy
+        WorkerManager.__PacketModes = {}
+
     @staticmethod
     def SetLogLevel(l):
         if not isinstance(l, const.LogLevel):
@@ -101,13 +216,63 @@ class WorkerManager(object):
     def TimeLog(path):
         return WorkerManager.__LogManager.TimeLog(path)
 
+    @staticmethod
+    def StallReport(path, v):
+        WorkerManager.__LogManager.StallReport(path, v)
+
+    @staticmethod
+    def StallLogs():
+        return WorkerManager.__LogManager.StallLogs()
+
+    @staticmethod
+    def StallLog(path):
+        return WorkerManager.__LogManager.StallLog(path)
+
     @staticmethod
     def AverageTime():
         return WorkerManager.__LogManager.AverageTime()
 
     @staticmethod
-    def CreateQueue():
-        return WorkerManager.__QueueManager.CreateQueue()
+    def WaitEnabled():
+        return WorkerManager.__Module.WaitManager.Enabled()
+
+    @staticmethod
+    def SetWaiting(path, target):
+        if target is None:
+            WorkerManager.__Module.WaitManager.SetState(path, const.WaitState.Running)
+        else:
+            WorkerManager.__Module.WaitManager.SetState(path, const.WaitState.Blocked, target)
+
+    @staticmethod
+    def IsDeadlocked(path):
+        ## follows the blocks each blocked block waits on, it is a deadlock when they lead
+        ## back to path, or to a block which cannot start while no block is running
+        wait_manager = WorkerManager.__Module.WaitManager
+        seen = set([path])
+        state, target = wait_manager.State(path)
+
+        while (state is const.WaitState.Blocked):
+            if target == path:
+                return True
+
+            if target in seen:
+                return False
+
+            seen.add(target)
+            state, target = wait_manager.State(target)
+
+        if state is not const.WaitState.NotStarted:
+            return False
+
+        for p in wait_manager.Paths():
+            if wait_manager.State(p)[0] is const.WaitState.Running:
+                return False
+
+        return True
+
+    @staticmethod
+    def CreateQueue(maxsize=0):
+        return WorkerManager.__QueueManager.CreateQueue(maxsize=maxsize)
 
     @staticmethod
     def DeleteQueue(q):
@@ -115,7 +280,99 @@ class WorkerManager(object):
 
     @staticmethod
     def RunSchedule(schedule, maxProcess=0, perProcessCallback=None):
-        WorkerManager.__Module.RunSchedule(schedule, maxProcess=maxProcess, perProcessCallback=perProcessCallback)
+        memo_schedule = None
+        if memo.MemoManager.Enabled():
+            memo_schedule = memo.MemoSchedule(schedule)
+
+        WorkerManager.__Module.RunSchedule(schedule, maxProcess=maxProcess, perProcessCallback=perProcessCallback, memo=memo_schedule)
+
+    @staticmethod
+    def SetMemoize(value):
+        memo.MemoManager.SetEnabled(value)
+
+    @staticmethod
+    def Memoize():
+        return memo.MemoManager.Enabled()
+
+    @staticmethod
+    def SetMemoMaxEntries(num):
+        memo.MemoManager.SetMaxEntries(num)
+
+    @staticmethod
+    def MemoMaxEntries():
+        return memo.MemoManager.MaxEntries()
+
+    @staticmethod
+    def SetMemoMaxSize(size):
+        memo.MemoManager.SetMaxSize(size)
+
+    @staticmethod
+    def MemoMaxSize():
+        return memo.MemoManager.MaxSize()
+
+    @staticmethod
+    def SetMemoDirectory(directory):
+        memo.MemoManager.SetDirectory(directory)
+
+    @staticmethod
+    def MemoDirectory():
+        return memo.MemoManager.Directory()
+
+    @staticmethod
+    def SetMemoMaxDiskSize(size):
+        memo.MemoManager.SetMaxDiskSize(size)
+
+    @staticmethod
+    def MemoMaxDiskSize():
+        return memo.MemoManager.MaxDiskSize()
+
+    @staticmethod
+    def ClearMemoDisk():
+        memo.MemoManager.ClearDisk()
+
+    @staticmethod
+    def MemoStats():
+        return memo.MemoManager.Stats()
+
+    @staticmethod
+    def ClearMemo():
+        memo.MemoManager.Clear()
+
+    @staticmethod
+    def SetCollectMetrics(value):
+        metrics.MetricsManager.SetEnabled(value)
+
+    @staticmethod
+    def CollectMetrics():
+        return metrics.MetricsManager.Enabled()
+
+    @staticmethod
+    def SetMetricsHistorySize(num):
+        metrics.MetricsManager.SetHistorySize(num)
+
+    @staticmethod
+    def MetricsHistorySize():
+        return metrics.MetricsManager.HistorySize()
+
+    @staticmethod
+    def BlockMetrics(path):
+        return metrics.MetricsManager.Last(path)
+
+    @staticmethod
+    def MetricsHistory(path):
+        return metrics.MetricsManager.History(path)
+
+    @staticmethod
+    def MetricsSummary():
+        return metrics.MetricsManager.Summary()
+
+    @staticmethod
+    def DumpMetrics(filePath=None):
+        return metrics.MetricsManager.Dump(filePath)
+
+    @staticmethod
+    def ClearMetrics():
+        metrics.MetricsManager.Clear()
 
     @staticmethod
     def QueueCount():
@@ -141,6 +398,10 @@ class WorkerManager(object):
     def SubmitSubProcess(cmd):
         return WorkerManager.__SubProcessManager.Submit(cmd)
 
+    @staticmethod
+    def CountSubProcess():
+        return WorkerManager.__SubProcessManager.Count()
+
 
 def SubmitSubProcess(cmd):
     return WorkerManager.SubmitSubProcess(cmd)
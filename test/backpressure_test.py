@@ -0,0 +1,258 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+import multiprocessing
+import time
+
+
+class MakeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        for n in range(50):
+            self.output(0).send(n)
+
+        return False
+
+
+class SlowDump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(SlowDump, self).__init__(name=name, parent=parent)
+        self.dmp = multiprocessing.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        time.sleep(0.001)
+        self.dmp.put(in_f.value())
+        in_f.drop()
+
+        return True
+
+
+class FewNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(FewNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        for n in range(5):
+            self.output(0).send(n)
+
+        return False
+
+
+class VerySlowDump(SlowDump):
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        time.sleep(0.3)
+        self.dmp.put(in_f.value())
+        in_f.drop()
+
+        return True
+
+
+class MakeTwoWay(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeTwoWay, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+        self.addOutput(float)
+
+    def run(self):
+        for n in range(50):
+            self.output(0).send(n)
+
+        for n in range(50):
+            self.output(1).send(n)
+
+
+class Plus(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Plus, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        ## reads the second input first, which the producer fills last
+        in2 = self.input(1).receive()
+        if in2.isEOP():
+            return False
+
+        in1 = self.input(0).receive()
+        if in1.isEOP():
+            return False
+
+        self.output(0).send(in1.value() + in2.value())
+
+        return True
+
+
+class BackpressureTest(unittest.TestCase):
+    def tearDown(self):
+        workerManager.WorkerManager.SetChainCapacity(0)
+        workerManager.WorkerManager.SetDeadlockTimeout(10)
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def __result(self, dump):
+        res = []
+        for i in range(50):
+            res.append(dump.dmp.get(timeout=5))
+
+        return res
+
+    def test_settings(self):
+        b = box.Box()
+        m = MakeNumbers()
+        d = SlowDump()
+        b.addBlock(m)
+        b.addBlock(d)
+        c = chain.Chain(m.output(0), d.input(0))
+        self.assertEqual(c.capacity(), 0)
+        workerManager.WorkerManager.SetChainCapacity(4)
+        self.assertEqual(workerManager.WorkerManager.ChainCapacity(), 4)
+        self.assertEqual(c.capacity(), 4)
+        c.setCapacity(2)
+        self.assertEqual(c.capacity(), 2)
+        c.setCapacity(None)
+        self.assertEqual(c.capacity(), 4)
+
+        workerManager.WorkerManager.SetDeadlockTimeout(0.5)
+        self.assertEqual(workerManager.WorkerManager.DeadlockTimeout(), 0.5)
+
+    def test_thread(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        b = box.Box()
+        m = MakeNumbers()
+        d = SlowDump()
+        b.addBlock(m)
+        b.addBlock(d)
+        c = chain.Chain(m.output(0), d.input(0))
+        c.setCapacity(2)
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.assertEqual(self.__result(d), [float(x) for x in range(50)])
+
+        count, total = workerManager.WorkerManager.StallLog(m.output(0).path())
+        self.assertTrue(count > 0)
+        self.assertTrue(total > 0)
+        self.assertIn(m.output(0).path(), workerManager.WorkerManager.StallLogs())
+        self.assertEqual(workerManager.WorkerManager.WarnLogs(), {})
+
+    def test_process(self):
+        workerManager.WorkerManager.SetUseProcess(True)
+        workerManager.WorkerManager.SetChainCapacity(2)
+        b = box.Box()
+        m = MakeNumbers()
+        d = SlowDump()
+        b.addBlock(m)
+        b.addBlock(d)
+        c = chain.Chain(m.output(0), d.input(0))
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule(), maxProcess=2)
+        self.assertEqual(self.__result(d), [float(x) for x in range(50)])
+
+        count, total = workerManager.WorkerManager.StallLog(m.output(0).path())
+        self.assertTrue(count > 0)
+
+    def test_cooperative(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetPoolSize(2)
+        workerManager.WorkerManager.SetCooperative(True)
+        workerManager.WorkerManager.SetChainCapacity(2)
+
+        try:
+            b = box.Box()
+            m = MakeNumbers()
+            d = SlowDump()
+            b.addBlock(m)
+            b.addBlock(d)
+            c = chain.Chain(m.output(0), d.input(0))
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.assertEqual(self.__result(d), [float(x) for x in range(50)])
+        finally:
+            workerManager.WorkerManager.SetCooperative(False)
+            workerManager.WorkerManager.SetPoolSize(0)
+
+    def test_deadlock(self):
+        ## with one worker the consumer cannot start while the producer waits
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            workerManager.WorkerManager.SetChainCapacity(2)
+            workerManager.WorkerManager.SetDeadlockTimeout(0.2)
+            b = box.Box()
+            m = MakeNumbers()
+            d = SlowDump()
+            b.addBlock(m)
+            b.addBlock(d)
+            c = chain.Chain(m.output(0), d.input(0))
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule(), maxProcess=1)
+            self.assertEqual(self.__result(d), [float(x) for x in range(50)])
+            self.assertEqual(len(workerManager.WorkerManager.WarnLog(m.output(0).path())), 1)
+            self.assertEqual(workerManager.WorkerManager.StallLog(m.output(0).path())[0], 1)
+
+    def test_slow_consumer(self):
+        ## a consumer slower than the timeout is not a deadlock
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            workerManager.WorkerManager.SetChainCapacity(1)
+            workerManager.WorkerManager.SetDeadlockTimeout(0.1)
+            b = box.Box()
+            m = FewNumbers()
+            d = VerySlowDump()
+            b.addBlock(m)
+            b.addBlock(d)
+            chain.Chain(m.output(0), d.input(0))
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule(), maxProcess=2)
+            self.assertEqual([d.dmp.get(timeout=5) for i in range(5)], [float(x) for x in range(5)])
+            self.assertEqual(workerManager.WorkerManager.WarnLogs(), {})
+            self.assertTrue(workerManager.WorkerManager.StallLog(m.output(0).path())[0] >= 3)
+
+    def test_cycle(self):
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            workerManager.WorkerManager.SetChainCapacity(2)
+            workerManager.WorkerManager.SetDeadlockTimeout(0.2)
+            b = box.Box()
+            m = MakeTwoWay()
+            p = Plus()
+            d = SlowDump()
+            b.addBlock(m)
+            b.addBlock(p)
+            b.addBlock(d)
+            chain.Chain(m.output(0), p.input(0))
+            chain.Chain(m.output(1), p.input(1))
+            chain.Chain(p.output(0), d.input(0))
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule(), maxProcess=3)
+            self.assertEqual(self.__result(d), [float(x * 2) for x in range(50)])
+            self.assertEqual(len(workerManager.WorkerManager.WarnLog(m.output(0).path())), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+import multiprocessing
+import time
+
+
+class MakeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        for n in range(100):
+            self.output(0).send(n)
+
+        return False
+
+
+class MakeManyNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeManyNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        self.output(0).sendMany(range(100))
+
+        return False
+
+
+class SlowNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(SlowNumbers, self).__init__(name=name, parent=parent)
+        self.sent = multiprocessing.Queue()
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def run(self):
+        for n in range(5):
+            self.sent.put(time.time())
+            self.output(0).send(n)
+            time.sleep(0.1)
+
+
+class AddOne(block.Block):
+    def __init__(self, name="", parent=None):
+        super(AddOne, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.output(0).send(in_f.value() + 1)
+        in_f.drop()
+
+        return True
+
+
+class DumpMany(block.Block):
+    def __init__(self, name="", parent=None):
+        super(DumpMany, self).__init__(name=name, parent=parent)
+        self.dmp = multiprocessing.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        for p in self.input(0).receiveMany(7):
+            if p.isEOP():
+                return False
+
+            self.dmp.put(p.value())
+            p.drop()
+
+        return True
+
+
+class TimedDump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(TimedDump, self).__init__(name=name, parent=parent)
+        self.dmp = multiprocessing.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.dmp.put((in_f.value(), time.time()))
+        in_f.drop()
+
+        return True
+
+
+class BatchTest(unittest.TestCase):
+    def tearDown(self):
+        workerManager.WorkerManager.SetBatchSize(1)
+        workerManager.WorkerManager.SetBatchLatency(0)
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def __run(self, maker):
+        b = box.Box()
+        m = maker()
+        a1 = AddOne()
+        a2 = AddOne()
+        d = DumpMany()
+        b.addBlock(m)
+        b.addBlock(a1)
+        b.addBlock(a2)
+        b.addBlock(d)
+        chain.Chain(m.output(0), a1.input(0))
+        chain.Chain(a1.output(0), a2.input(0))
+        chain.Chain(a2.output(0), d.input(0))
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        res = []
+        while (len(res) < 100):
+            res.append(d.dmp.get(timeout=5))
+
+        self.assertTrue(d.dmp.empty())
+        self.assertEqual(res, [float(x + 2) for x in range(100)])
+
+    def test_settings(self):
+        self.assertEqual(workerManager.WorkerManager.BatchSize(), 1)
+        self.assertEqual(workerManager.WorkerManager.BatchLatency(), 0)
+        workerManager.WorkerManager.SetBatchSize(0)
+        self.assertEqual(workerManager.WorkerManager.BatchSize(), 1)
+        workerManager.WorkerManager.SetBatchSize(16)
+        workerManager.WorkerManager.SetBatchLatency(0.5)
+        self.assertEqual(workerManager.WorkerManager.BatchSize(), 16)
+        self.assertEqual(workerManager.WorkerManager.BatchLatency(), 0.5)
+
+    def test_thread(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        for size in [1, 16]:
+            workerManager.WorkerManager.SetBatchSize(size)
+            self.__run(MakeNumbers)
+            self.__run(MakeManyNumbers)
+
+    def test_process(self):
+        workerManager.WorkerManager.SetUseProcess(True)
+        for size in [1, 16]:
+            workerManager.WorkerManager.SetBatchSize(size)
+            self.__run(MakeNumbers)
+            self.__run(MakeManyNumbers)
+
+    def test_slow_producer(self):
+        workerManager.WorkerManager.SetBatchSize(16)
+        workerManager.WorkerManager.SetBatchLatency(0.01)
+
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            b = box.Box()
+            m = SlowNumbers()
+            d = TimedDump()
+            b.addBlock(m)
+            b.addBlock(d)
+            chain.Chain(m.output(0), d.input(0))
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule(), maxProcess=2)
+
+            ## each packet arrives after the latency, not with the next send
+            for n in range(5):
+                sent = m.sent.get(timeout=5)
+                value, received = d.dmp.get(timeout=5)
+                self.assertEqual(value, float(n))
+                self.assertTrue(received - sent < 0.08)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import blockManager
+import tempfile
+import shutil
+import json
+
+
+BlockSource = """from petitBloc import block
+
+
+class {0}(block.Block):
+    def initialize(self):
+        self.addOutput(float, "output")
+"""
+
+
+class BlockManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.__env = {}
+        for k in ["PETITBLOC_BLOCK_PATH", "PETITBLOC_REGISTRY"]:
+            self.__env[k] = os.environ.get(k)
+
+        self.__dir = tempfile.mkdtemp()
+        self.__block_dir = os.path.join(self.__dir, "blocks")
+        os.makedirs(self.__block_dir)
+        self.__registry = os.path.join(self.__dir, "registry", "blockRegistry.json")
+        os.environ["PETITBLOC_BLOCK_PATH"] = self.__block_dir
+        os.environ["PETITBLOC_REGISTRY"] = self.__registry
+
+        self.writeModule("registryTestA", ["RegistryBlockA1", "RegistryBlockA2"])
+        self.writeModule("registryTestB", ["RegistryBlockB"])
+        with open(os.path.join(self.__block_dir, "registryTestA.config"), "w") as f:
+            f.write('{"RegistryBlockA1": {"category": "Registry"}}')
+
+    def tearDown(self):
+        for k, v in self.__env.iteritems():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+        shutil.rmtree(self.__dir)
+        blockManager.BlockManager().reload()
+
+    def writeModule(self, name, classes):
+        with open(os.path.join(self.__block_dir, name + ".py"), "w") as f:
+            for c in classes:
+                f.write(BlockSource.format(c))
+
+        sys.modules.pop(name, None)
+
+    def test_registry(self):
+        manager = blockManager.BlockManager()
+        manager.reload()
+        self.assertTrue(os.path.isfile(self.__registry))
+        self.assertTrue(manager.hasBlock("RegistryBlockA1"))
+        self.assertTrue(manager.hasBlock("RegistryBlockB"))
+        self.assertEqual(manager.config("RegistryBlockA1"), {"category": "Registry"})
+
+        with open(self.__registry, "r") as f:
+            data = json.load(f)
+
+        self.assertEqual(len(data["files"]), 2)
+
+        ## an indexed module is not imported until one of its blocks is used
+        sys.modules.pop("registryTestA", None)
+        sys.modules.pop("registryTestB", None)
+        manager.reload()
+        self.assertEqual(sorted(manager.blockTree()["Registry"]), ["RegistryBlockA1"])
+        self.assertEqual(manager.blockInfo("RegistryBlockB"), {"name": "RegistryBlockB", "inputs": [], "outputs": [["output", "float"]], "params": []})
+        self.assertFalse("registryTestA" in sys.modules)
+        self.assertFalse("registryTestB" in sys.modules)
+
+        bloc = manager.block("RegistryBlockA2")()
+        self.assertEqual(bloc.output(0).name(), "output")
+        self.assertTrue("registryTestA" in sys.modules)
+        self.assertFalse("registryTestB" in sys.modules)
+
+        self.assertEqual(manager.findObjectClass("RegistryBlockB").__name__, "RegistryBlockB")
+        self.assertTrue("registryTestB" in sys.modules)
+
+    def test_modified(self):
+        manager = blockManager.BlockManager()
+        manager.reload()
+
+        self.writeModule("registryTestB", ["RegistryBlockB", "RegistryBlockC"])
+        st = os.stat(os.path.join(self.__block_dir, "registryTestB.py"))
+        os.utime(os.path.join(self.__block_dir, "registryTestB.py"), (st.st_atime, st.st_mtime + 10))
+        os.remove(os.path.join(self.__block_dir, "registryTestA.py"))
+
+        manager.reload()
+        self.assertTrue(manager.hasBlock("RegistryBlockC"))
+        self.assertFalse(manager.hasBlock("RegistryBlockA1"))
+        self.assertIsNotNone(manager.block("RegistryBlockC"))
+
+        with open(self.__registry, "r") as f:
+            data = json.load(f)
+
+        self.assertEqual(len(data["files"]), 1)
+
+        ## a broken registry is rebuilt
+        with open(self.__registry, "w") as f:
+            f.write("{")
+
+        manager.reload()
+        self.assertTrue(manager.hasBlock("RegistryBlockC"))
+
+    def test_failed(self):
+        log_path = os.path.join(self.__dir, "imported.log")
+        broken_path = os.path.join(self.__block_dir, "registryTestBroken.py")
+        with open(broken_path, "w") as f:
+            f.write("open({!r}, 'a').write('x')\nraise ImportError('broken')\n".format(log_path))
+
+        manager = blockManager.BlockManager()
+        manager.reload()
+        manager.reload()
+        self.assertIsNone(manager.findObjectClass("RegistryBlockBroken"))
+        self.assertFalse(manager.hasBlock("RegistryBlockBroken"))
+
+        ## the failure is kept in the registry with the stamp of the module
+        with open(log_path, "r") as f:
+            self.assertEqual(f.read(), "x")
+
+        with open(self.__registry, "r") as f:
+            data = json.load(f)
+
+        self.assertTrue(data["files"][broken_path.replace("\\", "/")]["failed"])
+
+        self.writeModule("registryTestBroken", ["RegistryBlockBroken"])
+        st = os.stat(broken_path)
+        os.utime(broken_path, (st.st_atime, st.st_mtime + 10))
+
+        manager.reload()
+        self.assertTrue(manager.hasBlock("RegistryBlockBroken"))
+        self.assertIsNotNone(manager.block("RegistryBlockBroken"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
 from petitBloc import block
 from petitBloc import chain
+from petitBloc import box
+from petitBloc import workerManager
+import operator
 import threading
 import Queue
 import time
@@ -68,6 +71,58 @@ class DumpString(block.Block):
         return True
 
 
+class MakeNumbers(block.Block):
+    def __init__(self, values=[]):
+        super(MakeNumbers, self).__init__()
+        self.values = values
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def run(self):
+        for v in self.values:
+            self.output(0).send(v)
+
+
+class PlusNumbers(block.BinaryBlock):
+    def __init__(self):
+        super(PlusNumbers, self).__init__()
+
+    def initialize(self):
+        self.addInput(float)
+        self.addInput(float)
+        self.addOutput(float)
+
+    def operation(self):
+        return operator.add
+
+
+class DumpNumbers(block.Block):
+    def __init__(self):
+        super(DumpNumbers, self).__init__()
+        self.dmp = Queue.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        pack = self.input(0).receive()
+        if pack.isEOP():
+            return False
+
+        self.dmp.put(pack.value())
+        pack.drop()
+
+        return True
+
+    def values(self):
+        res = []
+        while (not self.dmp.empty()):
+            res.append(self.dmp.get())
+
+        return res
+
+
 class PacketTest(unittest.TestCase):
     def test_init(self):
         blck = block.Block(name="a")
@@ -173,6 +228,36 @@ class PacketTest(unittest.TestCase):
             result.append(ps.dmp.get())
         self.assertEqual(result, ['Hello', 'World.', 'My', 'Name', 'is', 'MakeString'])
 
+    def test_binary_block(self):
+        def plus(values1, values2):
+            b = box.Box()
+            m1 = MakeNumbers(values1)
+            m2 = MakeNumbers(values2)
+            p = PlusNumbers()
+            d = DumpNumbers()
+            for bloc in [m1, m2, p, d]:
+                b.addBlock(bloc)
+
+            chain.Chain(m1.output(0), p.input(0))
+            chain.Chain(m2.output(0), p.input(1))
+            chain.Chain(p.output(0), d.input(0))
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+            return d.values()
+
+        batch_size = block.BinaryBlock.BatchSize
+        try:
+            for size in [batch_size, 2]:
+                block.BinaryBlock.BatchSize = size
+                self.assertEqual(plus([1, 2, 3], [10, 20, 30]), [11, 22, 33])
+                ## the shorter input repeats its last value
+                self.assertEqual(plus([1, 2, 3, 4, 5], [10, 20]), [11, 22, 23, 24, 25])
+                self.assertEqual(plus([1], [10, 20, 30]), [11, 21, 31])
+                self.assertEqual(plus([], [10, 20, 30]), [])
+                self.assertEqual(plus([1, 2], []), [])
+        finally:
+            block.BinaryBlock.BatchSize = batch_size
+
 
 if __name__ == "__main__":
     unittest.main()
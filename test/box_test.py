@@ -57,6 +57,28 @@ class AddOne(block.Block):
         return True
 
 
+class Plus(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Plus, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        in1 = self.input(0).receive()
+        in2 = self.input(1).receive()
+        if in1.isEOP() or in2.isEOP():
+            return False
+
+        self.output(0).send(in1.value() + in2.value())
+        in1.drop()
+        in2.drop()
+
+        return True
+
+
 class Mult(block.Block):
     def __init__(self, name="", parent=None):
         super(Mult, self).__init__(name=name, parent=parent)
@@ -272,6 +294,123 @@ class BoxTest(unittest.TestCase):
         self.assertEqual(out_dmp, out_value)
         self.assertEqual(in_dmp, in_value)
 
+    def test_find_block(self):
+        root = box.Box("root")
+        sub = box.Box("sub")
+        num = MakeNumbers(name="num")
+        add = AddOne(name="add")
+
+        self.assertTrue(root.addBlock(num))
+        self.assertEqual(root.findBlock("/root"), root)
+        self.assertEqual(root.findBlock("/root/num"), num)
+        self.assertEqual(root.findBlock("/root/in").name(), "in")
+
+        self.assertTrue(sub.addBlock(add))
+        self.assertTrue(root.addBlock(sub))
+        self.assertEqual(root.findBlock("/root/sub"), sub)
+        self.assertEqual(root.findBlock("/root/sub/add"), add)
+        self.assertEqual(sub.block("add"), add)
+
+        sub.rename("box")
+        self.assertIsNone(root.findBlock("/root/sub/add"))
+        self.assertEqual(root.findBlock("/root/box/add"), add)
+        self.assertEqual(root.block("box"), sub)
+        self.assertIsNone(root.block("sub"))
+
+        self.assertTrue(root.addBlock(add))
+        self.assertEqual(add.parent(), root)
+        self.assertIsNone(sub.block("add"))
+        self.assertEqual(root.findBlock("/root/add"), add)
+        self.assertIsNone(root.findBlock("/root/box/add"))
+
+        self.assertTrue(root.deleteBlock(sub))
+        self.assertIsNone(root.findBlock("/root/box"))
+        self.assertEqual(sub.findBlock("/box"), sub)
+
+        root.rename("scene")
+        self.assertEqual(root.findBlock("/scene/num"), num)
+        self.assertIsNone(root.findBlock("/root/num"))
+
+        self.assertEqual(add.input("input"), add.input(0))
+        self.assertEqual(add.output("output"), add.output(0))
+        self.assertIsNone(add.input("output"))
+        p = add.addParam(int, "value")
+        self.assertEqual(add.param("value"), p)
+        self.assertTrue(add.removeParam("value"))
+        self.assertIsNone(add.param("value"))
+
+    def test_schedule(self):
+        b = box.Box()
+        num = MakeNumbers()
+        add1 = AddOne()
+        add2 = AddOne()
+        b.addBlock(num)
+        b.addBlock(add1)
+        b.addBlock(add2)
+        chain.Chain(num.output(0), add1.input(0))
+
+        schedule = b.getSchedule()
+        self.assertEqual(schedule, b.getSchedule())
+        self.assertTrue(schedule.index(num) < schedule.index(add1))
+
+        chain.Chain(add1.output(0), add2.input(0))
+        schedule = b.getSchedule()
+        self.assertTrue(schedule.index(add1) < schedule.index(add2))
+
+        ## a cycle without any starting block
+        c1 = AddOne()
+        c2 = AddOne()
+        b.addBlock(c1)
+        b.addBlock(c2)
+        chain.Chain(c1.output(0), c2.input(0))
+        chain.Chain(c2.output(0), c1.input(0))
+        schedule = b.getSchedule()
+        self.assertIn(c1, schedule)
+        self.assertIn(c2, schedule)
+        for s in schedule:
+            self.assertFalse(isinstance(s, list))
+
+        b.deleteBlock(add2)
+        self.assertNotIn(add2, b.getSchedule())
+
+        d = box.Box()
+        num = MakeNumbers()
+        d.addBlock(num)
+        last = [num]
+        for i in range(30):
+            cur = []
+            for j in range(2):
+                a = AddOne()
+                d.addBlock(a)
+                chain.Chain(last[j % len(last)].output(0), a.input(0))
+                cur.append(a)
+
+            last = cur
+
+        schedule = d.getSchedule()
+        self.assertEqual(len(schedule), 61 + 3)
+        self.assertEqual(len(set(schedule)), len(schedule))
+
+    def test_schedule_order(self):
+        b = box.Box()
+        a = MakeNumbers()
+        b1 = Mult()
+        b2 = Mult()
+        two = Plus()
+        last = Plus()
+        ## a reaches two directly before it reaches it through b1
+        for bloc in [last, two, b2, b1, a]:
+            b.addBlock(bloc)
+
+        edges = [(a, two, 0), (a, b1, 0), (b1, two, 1), (a, b2, 0), (two, last, 0), (b2, last, 1)]
+        for src, dst, index in edges:
+            chain.Chain(src.output(0), dst.input(index))
+
+        schedule = b.getSchedule()
+        self.assertEqual(len(set(schedule)), len(schedule))
+        for src, dst, _ in edges:
+            self.assertTrue(schedule.index(src) < schedule.index(dst))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../blocks")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+import fileBlocks
+import tempfile
+import shutil
+import gzip
+import bz2
+import time
+
+
+class Collect(block.Block):
+    def __init__(self):
+        super(Collect, self).__init__()
+        self.values = []
+
+    def initialize(self):
+        self.addInput(str, "data")
+
+    def process(self):
+        p = self.input(0).receive()
+        if p.isEOP():
+            return False
+
+        self.values.append(p.value())
+        p.drop()
+
+        return True
+
+
+class Lines(block.Block):
+    def __init__(self, lines=[]):
+        super(Lines, self).__init__()
+        self.__lines = lines
+
+    def initialize(self):
+        self.addOutput(str, "data")
+
+    def run(self):
+        self.output(0).sendMany(self.__lines)
+
+
+class SlowLines(block.Block):
+    def __init__(self, lines=[], path=""):
+        super(SlowLines, self).__init__()
+        self.__lines = lines
+        self.__path = path
+        self.sizes = []
+
+    def initialize(self):
+        self.addOutput(str, "data")
+
+    def run(self):
+        for line in self.__lines:
+            self.sizes.append(os.path.getsize(self.__path) if os.path.isfile(self.__path) else 0)
+            self.output(0).send(line)
+            time.sleep(0.2)
+
+
+class Paths(block.Block):
+    def __init__(self, paths=[]):
+        super(Paths, self).__init__()
+        self.__paths = paths
+
+    def initialize(self):
+        self.addOutput(str, "dirPath")
+
+    def run(self):
+        self.output(0).sendMany(self.__paths)
+
+
+class CollectDict(Collect):
+    def initialize(self):
+        self.addInput(dict, "stat")
+
+
+class FileBlocksTest(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__lines = map(lambda x: "line {}\n".format(x), range(2500)) + ["last"]
+
+    def tearDown(self):
+        shutil.rmtree(self.__dir)
+
+    def read(self, path, **params):
+        b = box.Box()
+        reader = fileBlocks.FileRead()
+        reader.param("filePath").set(path)
+        for k, v in params.iteritems():
+            reader.param(k).set(v)
+
+        collect = Collect()
+        b.addBlock(reader)
+        b.addBlock(collect)
+        chain.Chain(reader.output(0), collect.input(0))
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        return collect.values
+
+    def write(self, path, lines, **params):
+        b = box.Box()
+        src = Lines(lines)
+        writer = fileBlocks.FileWrite()
+        writer.param("filePath").set(path)
+        for k, v in params.iteritems():
+            writer.param(k).set(v)
+
+        b.addBlock(src)
+        b.addBlock(writer)
+        chain.Chain(src.output(0), writer.input(0))
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        return writer
+
+    def walk(self, cls, paths, **params):
+        b = box.Box()
+        src = Paths(paths)
+        walker = cls()
+        for k, v in params.iteritems():
+            walker.param(k).set(v)
+
+        files = Collect()
+        dirs = Collect()
+        b.addBlock(src)
+        b.addBlock(walker)
+        b.addBlock(files)
+        b.addBlock(dirs)
+        chain.Chain(src.output(0), walker.input(0))
+        chain.Chain(walker.output("file"), files.input(0))
+        chain.Chain(walker.output("directory"), dirs.input(0))
+
+        stats = None
+        if walker.output("stat") is not None:
+            stats = CollectDict()
+            b.addBlock(stats)
+            chain.Chain(walker.output("stat"), stats.input(0))
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        return sorted(files.values), sorted(dirs.values), stats.values if stats is not None else None
+
+    def makeTree(self):
+        root = os.path.join(self.__dir, "tree")
+        for d in ["a/b/c", "a/d", "e"]:
+            os.makedirs(os.path.join(root, d))
+
+        for f in ["top.txt", "a/one.py", "a/b/two.txt", "a/b/c/three.txt", "a/d/four.py", "e/five.txt"]:
+            with open(os.path.join(root, f), "w") as fo:
+                fo.write(f)
+
+        os.symlink(os.path.join(root, "a"), os.path.join(root, "e", "link"))
+
+        return root.replace("\\", "/")
+
+    def test_read(self):
+        path = os.path.join(self.__dir, "data.txt")
+        with open(path, "wb") as f:
+            f.write("".join(self.__lines))
+
+        self.assertEqual(self.read(path), self.__lines)
+        self.assertEqual(self.read(path, chunkSize=7), self.__lines)
+        self.assertEqual(self.read(path, useMmap=True, chunkSize=100), self.__lines)
+        self.assertEqual(self.read(path, startLine=10, endLine=1205, chunkSize=64), self.__lines[10:1205])
+        self.assertEqual(self.read(path, startLine=2499), self.__lines[2499:])
+
+        lines = self.read(path, mode=1, batchSize=1000)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual("".join(lines), "".join(self.__lines))
+
+        chunks = self.read(path, mode=2, chunkSize=4096)
+        self.assertEqual(len(chunks[0]), 4096)
+        self.assertEqual("".join(chunks), "".join(self.__lines))
+
+        self.assertEqual(self.read(os.path.join(self.__dir, "missing.txt")), [])
+
+    def test_compressed(self):
+        path = os.path.join(self.__dir, "data.txt.gz")
+        f = gzip.open(path, "wb")
+        f.write("".join(self.__lines))
+        f.close()
+        self.assertEqual(self.read(path, chunkSize=100), self.__lines)
+
+        path = os.path.join(self.__dir, "data.bz2")
+        f = bz2.BZ2File(path, "wb")
+        f.write("".join(self.__lines))
+        f.close()
+        self.assertEqual(self.read(path, startLine=5, endLine=8), self.__lines[5:8])
+
+        plain = os.path.join(self.__dir, "plain.gz")
+        with open(plain, "wb") as f:
+            f.write("not compressed\n")
+        self.assertEqual(self.read(plain, compression=1), ["not compressed\n"])
+
+    def test_encoding(self):
+        path = os.path.join(self.__dir, "utf16.txt")
+        text = u"あいう\nえお\n"
+        with open(path, "wb") as f:
+            f.write(text.encode("utf-16"))
+
+        self.assertEqual(self.read(path, encoding="utf-16", chunkSize=3), [u"あいう\n".encode("utf-8"), u"えお\n".encode("utf-8")])
+
+    def test_crlf(self):
+        path = os.path.join(self.__dir, "crlf.txt")
+        with open(path, "wb") as f:
+            f.write("".join(self.__lines).replace("\n", "\r\n"))
+
+        ## a chunk can end between the carriage return and the line feed
+        for size in [1, 7, 4096]:
+            self.assertEqual(self.read(path, chunkSize=size), self.__lines)
+
+        self.assertEqual("".join(self.read(path, mode=1)), "".join(self.__lines))
+        self.assertEqual("".join(self.read(path, mode=2)), "".join(self.__lines).replace("\n", "\r\n"))
+
+    def test_write(self):
+        path = os.path.join(self.__dir, "out", "data.txt")
+        self.write(path, self.__lines, bufferSize=100)
+        self.assertEqual(self.read(path), self.__lines)
+
+        self.write(path, ["\nappended\n"], append=True)
+        self.assertEqual(self.read(path), self.__lines[:-1] + ["last\n", "appended\n"])
+
+        self.write(path, ["atomic\n"], atomic=True, flushInterval=0.001, fsync=True)
+        self.assertEqual(self.read(path), ["atomic\n"])
+        self.write(path, ["again\n"], atomic=True, append=True)
+        self.assertEqual(self.read(path), ["atomic\n", "again\n"])
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["data.txt"])
+        self.assertEqual(os.stat(path).st_mode & 0777, 0666 & ~fileBlocks._Umask)
+
+    def test_write_gzip(self):
+        path = os.path.join(self.__dir, "data.txt.gz")
+        self.write(path, self.__lines, bufferSize=1000)
+        f = gzip.open(path, "rb")
+        self.assertEqual(f.read(), "".join(self.__lines))
+        f.close()
+
+        self.write(path, ["\nmore\n"], append=True, atomic=True)
+        self.assertEqual(self.read(path)[-2:], ["last\n", "more\n"])
+
+        plain = os.path.join(self.__dir, "plain.gz")
+        self.write(plain, ["plain\n"], compression=1)
+        with open(plain, "rb") as f:
+            self.assertEqual(f.read(), "plain\n")
+
+    def test_write_interval(self):
+        path = os.path.join(self.__dir, "slow.txt")
+        lines = ["line {}\n".format(x) for x in range(6)]
+        b = box.Box()
+        src = SlowLines(lines, path)
+        writer = fileBlocks.FileWrite()
+        writer.param("filePath").set(path)
+        writer.param("flushInterval").set(0.05)
+        b.addBlock(src)
+        b.addBlock(writer)
+        chain.Chain(src.output(0), writer.input(0))
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        ## the lines reach the disk while the source is still sending
+        self.assertEqual(src.sizes[-1], len("".join(lines[:-1])))
+        self.assertEqual(self.read(path), lines)
+
+    def test_walk(self):
+        root = self.makeTree()
+        path = lambda *x: "/".join((root, ) + x)
+
+        files, dirs, _ = self.walk(fileBlocks.WalkDir, [root])
+        self.assertEqual(files, sorted([path("top.txt"), path("a", "one.py"), path("a", "b", "two.txt"), path("a", "b", "c", "three.txt"), path("a", "d", "four.py"), path("e", "five.txt")]))
+        ## the symlinked directory is listed but not followed
+        self.assertEqual(dirs, sorted([path("a"), path("a", "b"), path("a", "b", "c"), path("a", "d"), path("e"), path("e", "link")]))
+
+        files, dirs, _ = self.walk(fileBlocks.WalkDir, [root], maxDepth=1, threads=1)
+        self.assertEqual(files, sorted([path("top.txt"), path("a", "one.py"), path("e", "five.txt")]))
+        self.assertEqual(dirs, sorted([path("a"), path("a", "b"), path("a", "d"), path("e"), path("e", "link")]))
+
+        files, dirs, _ = self.walk(fileBlocks.WalkDir, [root], pattern="*.py")
+        self.assertEqual(files, sorted([path("a", "one.py"), path("a", "d", "four.py")]))
+        self.assertEqual(dirs, [])
+
+        files, dirs, _ = self.walk(fileBlocks.WalkDir, [root], regex="/b/", followLinks=True)
+        self.assertEqual(files, sorted([path("a", "b", "two.txt"), path("a", "b", "c", "three.txt"), path("e", "link", "b", "two.txt"), path("e", "link", "b", "c", "three.txt")]))
+        self.assertEqual(dirs, sorted([path("a", "b", "c"), path("e", "link", "b", "c")]))
+
+        files, dirs, stats = self.walk(fileBlocks.WalkDir, [root], pattern="t*.txt", withStat=True)
+        self.assertEqual(sorted(map(lambda x: x["path"], stats)), files)
+        for st in stats:
+            self.assertEqual(st["size"], len(st["path"]) - len(root) - 1)
+            self.assertFalse(st["directory"])
+
+        files, dirs, _ = self.walk(fileBlocks.ListDir, [root])
+        self.assertEqual(files, [path("top.txt")])
+        self.assertEqual(dirs, [path("a"), path("e")])
+
+    def test_walk_listdir(self):
+        root = self.makeTree()
+        read_dir = fileBlocks._ReadDir
+
+        def walk(follow):
+            files, dirs, stats = self.walk(fileBlocks.WalkDir, [root], followLinks=follow, withStat=True)
+            return files, dirs, sorted(map(lambda x: sorted(x.items()), stats))
+
+        results = [walk(False), walk(True)]
+
+        ## the entry types are found by lstat when the listing does not have them
+        fileBlocks._ReadDir = None
+        try:
+            self.assertEqual(walk(False), results[0])
+            self.assertEqual(walk(True), results[1])
+        finally:
+            fileBlocks._ReadDir = read_dir
+
+
+if __name__ == "__main__":
+    unittest.main()
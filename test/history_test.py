@@ -0,0 +1,195 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import port
+from petitBloc import packet
+from petitBloc import history
+from petitBloc import const
+from petitBloc import workerManager
+
+
+class MakeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(int)
+
+    def process(self):
+        for n in range(100):
+            self.output(0).send(n)
+
+        return False
+
+
+class Dump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Dump, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(int)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        in_f.drop()
+
+        return True
+
+
+class HistoryTest(unittest.TestCase):
+    def tearDown(self):
+        workerManager.WorkerManager.SetHistoryMode(const.HistoryMode.All, 100)
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def test_settings(self):
+        self.assertEqual(workerManager.WorkerManager.HistoryMode(), const.HistoryMode.All)
+        self.assertFalse(workerManager.WorkerManager.SetHistoryMode("Off"))
+        self.assertTrue(workerManager.WorkerManager.SetHistoryMode(const.HistoryMode.Last, 10))
+        self.assertEqual(workerManager.WorkerManager.HistoryMode(), const.HistoryMode.Last)
+        self.assertEqual(workerManager.WorkerManager.HistorySize(), 10)
+
+        out_port = port.OutPort(int)
+        self.assertEqual(out_port.historyMode(), const.HistoryMode.Last)
+        self.assertEqual(out_port.historySize(), 10)
+        out_port.setHistoryMode(const.HistoryMode.First, 3)
+        self.assertEqual(out_port.historyMode(), const.HistoryMode.First)
+        self.assertEqual(out_port.historySize(), 3)
+
+    def test_off(self):
+        src_port = port.OutPort(int)
+        dst_port = port.InPort(int)
+        chain.Chain(src_port, dst_port)
+        src_port.setHistoryMode(const.HistoryMode.Off)
+        dst_port.setHistoryMode(const.HistoryMode.Off)
+
+        self.assertEqual(workerManager.WorkerManager.QueueCount(), 0)
+        src_port.activate()
+        dst_port.activate()
+        self.assertEqual(workerManager.WorkerManager.QueueCount(), 1)
+        src_port.send(1)
+        self.assertEqual(dst_port.receive().value(), 1)
+        src_port.terminate()
+        dst_port.receive()
+        dst_port.terminate()
+        self.assertEqual(workerManager.WorkerManager.QueueCount(), 0)
+        self.assertEqual(src_port.packetHistory(), [])
+        self.assertEqual(dst_port.packetHistory(), [])
+
+    def __check(self, mode, size, checker):
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            workerManager.WorkerManager.SetHistoryMode(mode, size)
+            b = box.Box()
+            m = MakeNumbers()
+            d = Dump()
+            b.addBlock(m)
+            b.addBlock(d)
+            chain.Chain(m.output(0), d.input(0))
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            checker(m.output(0).packetHistory())
+            checker(d.input(0).packetHistory())
+
+    def test_all(self):
+        def checker(values):
+            self.assertEqual(values, range(100))
+
+        self.__check(const.HistoryMode.All, 10, checker)
+
+    def test_first(self):
+        def checker(values):
+            self.assertEqual(values, range(10))
+
+        self.__check(const.HistoryMode.First, 10, checker)
+
+    def test_last(self):
+        def checker(values):
+            self.assertEqual(values, range(90, 100))
+
+        self.__check(const.HistoryMode.Last, 10, checker)
+
+    def test_reservoir(self):
+        def checker(values):
+            self.assertEqual(len(values), 10)
+            self.assertEqual(len(set(values)), 10)
+            for v in values:
+                self.assertIn(v, range(100))
+
+        self.__check(const.HistoryMode.Reservoir, 10, checker)
+
+    def test_spill(self):
+        def checker(values):
+            self.assertEqual(values, range(100))
+
+        self.__check(const.HistoryMode.Spill, 0, checker)
+
+        workerManager.WorkerManager.SetUseProcess(False)
+        src_port = port.OutPort(int)
+        dst_port = port.InPort(int)
+        chain.Chain(src_port, dst_port)
+        src_port.setHistoryMode(const.HistoryMode.Spill)
+        src_port.activate()
+        src_port.send(1)
+        src_port.send(2)
+        src_port.flush()
+        src_port.terminate()
+        self.assertEqual(src_port.packetHistory(), [1, 2])
+
+        src_port.activate()
+        self.assertEqual(src_port.packetHistory(), [])
+        src_port.terminate()
+
+
+    def test_flush(self):
+        for mode in [const.HistoryMode.Last, const.HistoryMode.Reservoir]:
+            src_port = port.OutPort(int)
+            dst_port = port.InPort(int)
+            chain.Chain(src_port, dst_port)
+            src_port.setHistoryMode(mode, 3)
+            src_port.activate()
+
+            ## a flush in the middle of the run must not split the capture
+            for i in range(10):
+                src_port.send(i)
+                if i == 4:
+                    src_port.flush()
+
+            src_port.flush()
+            src_port.terminate()
+
+            values = src_port.packetHistory()
+            self.assertEqual(len(values), 3)
+            if mode == const.HistoryMode.Last:
+                self.assertEqual(values, [7, 8, 9])
+
+            for v in values:
+                self.assertIn(v, range(10))
+
+        ## every value stays equally likely to be sampled
+        counts = [0] * 10
+        for i in range(2000):
+            capture = history.ReservoirCapture(3)
+            capture.activate()
+            for n in range(10):
+                capture.record(packet.Packet(n))
+                if n == 4:
+                    capture.flush()
+
+            capture.flush()
+            capture.terminate()
+            for v in capture.values():
+                counts[v] += 1
+
+        for c in counts:
+            self.assertTrue(400 < c < 800)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -60,6 +60,20 @@ class RaiseError(block.Block):
         return True
 
 
+class Talk(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Talk, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addParam(int, "count", 0)
+
+    def run(self):
+        for i in range(self.param("count").get()):
+            self.debug("message {}".format(i))
+
+        self.warn("done")
+
+
 class LoggingTest(unittest.TestCase):
     def test_packetHistory(self):
         src_port = port.OutPort(int)
@@ -152,6 +166,28 @@ class LoggingTest(unittest.TestCase):
         self.assertEqual(len(workerManager.WorkerManager.DebugLog(e.path())), 6)
         self.assertEqual(len(workerManager.WorkerManager.DebugLog(e2.path())), 1)
 
-        
+    def test_process_log_count(self):
+        workerManager.WorkerManager.SetLogLevel(const.LogLevel.NoLog)
+        workerManager.WorkerManager.SetUseProcess(True)
+        b = box.Box("scene")
+        talks = []
+        for i in range(8):
+            t = Talk()
+            t.param("count").set(3000)
+            b.addBlock(t)
+            talks.append(t)
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule(), maxProcess=4)
+
+        ## every record of every worker is collected, in order
+        self.assertEqual(workerManager.WorkerManager.ExecutionCount(), len(b.getSchedule()))
+        self.assertEqual(len(workerManager.WorkerManager.TimeLogs()), len(b.getSchedule()))
+        for t in talks:
+            self.assertEqual(workerManager.WorkerManager.DebugLog(t.path()), ["message {}".format(i) for i in range(3000)])
+            self.assertEqual(workerManager.WorkerManager.WarnLog(t.path()), ["done"])
+
+        workerManager.WorkerManager.SetUseProcess(False)
+
+
 if __name__ == "__main__":
     unittest.main()
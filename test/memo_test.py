@@ -0,0 +1,364 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../blocks")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+from petitBloc import memo
+import multiprocessing
+import tempfile
+import shutil
+import Queue
+import fileBlocks
+
+
+class MakeNumbers(block.Block):
+    Count = 0
+
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+        self.setCacheable(True)
+
+    def initialize(self):
+        self.addOutput(float)
+        self.addParam(int, "stop", 10)
+
+    def run(self):
+        MakeNumbers.Count += 1
+        for n in range(self.param("stop").get()):
+            self.output(0).send(n)
+
+
+class AddOne(block.Block):
+    Count = 0
+
+    def __init__(self, name="", parent=None):
+        super(AddOne, self).__init__(name=name, parent=parent)
+        self.setCacheable(True)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addOutput(float)
+
+    def run(self):
+        AddOne.Count += 1
+        super(AddOne, self).run()
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.output(0).send(in_f.value() + 1)
+        in_f.drop()
+
+        return True
+
+
+class AddTwo(block.Block):
+    Count = 0
+
+    def __init__(self, name="", parent=None):
+        super(AddTwo, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        AddTwo.Count += 1
+        self.output(0).send(in_f.value() + 2)
+        in_f.drop()
+
+        return True
+
+
+class Dump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Dump, self).__init__(name=name, parent=parent)
+        self.dmp = None
+
+    def initialize(self):
+        self.addInput(float)
+
+    def activate(self):
+        super(Dump, self).activate()
+        if workerManager.WorkerManager.UseProcess():
+            self.dmp = multiprocessing.Queue()
+        else:
+            self.dmp = Queue.Queue()
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.dmp.put(in_f.value())
+        in_f.drop()
+
+        return True
+
+    def values(self):
+        res = []
+        while (not self.dmp.empty()):
+            res.append(self.dmp.get())
+
+        return res
+
+
+class DirPath(block.Block):
+    def __init__(self, path=""):
+        super(DirPath, self).__init__()
+        self.setCacheable(True)
+        self.param("path").set(path)
+
+    def initialize(self):
+        self.addOutput(str)
+        self.addParam(str, "path")
+
+    def run(self):
+        self.output(0).send(self.param("path").get())
+
+
+class DumpStr(Dump):
+    def initialize(self):
+        self.addInput(str)
+
+
+class MemoTest(unittest.TestCase):
+    def setUp(self):
+        workerManager.WorkerManager.ClearMemo()
+        workerManager.WorkerManager.SetMemoize(True)
+
+    def tearDown(self):
+        workerManager.WorkerManager.SetMemoize(False)
+        workerManager.WorkerManager.SetMemoMaxEntries(256)
+        workerManager.WorkerManager.SetMemoMaxDiskSize(1024 * 1024 * 1024)
+        workerManager.WorkerManager.SetMemoDirectory(None)
+        workerManager.WorkerManager.ClearMemo()
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def test_replay(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        b = box.Box()
+        m = MakeNumbers()
+        a = AddOne()
+        d = Dump()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(d)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), d.input(0))
+        MakeNumbers.Count = 0
+        AddOne.Count = 0
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.assertEqual(d.values(), [float(x + 1) for x in range(10)])
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["misses"], 2)
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["entries"], 2)
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.assertEqual(d.values(), [float(x + 1) for x in range(10)])
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["hits"], 2)
+        self.assertEqual(MakeNumbers.Count, 1)
+        self.assertEqual(AddOne.Count, 1)
+
+        m.param("stop").set(5)
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.assertEqual(d.values(), [float(x + 1) for x in range(5)])
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["misses"], 4)
+        self.assertEqual(MakeNumbers.Count, 2)
+        self.assertEqual(AddOne.Count, 2)
+
+        workerManager.WorkerManager.SetMemoMaxEntries(1)
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["entries"], 1)
+
+    def test_opt_out(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        b = box.Box()
+        m = MakeNumbers()
+        a = AddOne()
+        d = Dump()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(d)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), d.input(0))
+        m.setCacheable(False)
+        AddOne.Count = 0
+
+        for i in range(2):
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.assertEqual(d.values(), [float(x + 1) for x in range(10)])
+
+        ## nothing downstream of an opt-out block can be cached
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["hits"], 0)
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["misses"], 0)
+        self.assertEqual(AddOne.Count, 2)
+
+    def test_default(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        b = box.Box()
+        m = MakeNumbers()
+        a = AddTwo()
+        d = Dump()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(d)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), d.input(0))
+        AddTwo.Count = 0
+
+        for i in range(2):
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.assertEqual(d.values(), [float(x + 2) for x in range(10)])
+
+        ## a block type which does not opt in always runs
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["entries"], 1)
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["hits"], 1)
+        self.assertEqual(AddTwo.Count, 20)
+
+    def test_process(self):
+        workerManager.WorkerManager.SetUseProcess(True)
+        b = box.Box()
+        m = MakeNumbers()
+        a = AddOne()
+        d = Dump()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(d)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), d.input(0))
+
+        for i in range(2):
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.assertEqual(d.values(), [float(x + 1) for x in range(10)])
+
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["misses"], 2)
+        self.assertEqual(workerManager.WorkerManager.MemoStats()["hits"], 2)
+
+    def test_disk(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        directory = tempfile.mkdtemp()
+
+        try:
+            workerManager.WorkerManager.SetMemoDirectory(directory)
+            self.assertEqual(workerManager.WorkerManager.MemoDirectory(), directory)
+
+            b = box.Box()
+            m = MakeNumbers()
+            a = AddOne()
+            d = Dump()
+            b.addBlock(m)
+            b.addBlock(a)
+            b.addBlock(d)
+            chain.Chain(m.output(0), a.input(0))
+            chain.Chain(a.output(0), d.input(0))
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.assertEqual(d.values(), [float(x + 1) for x in range(10)])
+            self.assertTrue(workerManager.WorkerManager.MemoStats()["diskSize"] > 0)
+
+            ## a new session only has the disk store
+            workerManager.WorkerManager.ClearMemo()
+            AddOne.Count = 0
+            b = box.Box()
+            m = MakeNumbers()
+            a = AddOne()
+            d = Dump()
+            b.addBlock(m)
+            b.addBlock(a)
+            b.addBlock(d)
+            chain.Chain(m.output(0), a.input(0))
+            chain.Chain(a.output(0), d.input(0))
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.assertEqual(d.values(), [float(x + 1) for x in range(10)])
+            self.assertEqual(workerManager.WorkerManager.MemoStats()["diskHits"], 2)
+            self.assertEqual(AddOne.Count, 0)
+
+            for root, _, files in os.walk(directory):
+                for f in files:
+                    if f != memo.DiskStore.SizeFile:
+                        self.assertTrue(f.endswith(".memo"))
+
+            workerManager.WorkerManager.SetMemoMaxDiskSize(0)
+            self.assertEqual(workerManager.WorkerManager.MemoStats()["diskSize"], 0)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_disk_size(self):
+        directory = tempfile.mkdtemp()
+        walks = []
+        entries = memo.DiskStore.entries
+
+        def countEntries(store):
+            walks.append(store)
+            return entries(store)
+
+        try:
+            memo.DiskStore.entries = countEntries
+            store = memo.DiskStore(directory, 1024 * 1024)
+            store.put("aa01", {"output": range(10)})
+            ## the first put counts the entries already on disk
+            self.assertEqual(len(walks), 1)
+
+            for i in range(10):
+                store.put("bb{:02d}".format(i), {"output": range(100)})
+
+            ## the size file keeps the total, the directory is not walked again
+            self.assertEqual(len(walks), 1)
+            with open(os.path.join(directory, memo.DiskStore.SizeFile), "r") as f:
+                self.assertEqual(int(f.read()), store.size())
+
+            store.setMaxSize(store.size() - 1)
+            store.put("aa01", {"output": range(10)})
+            self.assertTrue(len(walks) > 0)
+            self.assertTrue(store.size() <= store.maxSize())
+            with open(os.path.join(directory, memo.DiskStore.SizeFile), "r") as f:
+                self.assertEqual(int(f.read()), store.size())
+        finally:
+            memo.DiskStore.entries = entries
+            shutil.rmtree(directory)
+
+    def test_list_dir(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+
+        for cls in [fileBlocks.ListDir, fileBlocks.WalkDir]:
+            directory = tempfile.mkdtemp()
+
+            try:
+                b = box.Box()
+                src = DirPath(directory)
+                lister = cls()
+                d = DumpStr()
+                b.addBlock(src)
+                b.addBlock(lister)
+                b.addBlock(d)
+                chain.Chain(src.output(0), lister.input(0))
+                chain.Chain(lister.output("file"), d.input(0))
+
+                os.makedirs(os.path.join(directory, "sub"))
+                open(os.path.join(directory, "a.txt"), "w").close()
+                workerManager.WorkerManager.RunSchedule(b.getSchedule())
+                self.assertEqual(map(os.path.basename, d.values()), ["a.txt"])
+
+                ## the directory changed, the listing must not be replayed
+                open(os.path.join(directory, "b.txt"), "w").close()
+                if cls is fileBlocks.WalkDir:
+                    open(os.path.join(directory, "sub", "c.txt"), "w").close()
+
+                workerManager.WorkerManager.RunSchedule(b.getSchedule())
+                expected = ["a.txt", "b.txt", "c.txt"] if cls is fileBlocks.WalkDir else ["a.txt", "b.txt"]
+                self.assertEqual(sorted(map(os.path.basename, d.values())), expected)
+            finally:
+                shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+import tempfile
+import json
+import time
+
+
+class MakeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float, "number")
+
+    def run(self):
+        self.output(0).sendMany(range(100))
+        self.output(0).send(100)
+
+
+class AddOne(block.Block):
+    def __init__(self, name="", parent=None):
+        super(AddOne, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float, "in")
+        self.addOutput(float, "out")
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        time.sleep(0.0001)
+        self.output(0).send(in_f.value() + 1)
+        in_f.drop()
+
+        return True
+
+
+class Sink(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Sink, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float, "in")
+
+    def process(self):
+        for p in self.input(0).receiveMany(10):
+            if p.isEOP():
+                return False
+
+        return True
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        workerManager.WorkerManager.ClearMetrics()
+        workerManager.WorkerManager.SetCollectMetrics(True)
+
+    def tearDown(self):
+        workerManager.WorkerManager.SetCollectMetrics(False)
+        workerManager.WorkerManager.SetMetricsHistorySize(100)
+        workerManager.WorkerManager.ClearMetrics()
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def check(self, m, a):
+        mm = workerManager.WorkerManager.BlockMetrics(m.path())
+        am = workerManager.WorkerManager.BlockMetrics(a.path())
+        self.assertEqual(mm["type"], "MakeNumbers")
+        self.assertEqual(mm["outputs"]["number"]["packets"], 101)
+        self.assertEqual(am["inputs"]["in"]["packets"], 101)
+        self.assertEqual(am["outputs"]["out"]["packets"], 101)
+        self.assertTrue(am["inputs"]["in"]["bytes"] >= 808)
+        self.assertTrue(am["success"])
+        self.assertTrue(am["end"] >= am["start"])
+        self.assertTrue(am["wall"] >= 0.01)
+        self.assertTrue(am["busy"] <= am["wall"] + 1e-6)
+        self.assertAlmostEqual(am["computeTime"], am["busy"] - am["receiveTime"] - am["sendTime"], places=6)
+
+    def test_thread(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        b = box.Box("scene")
+        m = MakeNumbers()
+        a = AddOne()
+        s = Sink()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(s)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), s.input(0))
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.check(m, a)
+
+    def test_cooperative(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetCooperative(True)
+        try:
+            b = box.Box("scene")
+            m = MakeNumbers()
+            a = AddOne()
+            s = Sink()
+            b.addBlock(m)
+            b.addBlock(a)
+            b.addBlock(s)
+            chain.Chain(m.output(0), a.input(0))
+            chain.Chain(a.output(0), s.input(0))
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            self.check(m, a)
+        finally:
+            workerManager.WorkerManager.SetCooperative(False)
+
+    def test_process(self):
+        workerManager.WorkerManager.SetUseProcess(True)
+        b = box.Box("scene")
+        m = MakeNumbers()
+        a = AddOne()
+        s = Sink()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(s)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), s.input(0))
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.check(m, a)
+
+    def test_summary(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetMetricsHistorySize(3)
+        b = box.Box("scene")
+        m = MakeNumbers()
+        a = AddOne()
+        s = Sink()
+        b.addBlock(m)
+        b.addBlock(a)
+        b.addBlock(s)
+        chain.Chain(m.output(0), a.input(0))
+        chain.Chain(a.output(0), s.input(0))
+
+        for i in range(5):
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        self.assertEqual(len(workerManager.WorkerManager.MetricsHistory(a.path())), 3)
+
+        summary = workerManager.WorkerManager.MetricsSummary()
+        self.assertEqual(summary[a.path()]["runs"], 3)
+        walls = sorted(map(lambda x: x["wall"], workerManager.WorkerManager.MetricsHistory(a.path())))
+        self.assertEqual(summary[a.path()]["wall"], {"p50": walls[1], "p95": walls[2], "p99": walls[2]})
+        self.assertEqual(summary[a.path()]["outputs"]["out"]["packets"]["p50"], 101)
+
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            self.assertTrue(workerManager.WorkerManager.DumpMetrics(path))
+            with open(path, "r") as f:
+                data = json.load(f)
+
+            self.assertEqual(len(data["runs"][a.path()]), 3)
+            self.assertEqual(data["summary"][a.path()]["runs"], 3)
+        finally:
+            os.remove(path)
+
+        workerManager.WorkerManager.SetCollectMetrics(False)
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+        self.assertEqual(len(workerManager.WorkerManager.MetricsHistory(a.path())), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
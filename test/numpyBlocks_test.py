@@ -0,0 +1,164 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../blocks")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+import multiprocessing
+import Queue
+
+try:
+    import numpy
+    import numpyBlocks
+except ImportError:
+    numpy = None
+
+
+class Values(block.Block):
+    def __init__(self, typeClass=float, values=[]):
+        self.__type_class = typeClass
+        self.__values = values
+        super(Values, self).__init__()
+
+    def initialize(self):
+        self.addOutput(self.__type_class)
+
+    def run(self):
+        for v in self.__values:
+            self.output(0).send(v)
+
+
+class Dump(block.Block):
+    def __init__(self, typeClass=float):
+        self.__type_class = typeClass
+        super(Dump, self).__init__()
+        self.dmp = None
+
+    def initialize(self):
+        self.addInput(self.__type_class)
+
+    def activate(self):
+        super(Dump, self).activate()
+        if workerManager.WorkerManager.UseProcess():
+            self.dmp = multiprocessing.Queue()
+        else:
+            self.dmp = Queue.Queue()
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.dmp.put(in_f.value())
+        in_f.drop()
+
+        return True
+
+    def values(self):
+        res = []
+        while (not self.dmp.empty()):
+            res.append(self.dmp.get())
+
+        return res
+
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class NumpyBlocksTest(unittest.TestCase):
+    def tearDown(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def run_blocks(self, blocs, chains, dump):
+        results = []
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            b = box.Box()
+            for bloc in blocs:
+                b.addBlock(bloc)
+
+            for src, dst in chains:
+                chain.Chain(src, dst)
+
+            workerManager.WorkerManager.RunSchedule(b.getSchedule())
+            results.append(dump.values())
+
+            for bloc in blocs:
+                b.deleteBlock(bloc)
+
+        return results
+
+    def test_range(self):
+        rng = numpyBlocks.NdRange()
+        rng.param("start").set(2)
+        rng.param("stop").set(10)
+        rng.param("step").set(3)
+        dump = Dump(numpy.ndarray)
+
+        for res in self.run_blocks([rng, dump], [(rng.output(0), dump.input(0))], dump):
+            self.assertEqual(len(res), 1)
+            self.assertEqual(res[0].tolist(), [2, 5, 8])
+
+        rng.param("step").set(0)
+        for res in self.run_blocks([rng, dump], [(rng.output(0), dump.input(0))], dump):
+            self.assertEqual(res[0].tolist(), range(2, 10))
+
+    def test_float_array(self):
+        src = Values(float, [1.0, 2.5, 3.0])
+        arr = numpyBlocks.FloatNdArray()
+        itr = numpyBlocks.NdArrayIter()
+        dump_arr = Dump(numpy.ndarray)
+        dump = Dump(float)
+        blocs = [src, arr, itr, dump_arr, dump]
+        chains = [(src.output(0), arr.input(0)), (arr.output(0), itr.input(0)), (arr.output(0), dump_arr.input(0)), (itr.output(0), dump.input(0))]
+
+        for res in self.run_blocks(blocs, chains, dump):
+            self.assertEqual(res, [1.0, 2.5, 3.0])
+
+        for res in self.run_blocks(blocs, chains, dump_arr):
+            self.assertEqual(len(res), 1)
+            self.assertEqual(res[0].dtype, numpy.float64)
+            self.assertEqual(res[0].tolist(), [1.0, 2.5, 3.0])
+
+    def test_binary(self):
+        a = numpy.array([1.0, 2.0, 3.0])
+        b = numpy.array([2.0, 0.0, 3.0])
+        expected = [(numpyBlocks.NdPlus, [3.0, 2.0, 6.0]),
+                    (numpyBlocks.NdMinus, [-1.0, 2.0, 0.0]),
+                    (numpyBlocks.NdMultiply, [2.0, 0.0, 9.0]),
+                    (numpyBlocks.NdDivide, [0.5, 0.0, 1.0]),
+                    (numpyBlocks.NdCompare, [False, False, True])]
+
+        for cls, values in expected:
+            src1 = Values(numpy.ndarray, [a])
+            src2 = Values(numpy.ndarray, [b])
+            oper = cls()
+            dump = Dump(numpy.ndarray)
+            blocs = [src1, src2, oper, dump]
+            chains = [(src1.output(0), oper.input(0)), (src2.output(0), oper.input(1)), (oper.output(0), dump.input(0))]
+
+            for res in self.run_blocks(blocs, chains, dump):
+                self.assertEqual(len(res), 1)
+                self.assertEqual(res[0].tolist(), values)
+
+    def test_reduce(self):
+        arrays = [numpy.array([1.0, 2.0, 3.0, 4.0]), numpy.array([])]
+        expected = [[10.0, 0.0], [2.5], [1.0], [4.0], [24.0, 1.0]]
+
+        for oper, values in enumerate(expected):
+            src = Values(numpy.ndarray, arrays)
+            reduce_bloc = numpyBlocks.NdReduce()
+            reduce_bloc.param("operator").set(oper)
+            dump = Dump(float)
+            blocs = [src, reduce_bloc, dump]
+            chains = [(src.output(0), reduce_bloc.input(0)), (reduce_bloc.output(0), dump.input(0))]
+
+            ## an empty array is skipped by the reductions without an identity
+            for res in self.run_blocks(blocs, chains, dump):
+                self.assertEqual(res, values)
+                self.assertFalse(reduce_bloc.isFailed())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,18 @@ import unittest
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import core
 from petitBloc import packet
+from petitBloc import port
+from petitBloc import chain
+from petitBloc import const
+from petitBloc import workerManager
+import pickle
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class PacketTest(unittest.TestCase):
@@ -59,5 +70,140 @@ class PacketTest(unittest.TestCase):
         self.assertTrue(float_pack2.drop())
 
 
+    def test_copy(self):
+        arr = [1, [2, 3]]
+        pack = packet.Packet(arr)
+        v1 = pack.value()
+        self.assertEqual(v1, arr)
+        self.assertIsNot(v1, arr)
+        v1[1].append(4)
+        self.assertEqual(pack.value(), [1, [2, 3]])
+
+        str_pack = packet.Packet("Hello")
+        self.assertIs(str_pack.value(), str_pack.value())
+
+    def test_freeze(self):
+        arr = [1, [2, 3], {"a": [4]}]
+        pack = packet.Packet(arr, freeze=True)
+        self.assertEqual(pack.typeClass(), list)
+        v1 = pack.value()
+        self.assertEqual(v1, arr)
+        self.assertIs(v1, pack.value())
+        self.assertTrue(isinstance(v1, list))
+
+        self.assertRaises(TypeError, v1.append, 1)
+        self.assertRaises(TypeError, v1[1].append, 1)
+        self.assertRaises(TypeError, v1[2].update, {"b": 1})
+        self.assertRaises(TypeError, v1[2]["a"].pop)
+
+        def setItem():
+            v1[0] = 10
+
+        self.assertRaises(TypeError, setItem)
+
+        arr[1].append(5)
+        self.assertEqual(pack.value(), [1, [2, 3], {"a": [4]}])
+
+        mutable = list(v1)
+        mutable.append(6)
+        self.assertEqual(len(mutable), 4)
+
+        v2 = pickle.loads(pickle.dumps(v1, 2))
+        self.assertEqual(v1, v2)
+        self.assertRaises(TypeError, v2.append, 1)
+
+    def test_freeze_fallback(self):
+        class TestObject(object):
+            def __init__(self):
+                super(TestObject, self).__init__()
+                self.value = 1
+
+        pack = packet.Packet([TestObject()], freeze=True)
+        v1 = pack.value()
+        v1[0].value = 2
+        v1.append(1)
+        self.assertEqual(pack.value()[0].value, 1)
+        self.assertEqual(len(pack.value()), 1)
+
+    def test_size_hint(self):
+        self.assertEqual(packet.Packet("abc").sizeHint(), 3)
+        self.assertEqual(packet.Packet(1.5).sizeHint(), 0)
+        self.assertEqual(packet.Packet([]).sizeHint(), 0)
+        self.assertEqual(packet.Packet(["a" * 100] * 10).sizeHint(), 108 * 10)
+        self.assertEqual(packet.Packet({"key": "a" * 10}).sizeHint(), 8 + 3 + 10)
+
+        ## only the first elements of a large list are measured
+        values = ["a" * 10] * core.SizeHintSamples + ["a" * 1000] * 1000
+        self.assertEqual(packet.Packet(values).sizeHint(), 18 * len(values))
+
+        ## nested deeper than the sampled depth, a container counts its slots
+        self.assertEqual(packet.Packet([[["a" * 100] * 4] * 2] * 3).sizeHint(), 3 * (8 + 2 * (8 + 4 * 8)))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_freeze_ndarray(self):
+        arr = numpy.arange(5.0)
+        pack = packet.Packet(arr, freeze=True)
+        self.assertEqual(pack.typeClass(), numpy.ndarray)
+        self.assertEqual(pack.sizeHint(), arr.nbytes)
+
+        ## a list is estimated from its elements, not from its length
+        self.assertEqual(packet.Packet([arr] * 1000).sizeHint(), (8 + arr.nbytes) * 1000)
+
+        v1 = pack.value()
+        self.assertIs(v1, pack.value())
+        self.assertFalse(v1.flags.writeable)
+
+        def setItem():
+            v1[0] = 10
+
+        self.assertRaises(ValueError, setItem)
+
+        arr[0] = 10
+        self.assertEqual(pack.value().tolist(), [0.0, 1.0, 2.0, 3.0, 4.0])
+
+        ## an already frozen array is shared instead of copied
+        pack2 = packet.Packet(v1, freeze=True)
+        self.assertIs(pack2.value(), v1)
+
+    def test_port_mode(self):
+        src_port = port.OutPort(list)
+        dst_port1 = port.InPort(list)
+        dst_port2 = port.InPort(list)
+        chain.Chain(src_port, dst_port1)
+        chain.Chain(src_port, dst_port2)
+
+        self.assertEqual(src_port.packetMode(), const.PacketMode.Copy)
+        self.assertTrue(workerManager.WorkerManager.SetPacketMode(const.PacketMode.Freeze, list))
+        self.assertFalse(workerManager.WorkerManager.SetPacketMode("Freeze"))
+        self.assertEqual(src_port.packetMode(), const.PacketMode.Freeze)
+        self.assertEqual(workerManager.WorkerManager.PacketMode(), const.PacketMode.Copy)
+
+        src_port.activate()
+        self.assertTrue(src_port.send([1, 2, 3]))
+        v1 = dst_port1.receive().value()
+        v2 = dst_port2.receive().value()
+        self.assertIs(v1, v2)
+        self.assertRaises(TypeError, v1.append, 4)
+        src_port.terminate()
+        dst_port1.terminate()
+        dst_port2.terminate()
+
+        workerManager.WorkerManager.ResetPacketMode()
+        src_port.setPacketMode(const.PacketMode.Freeze)
+        self.assertEqual(src_port.packetMode(), const.PacketMode.Freeze)
+        src_port.setPacketMode(None)
+        self.assertEqual(src_port.packetMode(), const.PacketMode.Copy)
+
+        src_port.activate()
+        self.assertTrue(src_port.send([1, 2, 3]))
+        v1 = dst_port1.receive().value()
+        v2 = dst_port2.receive().value()
+        self.assertIsNot(v1, v2)
+        v1.append(4)
+        src_port.terminate()
+        dst_port1.terminate()
+        dst_port2.terminate()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -407,6 +407,170 @@ class TestBlock(unittest.TestCase):
 
         self.assertEqual(res, ["HELLO WORLD!!!", 50.0])
 
+    def test_expression_cache(self):
+        exp = parameter.Expression("= '$contextStr' + ' ../../@str' + str(/main@int * $contextInt)")
+        self.assertEqual(exp.paths(), ["../../@str", "/main@int"])
+        self.assertEqual(exp.tokens(), ["contextStr", "contextInt"])
+        self.assertEqual(exp.resolve({"../../@str": "A"}, {"contextStr": "B"}), "'B' + ' A' + str(/main@int * $contextInt)")
+
+        box1 = box.Box("main")
+        box2 = box.Box("subn")
+        box1.addBlock(box2)
+        box1.addParam(int, "int")
+        box1.param("int").set(3)
+        dump = DumpParam()
+        box2.addBlock(dump)
+        box1.createContext()
+        ctx = box1.addContext(int, "contextInt")
+        ctx.set(2)
+
+        os.environ["TEST_ENV_CACHE"] = "10"
+
+        self.assertTrue(dump.param("float1").setExpression("= /main@int * $contextInt + $TEST_ENV_CACHE"))
+        self.assertEqual(dump.param("float1").get(), 16.0)
+        self.assertEqual(dump.param("float1").get(), 16.0)
+
+        box1.param("int").set(4)
+        self.assertEqual(dump.param("float1").get(), 18.0)
+
+        ctx.set(3)
+        self.assertEqual(dump.param("float1").get(), 22.0)
+
+        os.environ["TEST_ENV_CACHE"] = "20"
+        self.assertEqual(dump.param("float1").get(), 32.0)
+
+        box1.rename("other")
+        self.assertEqual(dump.param("float1").get(), 0.0)
+        box1.rename("main")
+        self.assertEqual(dump.param("float1").get(), 32.0)
+
+        box1.removeParam("int")
+        self.assertEqual(dump.param("float1").get(), 0.0)
+        box1.addParam(int, "int").set(1)
+        self.assertEqual(dump.param("float1").get(), 23.0)
+
+        box1.removeContext("contextInt")
+        os.environ["contextInt"] = "5"
+        self.assertEqual(dump.param("float1").get(), 25.0)
+        del os.environ["contextInt"]
+        del os.environ["TEST_ENV_CACHE"]
+
+    def test_expression_graph(self):
+        box1 = box.Box("main")
+        box1.createContext()
+        ctx = box1.addContext(int, "contextInt")
+        ctx.set(2)
+        p1 = box1.addParam(int, "p1")
+        p2 = box1.addParam(int, "p2")
+        p3 = box1.addParam(int, "p3")
+        p4 = box1.addParam(int, "p4")
+        p1.set(1)
+
+        self.assertTrue(p3.setExpression("= /main@p2 * 10"))
+        self.assertTrue(p2.setExpression("= /main@p1 + $contextInt"))
+        self.assertTrue(p4.setExpression("= /main@p1 + 100"))
+
+        self.assertEqual(p3.dependencies(), [p2])
+        self.assertEqual(p2.dependencies(), [p1, ctx])
+
+        graph = parameter.ExpressionGraph(box1)
+        self.assertFalse(graph.hasCycle())
+        order = graph.order()
+        self.assertEqual(len(order), 3)
+        self.assertTrue(order.index(p2) < order.index(p3))
+
+        graph.evaluate()
+        self.assertEqual(p3.get(), 30)
+        self.assertEqual(p4.get(), 101)
+
+        ctx.set(5)
+        self.assertEqual(graph.update([ctx]), [p2, p3])
+        self.assertEqual(p3.get(), 60)
+
+        p1.set(0)
+        self.assertEqual(set(graph.update([p1])), set([p2, p3, p4]))
+        self.assertEqual(p3.get(), 50)
+        self.assertEqual(p4.get(), 100)
+
+        ## p1 changed without an update, the stored values behind it are not used
+        p1.set(3)
+        self.assertEqual(p3.get(), 80)
+        self.assertEqual(p4.get(), 103)
+
+        self.assertTrue(p1.setExpression("= /main@p3 + 1"))
+        graph.build()
+        self.assertTrue(graph.hasCycle())
+        self.assertEqual(set(graph.cycles()), set([p1, p2, p3]))
+        self.assertEqual(graph.order(), [p4])
+        self.assertTrue(isinstance(p1.get(), int))
+
+        ## p4 is behind the cycle, it is evaluated against the fallback value of p1
+        graph.evaluate()
+        self.assertEqual([p1.get(), p2.get(), p3.get()], [0, 0, 0])
+        self.assertEqual(p4.get(), 100)
+
+        ctx.set(7)
+        self.assertEqual(graph.update([ctx]), [p4])
+        self.assertEqual(p2.get(), 0)
+        self.assertEqual(p4.get(), 100)
+
+
+    def test_expression_graph_update(self):
+        box1 = box.Box("main")
+        box1.createContext()
+        ctx = box1.addContext(int, "contextInt")
+        p1 = box1.addParam(int, "p1")
+        p2 = box1.addParam(int, "p2")
+        p3 = box1.addParam(int, "p3")
+        p4 = box1.addParam(int, "p4")
+        self.assertTrue(p2.setExpression("= /main@p1 + $contextInt"))
+        self.assertTrue(p3.setExpression("= /main@p2 * 10"))
+        self.assertTrue(p4.setExpression("= /main@p1 + 100"))
+
+        evaluated = []
+        gets = []
+        evaluate = parameter.Expression.evaluate
+        get = parameter.Parameter.get
+
+        def countEvaluate(expr, paths, tokens):
+            evaluated.append(expr)
+            return evaluate(expr, paths, tokens)
+
+        def countGet(param):
+            gets.append(param)
+            return get(param)
+
+        parameter.Expression.evaluate = countEvaluate
+        parameter.Parameter.get = countGet
+        try:
+            graph = parameter.ExpressionGraph(box1)
+            graph.evaluate()
+            self.assertEqual(len(evaluated), 3)
+
+            ## the stored values are returned without reading the dependencies again
+            del gets[:]
+            self.assertEqual(p3.get(), 0)
+            self.assertEqual(gets, [p3])
+
+            ctx.set(2)
+            del evaluated[:]
+            self.assertEqual(graph.update([ctx]), [p2, p3])
+            self.assertEqual(len(evaluated), 2)
+
+            p1.set(1)
+            del evaluated[:]
+            self.assertEqual(set(graph.update([p1])), set([p2, p3, p4]))
+            self.assertEqual(len(evaluated), 3)
+
+            del evaluated[:]
+            del gets[:]
+            self.assertEqual((p2.get(), p3.get(), p4.get()), (3, 30, 101))
+            self.assertEqual(evaluated, [])
+            self.assertEqual(gets, [p2, p3, p4])
+        finally:
+            parameter.Expression.evaluate = evaluate
+            parameter.Parameter.get = get
+
 
 if __name__ == "__main__":
     unittest.main()
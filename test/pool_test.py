@@ -0,0 +1,268 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import workerManager
+import Queue
+import time
+
+
+class MakeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        for n in range(100):
+            self.output(0).send(n)
+
+        return False
+
+
+class RangeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(RangeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def run(self):
+        for n in range(100):
+            self.output(0).send(n)
+
+
+class StepNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(StepNumbers, self).__init__(name=name, parent=parent)
+        self.count = 0
+        self.end = None
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        if self.count >= 20:
+            self.end = time.time()
+            return False
+
+        self.output(0).send(self.count)
+        self.count += 1
+        time.sleep(0.01)
+
+        return True
+
+
+class RunNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(RunNumbers, self).__init__(name=name, parent=parent)
+        self.start = None
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def run(self):
+        self.start = time.time()
+        for n in range(20):
+            self.output(0).send(n)
+
+
+class Plus(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Plus, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        in1 = self.input(0).receive()
+        if in1.isEOP():
+            return False
+
+        in2 = self.input(1).receive()
+        if in2.isEOP():
+            return False
+
+        self.output(0).send(in1.value() + in2.value())
+
+        return True
+
+
+class Dump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Dump, self).__init__(name=name, parent=parent)
+        self.dmp = Queue.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.dmp.put(in_f.value())
+        in_f.drop()
+
+        return True
+
+
+class AddOne(block.Block):
+    def __init__(self, name="", parent=None):
+        super(AddOne, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.output(0).send(in_f.value() + 1)
+        in_f.drop()
+
+        return True
+
+
+class RunDump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(RunDump, self).__init__(name=name, parent=parent)
+        self.dmp = Queue.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def run(self):
+        while (True):
+            in_f = self.input(0).receive()
+            if in_f.isEOP():
+                break
+
+            self.dmp.put(in_f.value())
+            in_f.drop()
+
+
+class PoolTest(unittest.TestCase):
+    def tearDown(self):
+        workerManager.WorkerManager.SetCooperative(False)
+        workerManager.WorkerManager.SetPoolSize(0)
+
+    def __run(self, scene, dump):
+        workerManager.WorkerManager.RunSchedule(scene.getSchedule())
+
+        res = []
+        while (not dump.dmp.empty()):
+            res.append(dump.dmp.get())
+
+        return res
+
+    def test_pool_size(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetPoolSize(3)
+        self.assertEqual(workerManager.WorkerManager.PoolSize(), 3)
+
+        b = box.Box()
+        m1 = MakeNumbers()
+        m2 = RangeNumbers()
+        b.addBlock(m1)
+        b.addBlock(m2)
+        last = m1.output(0)
+        for i in range(10):
+            p = Plus()
+            b.addBlock(p)
+            chain.Chain(last, p.input(0))
+            chain.Chain(m2.output(0), p.input(1))
+            last = p.output(0)
+
+        d = Dump()
+        b.addBlock(d)
+        chain.Chain(last, d.input(0))
+
+        expected = [float(x * 11) for x in range(100)]
+
+        for i in range(3):
+            self.assertEqual(self.__run(b, d), expected)
+            self.assertTrue(workerManager.WorkerManager.PoolWorkerCount() <= 3)
+
+    def test_cooperative(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetPoolSize(2)
+        workerManager.WorkerManager.SetCooperative(True)
+        self.assertTrue(workerManager.WorkerManager.Cooperative())
+
+        b = box.Box()
+        m1 = MakeNumbers()
+        m2 = RangeNumbers()
+        b.addBlock(m1)
+        b.addBlock(m2)
+        last = m1.output(0)
+        for i in range(10):
+            p = Plus()
+            b.addBlock(p)
+            chain.Chain(last, p.input(0))
+            chain.Chain(m2.output(0), p.input(1))
+            last = p.output(0)
+
+        d = Dump()
+        b.addBlock(d)
+        chain.Chain(last, d.input(0))
+
+        expected = [float(x * 11) for x in range(100)]
+
+        for i in range(3):
+            self.assertEqual(self.__run(b, d), expected)
+            self.assertTrue(workerManager.WorkerManager.PoolWorkerCount() <= 2)
+
+    def test_mixed(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetPoolSize(1)
+        workerManager.WorkerManager.SetCooperative(True)
+
+        for i in range(3):
+            b = box.Box()
+            s = StepNumbers()
+            r = RunNumbers()
+            p = Plus()
+            d = Dump()
+            b.addBlock(s)
+            b.addBlock(r)
+            b.addBlock(p)
+            b.addBlock(d)
+            chain.Chain(s.output(0), p.input(0))
+            chain.Chain(r.output(0), p.input(1))
+            chain.Chain(p.output(0), d.input(0))
+
+            ## the queued run task must start between the steps of the held block
+            self.assertEqual(self.__run(b, d), [float(x * 2) for x in range(20)])
+            self.assertTrue(r.start < s.end)
+
+    def test_cooperative_run(self):
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.SetPoolSize(1)
+        workerManager.WorkerManager.SetCooperative(True)
+
+        for i in range(3):
+            b = box.Box()
+            r = RunNumbers()
+            a = AddOne()
+            d = RunDump()
+            b.addBlock(r)
+            b.addBlock(a)
+            b.addBlock(d)
+            chain.Chain(r.output(0), a.input(0))
+            chain.Chain(a.output(0), d.input(0))
+
+            ## the run task waits on a step block, which needs a worker of its own
+            self.assertEqual(self.__run(b, d), [float(x + 1) for x in range(20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -200,6 +200,91 @@ class ChainTest(unittest.TestCase):
         dst_port.terminate()
         self.assertEqual(workerManager.WorkerManager.QueueCount(), 0)
 
+    def test_batch(self):
+        src_port = port.OutPort(int)
+        dst_port = port.InPort(float)
+        chan = chain.Chain(src_port, dst_port)
+        chan.setBatchSize(4)
+        self.assertEqual(chan.batchSize(), 4)
+        src_port.activate()
+        dst_port.activate()
+
+        for i in range(6):
+            self.assertTrue(src_port.send(i))
+
+        time.sleep(0.01)
+        for i in range(4):
+            pack = dst_port.receive()
+            self.assertEqual(pack.value(), float(i))
+            self.assertEqual(pack.typeClass(), float)
+
+        self.assertTrue(chan.empty())
+
+        src_port.terminate()
+        time.sleep(0.01)
+        self.assertEqual(dst_port.receive().value(), 4.0)
+        self.assertEqual(dst_port.receive().value(), 5.0)
+        self.assertTrue(dst_port.receive().isEOP())
+        self.assertTrue(dst_port.reachedEOP())
+        dst_port.terminate()
+
+        self.assertEqual(src_port.packetHistory(), range(6))
+        self.assertEqual(dst_port.packetHistory(), [float(x) for x in range(6)])
+        self.assertEqual(workerManager.WorkerManager.QueueCount(), 0)
+
+    def test_batch_latency(self):
+        src_port = port.OutPort(int)
+        dst_port = port.InPort(int)
+        chan = chain.Chain(src_port, dst_port)
+        chan.setBatchSize(100)
+        chan.setBatchLatency(0.01)
+        src_port.activate()
+
+        self.assertTrue(src_port.send(0))
+        self.assertTrue(chan.empty())
+        ## the partial batch is sent once the latency passed without another send
+        time.sleep(0.05)
+        self.assertFalse(chan.empty())
+        self.assertEqual(dst_port.receive().value(), 0)
+        self.assertTrue(src_port.send(1))
+        time.sleep(0.05)
+        self.assertEqual(dst_port.receive().value(), 1)
+
+        self.assertTrue(src_port.send(2))
+        self.assertTrue(chan.empty())
+        self.assertTrue(src_port.flush())
+        time.sleep(0.01)
+        self.assertEqual(dst_port.receive().value(), 2)
+        src_port.terminate()
+        dst_port.terminate()
+
+    def test_send_many(self):
+        src_port = port.OutPort(int)
+        dst_port = port.InPort(int)
+        chan = chain.Chain(src_port, dst_port)
+        src_port.activate()
+        dst_port.activate()
+
+        self.assertFalse(src_port.sendMany([1, "a"]))
+        self.assertTrue(chan.empty())
+        self.assertTrue(src_port.sendMany(range(5)))
+        self.assertTrue(src_port.send(5))
+        time.sleep(0.01)
+
+        self.assertEqual(dst_port.receive().value(), 0)
+        self.assertEqual([x.value() for x in dst_port.receiveMany(3)], [1, 2, 3])
+        src_port.terminate()
+        time.sleep(0.01)
+
+        packs = dst_port.receiveMany(10)
+        self.assertEqual(len(packs), 3)
+        self.assertEqual([x.value() for x in packs[:2]], [4, 5])
+        self.assertTrue(packs[-1].isEOP())
+        self.assertTrue(dst_port.reachedEOP())
+        dst_port.terminate()
+
+        self.assertEqual(dst_port.packetHistory(), range(6))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import scheduler
+from petitBloc import workerManager
+import Queue
+
+
+class MakeNumbers(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeNumbers, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(float)
+
+    def process(self):
+        for n in range(10):
+            self.output(0).send(n)
+
+        return False
+
+
+class AddOne(block.Block):
+    def __init__(self, name="", parent=None):
+        super(AddOne, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(float)
+        self.addOutput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.output(0).send(in_f.value() + 1)
+        in_f.drop()
+
+        return True
+
+
+class Dump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Dump, self).__init__(name=name, parent=parent)
+        self.dmp = Queue.Queue()
+
+    def initialize(self):
+        self.addInput(float)
+
+    def process(self):
+        in_f = self.input(0).receive()
+        if in_f.isEOP():
+            return False
+
+        self.dmp.put(in_f.value())
+        in_f.drop()
+
+        return True
+
+
+class SchedulerTest(unittest.TestCase):
+    def test_order(self):
+        b = box.Box()
+        m = MakeNumbers()
+        a1 = AddOne()
+        a2 = AddOne()
+        d = Dump()
+        b.addBlock(d)
+        b.addBlock(a2)
+        b.addBlock(a1)
+        b.addBlock(m)
+        chain.Chain(m.output(0), a1.input(0))
+        chain.Chain(a1.output(0), a2.input(0))
+        chain.Chain(a2.output(0), d.input(0))
+
+        sched = scheduler.Scheduler([d, a2, a1, m])
+        self.assertEqual(sched.pending(), 4)
+
+        order = []
+        while (True):
+            bloc = sched.next()
+            if bloc is None:
+                break
+
+            order.append(bloc)
+            sched.started(bloc)
+
+        self.assertEqual(order, [m, a1, a2, d])
+        self.assertEqual(sched.pending(), 0)
+
+    def test_duplicate(self):
+        m = MakeNumbers()
+        a = AddOne()
+        chain.Chain(m.output(0), a.input(0))
+
+        sched = scheduler.Scheduler([m, a, m, a])
+        self.assertEqual(sched.blocks(), [m, a])
+
+    def test_cycle(self):
+        a1 = AddOne()
+        a2 = AddOne()
+        chain.Chain(a1.output(0), a2.input(0))
+        chain.Chain(a2.output(0), a1.input(0))
+
+        sched = scheduler.Scheduler([a1, a2])
+        self.assertFalse(sched.hasReady())
+
+        bloc = sched.next()
+        self.assertEqual(bloc, a1)
+        sched.started(bloc)
+        self.assertTrue(sched.hasReady())
+        self.assertEqual(sched.next(), a2)
+        sched.started(a2)
+        self.assertIsNone(sched.next())
+
+    def test_run(self):
+        b = box.Box()
+        m = MakeNumbers()
+        d = Dump()
+        b.addBlock(d)
+        last = m.output(0)
+        for i in range(50):
+            a = AddOne()
+            b.addBlock(a)
+            chain.Chain(last, a.input(0))
+            last = a.output(0)
+
+        b.addBlock(m)
+        chain.Chain(last, d.input(0))
+
+        workerManager.WorkerManager.SetUseProcess(False)
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        res = []
+        while (not d.dmp.empty()):
+            res.append(d.dmp.get())
+
+        self.assertEqual(res, [float(x + 50) for x in range(10)])
+
+    def test_max_process(self):
+        b = box.Box()
+        blocs = []
+        for i in range(10):
+            m = MakeNumbers()
+            a = AddOne()
+            b.addBlock(m)
+            b.addBlock(a)
+            chain.Chain(m.output(0), a.input(0))
+            blocs += [m, a]
+
+        schedule = b.getSchedule()
+        counts = []
+
+        def callback():
+            counts.append(1)
+
+        for use_process in [False, True]:
+            counts[:] = []
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            workerManager.WorkerManager.RunSchedule(schedule, maxProcess=1, perProcessCallback=callback)
+
+            self.assertEqual(len(counts), len(schedule) + 1)
+            for bloc in blocs:
+                self.assertTrue(bloc.isTerminated())
+
+        workerManager.WorkerManager.SetUseProcess(False)
+
+
+if __name__ == "__main__":
+    unittest.main()
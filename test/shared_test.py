@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import packet
+from petitBloc import processManager
+from petitBloc import workerManager
+import multiprocessing
+
+
+class MakeStrings(block.Block):
+    def __init__(self, name="", parent=None):
+        super(MakeStrings, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addOutput(str)
+
+    def process(self):
+        for n in range(10):
+            self.output(0).send(str(n) * (n * 1000))
+
+        return False
+
+
+class Upper(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Upper, self).__init__(name=name, parent=parent)
+
+    def initialize(self):
+        self.addInput(str)
+        self.addOutput(str)
+
+    def process(self):
+        in_s = self.input(0).receive()
+        if in_s.isEOP():
+            return False
+
+        self.output(0).send(in_s.value() + "a")
+        in_s.drop()
+
+        return True
+
+
+class Dump(block.Block):
+    def __init__(self, name="", parent=None):
+        super(Dump, self).__init__(name=name, parent=parent)
+        self.dmp = multiprocessing.Queue()
+
+    def initialize(self):
+        self.addInput(str)
+
+    def process(self):
+        in_s = self.input(0).receive()
+        if in_s.isEOP():
+            return False
+
+        self.dmp.put(in_s.value())
+        in_s.drop()
+
+        return True
+
+
+class SharedTest(unittest.TestCase):
+    def tearDown(self):
+        workerManager.WorkerManager.SetSharedMemoryThreshold(1024 * 1024)
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def test_queue(self):
+        processManager.QueueManager.SetSharedThreshold(100)
+        self.assertEqual(processManager.QueueManager.SharedThreshold(), 100)
+        q = processManager.QueueManager.CreateQueue()
+        directory = processManager.QueueManager.SharedDirectory()
+        self.assertTrue(os.path.isdir(directory))
+
+        small = packet.Packet("a")
+        big = packet.Packet("b" * 1000)
+        q.put(small)
+        q.put(big)
+        q.put([small, big, packet.EndOfPacket])
+        q.put(range(100))
+        self.assertEqual(len(os.listdir(directory)), 3)
+
+        self.assertEqual(q.get().value(), "a")
+        self.assertEqual(q.get().value(), "b" * 1000)
+        self.assertEqual(len(os.listdir(directory)), 2)
+        batch = q.get()
+        self.assertEqual([x.value() for x in batch[:2]], ["a", "b" * 1000])
+        self.assertTrue(batch[2].isEOP())
+        self.assertEqual(q.get(), range(100))
+        self.assertEqual(len(os.listdir(directory)), 0)
+
+        q.put(big)
+        processManager.QueueManager.DeleteQueue(q)
+        processManager.QueueManager.Reset()
+        self.assertIsNone(processManager.QueueManager.SharedDirectory())
+        self.assertFalse(os.path.exists(directory))
+
+    def test_run(self):
+        workerManager.WorkerManager.SetUseProcess(True)
+        workerManager.WorkerManager.SetSharedMemoryThreshold(2048)
+        self.assertEqual(workerManager.WorkerManager.SharedMemoryThreshold(), 2048)
+
+        b = box.Box()
+        m = MakeStrings()
+        u = Upper()
+        d = Dump()
+        b.addBlock(m)
+        b.addBlock(u)
+        b.addBlock(d)
+        chain.Chain(m.output(0), u.input(0))
+        chain.Chain(u.output(0), d.input(0))
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        expected = [str(n) * (n * 1000) + "a" for n in range(10)]
+        res = []
+        for n in range(10):
+            res.append(d.dmp.get(timeout=5))
+
+        self.assertEqual(res, expected)
+        self.assertEqual(u.output(0).packetHistory(), expected)
+        self.assertIsNone(processManager.QueueManager.SharedDirectory())
+
+
+if __name__ == "__main__":
+    unittest.main()
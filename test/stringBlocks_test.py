@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../blocks")))
+from petitBloc import box
+from petitBloc import block
+from petitBloc import chain
+from petitBloc import util
+from petitBloc import workerManager
+import stringBlocks
+
+
+class Strings(block.Block):
+    def __init__(self, values=[]):
+        super(Strings, self).__init__()
+        self.__values = values
+
+    def initialize(self):
+        self.addOutput(str, "string")
+
+    def run(self):
+        self.output(0).sendMany(self.__values)
+
+
+class Collect(block.Block):
+    def __init__(self):
+        super(Collect, self).__init__()
+        self.values = []
+
+    def initialize(self):
+        self.addInput(str, "string")
+
+    def process(self):
+        p = self.input(0).receive()
+        if p.isEOP():
+            return False
+
+        self.values.append(p.value())
+        p.drop()
+
+        return True
+
+
+Lines = map(lambda x: "id{} {}".format(x, "abc" if x % 3 else "xyz"), range(2500))
+
+
+class StringBlocksTest(unittest.TestCase):
+    def tearDown(self):
+        util.RegexCache.Clear()
+
+    def run_block(self, bloc, inputs, batch):
+        b = box.Box()
+        bloc.param("batch").set(batch)
+        b.addBlock(bloc)
+
+        for i, values in enumerate(inputs):
+            src = Strings(values)
+            b.addBlock(src)
+            chain.Chain(src.output(0), bloc.input(i))
+
+        results = []
+        for out in bloc.outputs():
+            collect = Collect()
+            b.addBlock(collect)
+            chain.Chain(out, collect.input(0))
+            results.append(collect.values)
+
+        workerManager.WorkerManager.RunSchedule(b.getSchedule())
+
+        return results
+
+    def test_search(self):
+        for batch in [False, True]:
+            ## the pattern changes for the first packets and then is reused until the end
+            res = self.run_block(stringBlocks.RegexSearch(), [Lines, ["^id", "[a-c]+", "[x-z]+"]], batch)
+            self.assertEqual(res[0][:3], ["id", "abc", ""])
+            self.assertEqual(res[0][3:], map(lambda x: "" if "abc" in x else "xyz", Lines[3:]))
+
+            res = self.run_block(stringBlocks.RegexSearch(), [Lines, []], batch)
+            self.assertEqual(res[0], [])
+
+    def test_switch(self):
+        for batch in [False, True]:
+            res = self.run_block(stringBlocks.RegexSwitch(), [Lines, ["xyz$"]], batch)
+            self.assertEqual(res[0], filter(lambda x: x.endswith("xyz"), Lines))
+            self.assertEqual(res[1], filter(lambda x: not x.endswith("xyz"), Lines))
+
+    def test_sub(self):
+        for batch in [False, True]:
+            res = self.run_block(stringBlocks.RegexSub(), [Lines, ["id([0-9]+)"], ["<\\1>", "#\\1"]], batch)
+            self.assertEqual(res[0][0], "<0> xyz")
+            self.assertEqual(res[0][1:], map(lambda x: "#" + x[2:], Lines[1:]))
+
+    def test_findall(self):
+        for batch in [False, True]:
+            res = self.run_block(stringBlocks.RegexFindAll(), [Lines[:10], ["[0-9a-c]"]], batch)
+            self.assertEqual("".join(res[0]), "".join(map(lambda x: "".join(filter(lambda c: c in "0123456789abc", x)), Lines[:10])))
+
+            res = self.run_block(stringBlocks.RegexFindAll(), [Lines[:10], ["(id)([0-9])"]], batch)
+            self.assertEqual(res[0], [])
+
+        self.assertTrue(util.RegexCache.Count() > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,14 @@ import unittest
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../blocks")))
 from petitBloc import workerManager
 from petitBloc import box
 from petitBloc import block
+from petitBloc import chain
+import execBlocks
 import multiprocessing
+import time
 
 
 class Sub(block.Block):
@@ -20,6 +24,37 @@ class Sub(block.Block):
         res.result()
 
 
+class Commands(block.Block):
+    def __init__(self):
+        super(Commands, self).__init__()
+
+    def initialize(self):
+        self.addOutput(str, "command")
+
+    def run(self):
+        for i in range(12):
+            self.output(0).send("sleep {}; exit {}".format(0.05 * (i % 3), i % 2))
+
+
+class Results(block.Block):
+    def __init__(self):
+        super(Results, self).__init__()
+        self.values = []
+
+    def initialize(self):
+        self.addInput(bool, "result")
+
+    def process(self):
+        p = self.input(0).receive()
+        if p.isEOP():
+            return False
+
+        self.values.append(p.value())
+        p.drop()
+
+        return True
+
+
 class TestSubprocess(unittest.TestCase):
     def test_bloc(self):
         box1 = box.Box()
@@ -30,7 +65,39 @@ class TestSubprocess(unittest.TestCase):
 
         workerManager.WorkerManager.SetUseProcess(True)
         workerManager.WorkerManager.RunSchedule(box1.getSchedule())
+        workerManager.WorkerManager.SetUseProcess(False)
+
+    def test_submit(self):
+        workerManager.WorkerManager.ResetSubProcess()
+        st = time.time()
+        workers = map(lambda x: workerManager.SubmitSubProcess("exit {}".format(x % 2)), range(20))
+        self.assertEqual(map(lambda x: x.result(), workers), map(lambda x: x % 2 == 0, range(20)))
+        self.assertEqual(workers[1].returnCode(), 1)
+        self.assertEqual(workerManager.WorkerManager.CountSubProcess(), 0)
+        ## a freed slot is reused immediately instead of after a polling interval
+        self.assertTrue(time.time() - st < 5.0)
+
+    def test_shell(self):
+        for use_process in [False, True]:
+            workerManager.WorkerManager.SetUseProcess(use_process)
+            for in_flight in [1, 4]:
+                box1 = box.Box()
+                cmds = Commands()
+                shell = execBlocks.Shell()
+                shell.param("inFlight").set(in_flight)
+                results = Results()
+                box1.addBlock(cmds)
+                box1.addBlock(shell)
+                box1.addBlock(results)
+                chain.Chain(cmds.output(0), shell.input(0))
+                chain.Chain(shell.output(0), results.input(0))
+
+                workerManager.WorkerManager.RunSchedule(box1.getSchedule())
+                self.assertFalse(shell.isFailed())
+                if not use_process:
+                    self.assertEqual(results.values, map(lambda x: x % 2 == 0, range(12)))
 
+        workerManager.WorkerManager.SetUseProcess(False)
 
 
 if __name__ == "__main__":
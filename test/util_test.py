@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../python")))
+from petitBloc import util
+from petitBloc import catalog
+import tempfile
+import json
+import re
+import StringIO
+
+
+class UtilTest(unittest.TestCase):
+    def test_stream_json(self):
+        data = {"blocks": [{"path": "b{}".format(i), "type": "Plus", "params": {"value": {"value": i * 1.5, "expression": None}}} for i in range(50)],
+                "connections": [{"src": "b0.output", "path": "b1.input"}],
+                "proxyPorts": [],
+                "packetMode": "Copy",
+                "historySize": 12345}
+
+        fd, path = tempfile.mkstemp(suffix=".blcs")
+        os.close(fd)
+
+        try:
+            for indent in [None, 4]:
+                with open(path, "w") as f:
+                    json.dump(data, f, indent=indent)
+
+                ## small chunks split strings and numbers between reads
+                for chunk_size in [1, 7, 65536]:
+                    items = list(util.StreamJson(path, chunkSize=chunk_size))
+                    self.assertEqual([v for k, v in items if k == "blocks"], data["blocks"])
+                    self.assertEqual([v for k, v in items if k == "connections"], data["connections"])
+                    self.assertEqual([v for k, v in items if k == "proxyPorts"], [])
+                    self.assertEqual(dict(filter(lambda x: x[0] in ["packetMode", "historySize"], items)), {"packetMode": "Copy", "historySize": 12345})
+
+            with open(path, "w") as f:
+                f.write('{"blocks": [{"path": "a"}')
+
+            self.assertRaises(ValueError, list, util.StreamJson(path))
+        finally:
+            os.remove(path)
+
+
+    def test_sort_by_path(self):
+        data = [{"path": "b/c"}, {"path": "c"}, {"path": "a/b/c"}, {"path": "a"}, {"path": "a/c"}]
+        self.assertEqual(map(lambda x: x["path"], util.SortByPath(data)), ["a", "c", "a/c", "b/c", "a/b/c"])
+
+        fd, path = tempfile.mkstemp(suffix=".blcs")
+        os.close(fd)
+
+        out = sys.stdout
+        try:
+            with open(path, "w") as f:
+                json.dump({"blocks": [{"path": "b", "type": "Plus"}, {"path": "a", "type": "Minus"}], "connections": [], "proxyPorts": []}, f)
+
+            ## the query lists the blocks as scene.Read sorts them, not in file order
+            sys.stdout = StringIO.StringIO()
+            self.assertTrue(catalog.Query(path))
+            lines = sys.stdout.getvalue().splitlines()
+        finally:
+            sys.stdout = out
+            os.remove(path)
+
+        self.assertEqual(lines[1:], ["# List Blocks", "    '/scene/a'(Minus)", "    '/scene/b'(Plus)"])
+
+    def test_regex_cache(self):
+        util.RegexCache.Clear()
+        util.RegexCache.SetMaxSize(3)
+        try:
+            a = util.RegexCache.Compile("a+")
+            util.RegexCache.Compile("b+")
+            util.RegexCache.Compile("c+")
+            self.assertIs(util.RegexCache.Compile("a+"), a)
+
+            ## b+ is the least recently used
+            util.RegexCache.Compile("d+")
+            self.assertEqual(util.RegexCache.Count(), 3)
+            self.assertIs(util.RegexCache.Compile("a+"), a)
+            self.assertIsNot(util.RegexCache.Compile("a+", re.I), a)
+            self.assertEqual(util.RegexCache.Count(), 3)
+
+            util.RegexCache.SetMaxSize(1)
+            self.assertEqual(util.RegexCache.Count(), 1)
+        finally:
+            util.RegexCache.SetMaxSize(256)
+            util.RegexCache.Clear()
+
+
+if __name__ == "__main__":
+    unittest.main()